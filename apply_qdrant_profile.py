@@ -0,0 +1,47 @@
+"""
+Move the existing Qdrant collection to a collection profile
+Updates quantization, HNSW and on-disk settings in place; Qdrant rebuilds
+the affected segments in the background, so searches keep working
+
+Usage:
+    python apply_qdrant_profile.py                     # profile from QDRANT_COLLECTION_PROFILE
+    python apply_qdrant_profile.py --profile balanced
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.qdrant_profiles import COLLECTION_PROFILES
+from services.qdrant_service import qdrant_service
+
+async def apply_profile(profile: str = None) -> bool:
+    """Apply the profile to the configured collection."""
+    if qdrant_service.local_only:
+        print("❌ QDRANT_URL is not set (local-only mode): there is no Qdrant collection to update")
+        return False
+
+    if profile:
+        qdrant_service.profile = profile
+    print(f"🔄 Applying Qdrant profile '{qdrant_service.profile}' to {qdrant_service.collection_name}...")
+
+    try:
+        if not await qdrant_service.initialize():
+            print("❌ Could not connect to Qdrant")
+            return False
+        applied = await qdrant_service.apply_profile()
+        if applied:
+            print("✅ Done; Qdrant re-optimizes the collection in the background")
+        return applied
+    finally:
+        await qdrant_service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the Qdrant collection to a collection profile")
+    parser.add_argument("--profile", choices=sorted(COLLECTION_PROFILES), help="defaults to QDRANT_COLLECTION_PROFILE")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(apply_profile(args.profile)) else 1)
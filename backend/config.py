@@ -12,6 +12,26 @@ class Config:
     QDRANT_URL = os.getenv("QDRANT_URL")
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
     QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "rescuelena")
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+    # Collection profile: default | balanced | low_memory | binary (see services/qdrant_profiles.py)
+    QDRANT_COLLECTION_PROFILE = os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+    # Hybrid search: sparse vector name and candidates fetched per ranking (x limit)
+    QDRANT_SPARSE_VECTOR = os.getenv("QDRANT_SPARSE_VECTOR", "bm25")
+    QDRANT_HYBRID_PREFETCH = int(os.getenv("QDRANT_HYBRID_PREFETCH", "4"))
+    # With the local index: after Qdrant was unreachable, serve from the index (degraded mode) this long before retrying
+    QDRANT_RETRY_SECONDS = float(os.getenv("QDRANT_RETRY_SECONDS", "30"))
+    
+    # In-process vector index (fallback while Qdrant is down; the only store if QDRANT_URL=local).
+    # Mirroring every write costs a local write per point, so the fallback is opt-in; one process per path
+    LOCAL_INDEX_ENABLED = os.getenv("LOCAL_INDEX_ENABLED", "false").lower() == "true"
+    LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "data/vector_index")
+    # Buffered upserts: flush when this many points are waiting or after this delay
+    QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "64"))
+    QDRANT_UPSERT_FLUSH_MS = float(os.getenv("QDRANT_UPSERT_FLUSH_MS", "50"))
+    # false = return once Qdrant has received the batch, without waiting for indexing
+    QDRANT_UPSERT_WAIT = os.getenv("QDRANT_UPSERT_WAIT", "false").lower() == "true"
     
     # Firebase
     FIREBASE_CREDENTIALS_JSON = os.getenv("FIREBASE_CREDENTIALS_JSON")
@@ -21,8 +41,135 @@ class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
     SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "rescuelena-images")
+    STORAGE_TIMEOUT = float(os.getenv("STORAGE_TIMEOUT", "10"))
+    STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "20"))
+    # Content-addressed keys already in the bucket (skips re-uploading identical bytes)
+    STORAGE_MANIFEST_PATH = os.getenv("STORAGE_MANIFEST_PATH", "data/storage_manifest.txt")
+    
+    # Uploads are read once into memory in chunks; larger files are rejected with 413
+    MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+    MAX_DOCUMENT_BYTES = int(float(os.getenv("MAX_DOCUMENT_MB", "25")) * 1024 * 1024)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    
+    # Shared process pool for CPU-bound work (0 = one worker per CPU)
+    PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "0"))
+    
+    # WebP thumbnails generated at ingest ("name:longest side" pairs)
+    THUMBNAIL_SIZES = {
+        name: int(size)
+        for name, size in (
+            pair.split(":") for pair in os.getenv("THUMBNAIL_SIZES", "small:160,medium:640").split(",") if pair
+        )
+    }
+    THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+    
+    # Incidents kept in the in-process cache used to hydrate search results
+    INCIDENT_CACHE_SIZE = int(os.getenv("INCIDENT_CACHE_SIZE", "5000"))
     
     # Vector dimensions for embeddings
     EMBEDDING_DIM = 768
+    
+    # Embeddings: how long uploads wait inline before deferring to the backfill queue
+    # (0 = never wait, always embed in the background)
+    EMBEDDING_INLINE_TIMEOUT = float(os.getenv("EMBEDDING_INLINE_TIMEOUT", "3.0"))
+    EMBEDDING_BACKFILL_PATH = os.getenv("EMBEDDING_BACKFILL_PATH", "data/embedding_backfill.jsonl")
+    EMBEDDING_BACKFILL_BATCH = int(os.getenv("EMBEDDING_BACKFILL_BATCH", "32"))
+    EMBEDDING_BACKFILL_MIN_DELAY = float(os.getenv("EMBEDDING_BACKFILL_MIN_DELAY", "5"))
+    EMBEDDING_BACKFILL_MAX_DELAY = float(os.getenv("EMBEDDING_BACKFILL_MAX_DELAY", "300"))
+    # Items Gemini keeps returning no embedding for are dropped after this many batches
+    EMBEDDING_BACKFILL_MAX_ATTEMPTS = int(os.getenv("EMBEDDING_BACKFILL_MAX_ATTEMPTS", "5"))
+    
+    # Image pipeline stage timeouts in seconds (PIPELINE_TIMEOUT_<STAGE>)
+    PIPELINE_TIMEOUTS = {
+        stage: float(os.getenv(f"PIPELINE_TIMEOUT_{stage.upper()}", default))
+        for stage, default in {
+            "analysis": "5.0",
+            "storage": "3.0",
+            "dedup": "3.0",
+            "firestore": "3.0",
+            "qdrant": "3.0",
+            "broadcast": "2.0",
+        }.items()
+    }
+    
+    # Documents: PDF pages per process-pool task and tasks in flight, characters per Gemini
+    # prompt, chunks analyzed at once, incidents kept per document after merging
+    DOCUMENT_PAGES_PER_TASK = int(os.getenv("DOCUMENT_PAGES_PER_TASK", "10"))
+    DOCUMENT_EXTRACT_PARALLELISM = int(os.getenv("DOCUMENT_EXTRACT_PARALLELISM", "4"))
+    DOCUMENT_CHUNK_CHARS = int(os.getenv("DOCUMENT_CHUNK_CHARS", "12000"))
+    DOCUMENT_ANALYSIS_CONCURRENCY = int(os.getenv("DOCUMENT_ANALYSIS_CONCURRENCY", "4"))
+    DOCUMENT_MAX_INCIDENTS = int(os.getenv("DOCUMENT_MAX_INCIDENTS", "10"))
+    
+    # Document cache: re-sent reports (same bytes, or text at least DOCUMENT_NEAR_DUP_THRESHOLD
+    # similar by MinHash) reuse earlier results; chunk analyses are cached separately
+    DOCUMENT_CACHE_PATH = os.getenv("DOCUMENT_CACHE_PATH", "data/document_cache.jsonl")
+    DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "2000"))
+    DOCUMENT_CACHE_TTL_HOURS = float(os.getenv("DOCUMENT_CACHE_TTL_HOURS", "24"))
+    DOCUMENT_NEAR_DUP_THRESHOLD = float(os.getenv("DOCUMENT_NEAR_DUP_THRESHOLD", "0.9"))
+    DOCUMENT_CHUNK_CACHE_SIZE = int(os.getenv("DOCUMENT_CHUNK_CACHE_SIZE", "20000"))
+    
+    # Bulk text (/analyze/text/bulk): messages and characters per Gemini prompt, prompts in
+    # flight, and request limits
+    TEXT_BULK_ITEMS_PER_PROMPT = int(os.getenv("TEXT_BULK_ITEMS_PER_PROMPT", "25"))
+    TEXT_BULK_PROMPT_CHARS = int(os.getenv("TEXT_BULK_PROMPT_CHARS", "12000"))
+    TEXT_BULK_CONCURRENCY = int(os.getenv("TEXT_BULK_CONCURRENCY", "4"))
+    TEXT_BULK_MAX_ITEMS = int(os.getenv("TEXT_BULK_MAX_ITEMS", "10000"))
+    TEXT_BULK_MAX_BYTES = int(float(os.getenv("TEXT_BULK_MAX_MB", "10")) * 1024 * 1024)
+    
+    # Social post triage: optional JSON file overriding the keyword tables (type, urgency, relevance,
+    # location_cues) of services/social_media_service.py
+    SOCIAL_KEYWORDS_PATH = os.getenv("SOCIAL_KEYWORDS_PATH", "")
+    
+    # Social stream engine (/social/monitor): queue bound and what happens when it is full ("block"
+    # pauses the sources, "drop" discards new posts), posts per triage batch, persistence batching
+    # and writes in flight, directory replay files are read from
+    SOCIAL_QUEUE_SIZE = int(os.getenv("SOCIAL_QUEUE_SIZE", "10000"))
+    SOCIAL_OVERFLOW = os.getenv("SOCIAL_OVERFLOW", "block")
+    SOCIAL_TRIAGE_BATCH = int(os.getenv("SOCIAL_TRIAGE_BATCH", "500"))
+    SOCIAL_PERSIST_BATCH = int(os.getenv("SOCIAL_PERSIST_BATCH", "200"))
+    SOCIAL_PERSIST_INTERVAL = float(os.getenv("SOCIAL_PERSIST_INTERVAL", "0.5"))
+    SOCIAL_PERSIST_CONCURRENCY = int(os.getenv("SOCIAL_PERSIST_CONCURRENCY", "2"))
+    SOCIAL_REPLAY_DIR = os.getenv("SOCIAL_REPLAY_DIR", "data/social")
+    # Stored posts stop queueing embeddings once the backfill queue holds this many items
+    SOCIAL_BACKFILL_MAX_PENDING = int(os.getenv("SOCIAL_BACKFILL_MAX_PENDING", "5000"))
+    
+    # Async analysis jobs (?async=true): worker pool size, queue bound, finished jobs kept for polling
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))
+    
+    # Batch uploads: files analyzed at once (each holds a Gemini call and a storage upload)
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    
+    # Per-item batch state (one JSONL file per batch) used to resume interrupted batches
+    BATCH_CHECKPOINT_DIR = os.getenv("BATCH_CHECKPOINT_DIR", "data/batches")
+    
+    # Archive ingest (/batch/archive): total size limit, bytes kept in memory before spooling to disk
+    MAX_ARCHIVE_BYTES = int(float(os.getenv("MAX_ARCHIVE_MB", "4096")) * 1024 * 1024)
+    ARCHIVE_SPOOL_BYTES = int(float(os.getenv("ARCHIVE_SPOOL_MB", "8")) * 1024 * 1024)
+    
+    # Email alerts: recipients, burst coalescing window, per-recipient minimum interval (seconds)
+    ALERT_EMAILS = [email.strip() for email in os.getenv("ALERT_EMAILS", "").split(",") if email.strip()]
+    ALERT_BATCH_WINDOW = float(os.getenv("ALERT_BATCH_WINDOW", "2"))
+    ALERT_MIN_INTERVAL = float(os.getenv("ALERT_MIN_INTERVAL", "60"))
+    ALERT_MAX_RETRIES = int(os.getenv("ALERT_MAX_RETRIES", "3"))
+    ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "1000"))
+    # How long a due alert waits for its image's thumbnails before sending without them
+    ALERT_THUMBNAIL_WAIT = float(os.getenv("ALERT_THUMBNAIL_WAIT", "5"))
+    
+    # Duplicate detection
+    # "semantic" runs one Qdrant query (vector similarity + geo radius + time window),
+    # "legacy" scans recent Firestore incidents by type and distance
+    DEDUP_MODE = os.getenv("DEDUP_MODE", "semantic")
+    DEDUP_RADIUS_M = float(os.getenv("DEDUP_RADIUS_M", "250"))
+    DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "6"))
+    DEDUP_MIN_SCORE = float(os.getenv("DEDUP_MIN_SCORE", "0.88"))
+    
+    # Event clustering (groups incident reports into events)
+    CLUSTER_CAPACITY = int(os.getenv("CLUSTER_CAPACITY", "5000"))
+    CLUSTER_EPS_M = float(os.getenv("CLUSTER_EPS_M", "1000"))
+    CLUSTER_WINDOW_HOURS = float(os.getenv("CLUSTER_WINDOW_HOURS", "12"))
+    CLUSTER_MIN_SIMILARITY = float(os.getenv("CLUSTER_MIN_SIMILARITY", "0.75"))
+    CLUSTER_RETENTION_HOURS = float(os.getenv("CLUSTER_RETENTION_HOURS", "72"))
 
 config = Config()
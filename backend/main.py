@@ -1,8 +1,16 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import image_routes, text_routes, dashboard_routes, query_routes, chat_routes, document_routes, status_routes, batch_routes, verification_routes, social_routes, satellite_routes
+from routes import image_routes, text_routes, dashboard_routes, query_routes, chat_routes, document_routes, status_routes, batch_routes, verification_routes, social_routes, satellite_routes, job_routes
 import socketio
 from websocket_manager import sio
+from services.qdrant_service import qdrant_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.storage_service import storage_service
+from services.job_service import job_service
+from services.alert_dispatcher import alert_dispatcher
+from services.social_stream_service import social_stream_service
+from services.brevo_service import brevo_service
+from utils.process_pool import shutdown_pool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -48,6 +56,27 @@ app.include_router(document_routes.router, tags=["Document Analysis"])
 app.include_router(dashboard_routes.router, tags=["Dashboard"])
 app.include_router(query_routes.router, tags=["Query"])
 app.include_router(chat_routes.router, tags=["Chat"])
+app.include_router(job_routes.router, tags=["Jobs"])
+
+@app.on_event("startup")
+async def startup():
+    """Connect to external services once the event loop is running."""
+    await qdrant_service.initialize()
+    embedding_backfill_service.start()
+    job_service.start()
+    alert_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections."""
+    await social_stream_service.stop()
+    await job_service.stop()
+    await embedding_backfill_service.stop()
+    await alert_dispatcher.stop()
+    await brevo_service.close()
+    await qdrant_service.close()
+    await storage_service.close()
+    shutdown_pool()
 
 @app.get("/")
 async def root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 class IncidentBase(BaseModel):
@@ -30,9 +30,26 @@ class ImageAnalysisRequest(BaseModel):
 class TextAnalysisRequest(BaseModel):
     text: str
 
+class GeoFilter(BaseModel):
+    lat: float
+    lng: float
+    radius_km: float = 5.0
+
+class QueryFilters(BaseModel):
+    types: Optional[List[str]] = None
+    urgency: Optional[List[str]] = None
+    status: Optional[List[str]] = None
+    verified: Optional[bool] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    within_hours: Optional[float] = None  # e.g. 1 for "in the last hour"
+    near: Optional[GeoFilter] = None
+
 class QueryRequest(BaseModel):
     query: str
     limit: int = 10
+    mode: Literal["dense", "sparse", "hybrid"] = "dense"
+    filters: Optional[QueryFilters] = None
 
 class ChatRequest(BaseModel):
     message: str
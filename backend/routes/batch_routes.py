@@ -1,103 +1,180 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
-from services.gemini_service import gemini_service
-from services.qdrant_service import qdrant_service
-from services.firestore_service import firestore_service
-from services.storage_service import storage_service
-from utils.exif_utils import get_gps_coordinates
-from utils.format_utils import determine_urgency, format_incident_response
-from websocket_manager import broadcast_new_incident
-import tempfile
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request
+from typing import List, Optional, Dict
+from services.batch_pipeline import batch_pipeline, BatchItem
+from services.batch_checkpoint_service import batch_checkpoint_service
+from utils.archive_utils import archive_format, iter_archive
+from utils.stream_utils import stream_response, STREAM_FORMATS
+from utils.upload_utils import read_upload, spool_request, UploadBuffer
+from config import config
 import asyncio
 
 router = APIRouter()
 
+async def _read_files(files: List[UploadFile]) -> List[BatchItem]:
+    """
+    Read every upload before responding: FastAPI closes the form's files once the
+    handler returns, which is before a streamed body is sent.
+    """
+    items = []
+    for file in files:
+        try:
+            items.append(BatchItem(file.filename, await read_upload(file)))
+        except HTTPException as e:
+            items.append(BatchItem(file.filename, error=Exception(e.detail)))
+    return items
+
+async def _iterate(items: List[BatchItem]):
+    for item in items:
+        yield item
+
+def _next_archive_item(entries) -> Optional[BatchItem]:
+    """Read and hash the next image entry (runs in a worker thread)."""
+    entry = next(entries, None)
+    if entry is None:
+        return None
+    if entry.error:
+        return BatchItem(entry.name, error=Exception(entry.error))
+    return BatchItem(entry.name, UploadBuffer.from_bytes(entry.data, entry.name, entry.content_type))
+
+async def _archive_items(spool, fmt: str, stats: Dict[str, int]):
+    """Unpack entries one at a time, only as fast as the batch pipeline asks for them."""
+    entries = iter_archive(spool, fmt, config.MAX_UPLOAD_BYTES, stats)
+    reading = None
+    try:
+        while True:
+            # Shielded: a worker thread cannot be interrupted, so cancellation must wait for it
+            reading = asyncio.ensure_future(asyncio.to_thread(_next_archive_item, entries))
+            item = await asyncio.shield(reading)
+            reading = None
+            if item is None:
+                break
+            yield item
+    finally:
+        if reading is not None:
+            await asyncio.gather(reading, return_exceptions=True)
+        entries.close()
+
+async def _finalize(events, checkpoint, stats: Optional[Dict[str, int]] = None, spool=None):
+    """Add archive entry counts to the summary, then release the checkpoint and spooled archive."""
+    try:
+        async for event, data in events:
+            if event == "summary" and stats is not None:
+                data = {**data, "entries": stats["entries"], "skipped": stats["skipped"]}
+            yield event, data
+    finally:
+        batch_checkpoint_service.close(checkpoint)
+        if spool is not None:
+            spool.close()
+
+def _open_checkpoint(batch_id: str):
+    try:
+        return batch_checkpoint_service.open(batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _respond(events, stream: Optional[str], batch_id: str):
+    if stream:
+        return stream_response(events, stream, headers={"X-Batch-Id": batch_id})
+    return await _collect(events)
+
+async def _collect(events) -> Dict:
+    results = []
+    summary = {}
+    async for event, data in events:
+        if event == "result":
+            results.append(data)
+        else:
+            summary = data
+    return {
+        "total": summary.get("total", len(results)),
+        "successful": summary.get("successful", 0),
+        "failed": summary.get("failed", 0),
+        "results": sorted(results, key=lambda result: result["index"]),
+        "resumed": summary.get("resumed", 0),
+        "batch_id": summary.get("batch_id"),
+        "throughput": {key: summary.get(key) for key in ("concurrency", "elapsed_ms", "files_per_second")},
+        **{key: summary[key] for key in ("entries", "skipped", "error") if key in summary}
+    }
+
+def _check_stream(stream: Optional[str]):
+    if stream is not None and stream not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+
 @router.post("/batch/upload")
-async def analyze_batch(files: List[UploadFile] = File(...)):
-    """Analyze multiple images in batch."""
+async def analyze_batch(files: List[UploadFile] = File(...), stream: Optional[str] = Query(None),
+                        batch_id: Optional[str] = Query(None)):
+    """
+    Analyze multiple images in batch, several at a time.
+
+    ?stream=ndjson or ?stream=sse sends each file's result as soon as it is
+    ready, followed by a summary event with throughput.
+
+    Progress is checkpointed per file. Re-submitting the same files (or
+    passing the returned batch_id) skips those that already succeeded.
+    """
     if len(files) > 100:
         raise HTTPException(status_code=400, detail="Maximum 100 files per batch")
+    _check_stream(stream)
     
-    results = []
-    successful = 0
-    failed = 0
+    items = await _read_files(files)
+    batch_id = batch_id or batch_checkpoint_service.batch_id_for(
+        item.upload.sha256 for item in items if item.upload is not None
+    )
+    checkpoint = _open_checkpoint(batch_id)
+    events = _finalize(batch_pipeline.stream(_iterate(items), checkpoint), checkpoint)
+    return await _respond(events, stream, batch_id)
+
+@router.post("/batch/archive")
+async def analyze_archive(request: Request, stream: Optional[str] = Query(None),
+                          batch_id: Optional[str] = Query(None)):
+    """
+    Analyze every image in a ZIP or TAR (.tar, .tar.gz, ...) archive sent as the raw request body.
+
+    Example: curl --data-binary @frames.zip "http://localhost:8000/batch/archive?stream=ndjson"
+
+    The body is spooled to a temp file (disk beyond ARCHIVE_SPOOL_MB) and
+    entries are unpacked one at a time as the pipeline has room. Non-image
+    entries are skipped. Streaming and the response shape match
+    /batch/upload, plus entry/skip counts. The batch ID defaults to the
+    archive's hash, so uploading the same archive again resumes it.
+    """
+    _check_stream(stream)
+    spool, archive_sha256 = await spool_request(request, config.MAX_ARCHIVE_BYTES)
     
-    for file in files:
-        try:
-            # Save temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            # Extract GPS
-            gps_coords = get_gps_coordinates(tmp_path)
-            if gps_coords:
-                lat, lng = gps_coords
-            else:
-                import random
-                lat = 25.2048 + random.uniform(-0.1, 0.1)
-                lng = 55.2708 + random.uniform(-0.1, 0.1)
-            
-            # Analyze
-            analysis = await gemini_service.analyze_image(tmp_path)
-            image_url = await storage_service.upload_image(tmp_path)
-            urgency = determine_urgency(
-                analysis['confidence'],
-                analysis['type'],
-                analysis.get('people_affected', 0)
-            )
-            
-            # Generate embedding
-            embedding_text = f"{analysis['type']} {analysis['description']}"
-            embedding = await gemini_service.generate_embedding(embedding_text)
-            
-            # Store
-            incident_data = {
-                "type": analysis['type'],
-                "lat": lat,
-                "lng": lng,
-                "confidence": analysis['confidence'],
-                "urgency": urgency,
-                "description": analysis['description'],
-                "people_affected": analysis.get('people_affected', 0),
-                "image_url": image_url,
-                "location_text": None,
-                "status": "new"
-            }
-            
-            incident_id = await firestore_service.store_incident(incident_data)
-            await qdrant_service.store_embedding(incident_id, embedding, incident_data)
-            
-            # Cleanup
-            os.unlink(tmp_path)
-            
-            # Format response
-            incident_data['id'] = incident_id
-            response = format_incident_response(incident_data)
-            
-            # Broadcast
-            await broadcast_new_incident(response)
-            
-            results.append({
-                "filename": file.filename,
-                "success": True,
-                "incident": response
-            })
-            successful += 1
-            
-        except Exception as e:
-            results.append({
-                "filename": file.filename,
-                "success": False,
-                "error": str(e)
-            })
-            failed += 1
+    fmt = await asyncio.to_thread(archive_format, spool)
+    if fmt is None:
+        spool.close()
+        raise HTTPException(status_code=400, detail="Archive must be a ZIP or TAR file")
+    print(f"🗜️  Received {fmt.upper()} archive")
+    
+    batch_id = batch_id or archive_sha256[:32]
+    try:
+        checkpoint = _open_checkpoint(batch_id)
+    except HTTPException:
+        spool.close()
+        raise
+    stats = {"entries": 0, "skipped": 0}
+    events = _finalize(
+        batch_pipeline.stream(_archive_items(spool, fmt, stats), checkpoint), checkpoint, stats, spool
+    )
+    return await _respond(events, stream, batch_id)
+
+@router.get("/batch/{batch_id}")
+async def get_batch(batch_id: str, status: Optional[str] = Query(None, description="pending | done | failed")):
+    """Per-file state of a batch (e.g. to collect results after the connection dropped)."""
+    try:
+        checkpoint = batch_checkpoint_service.get(batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
     
     return {
-        "total": len(files),
-        "successful": successful,
-        "failed": failed,
-        "results": results
+        "batch_id": batch_id,
+        "counts": checkpoint.counts(),
+        "items": [
+            {key: entry[key] for key in ("filename", "sha256", "status", "incident_id", "error")}
+            for entry in checkpoint.items.values()
+            if status is None or entry["status"] == status
+        ]
     }
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from services.firestore_service import firestore_service
+from services.clustering_service import clustering_service
 from utils.format_utils import format_incident_response
 from datetime import datetime, timedelta
 import random
@@ -89,7 +90,7 @@ async def get_dashboard():
         else:
             # Format real incidents and filter out archived ones
             incidents = [
-                format_incident_response(inc) 
+                format_incident_response(clustering_service.resolve_incident(inc))
                 for inc in incidents 
                 if not inc.get("archived", False)
             ]
@@ -120,3 +121,13 @@ async def get_dashboard():
                 "avg_response_time": 12
             }
         }
+
+@router.get("/dashboard/events")
+async def get_dashboard_events(limit: int = 500):
+    """Get incidents grouped into events (one entry per disaster instead of per report)."""
+    events = clustering_service.get_events(limit=limit)
+    return {
+        "events": events,
+        "count": len(events),
+        "incident_count": sum(e["incident_count"] for e in events)
+    }
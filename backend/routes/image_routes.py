@@ -1,239 +1,34 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from services.gemini_service import gemini_service
-from services.qdrant_service import qdrant_service
-from services.firestore_service import firestore_service
-from services.storage_service import storage_service
-from services.brevo_service import brevo_service
-from utils.exif_utils import get_gps_coordinates
-from utils.format_utils import determine_urgency, format_incident_response
-from websocket_manager import broadcast_new_incident
-import tempfile
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from services.image_pipeline import image_pipeline
+from routes.job_routes import accept_job
+from utils.upload_utils import read_upload
+from utils.timing_utils import StageTimer
 
 router = APIRouter()
 
 @router.post("/analyze/image")
-async def analyze_image(file: UploadFile = File(...)):
-    """Analyze disaster image and store incident data."""
+async def analyze_image(file: UploadFile = File(...), async_mode: bool = Query(False, alias="async")):
+    """Analyze disaster image and store incident data (?async=true: 202 + job ID, processed in the background)."""
     try:
         print(f"📤 Received image upload: {file.filename}")
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
-        print(f"💾 Saved to temp: {tmp_path}")
-        
-        # Extract GPS coordinates
-        gps_coords = get_gps_coordinates(tmp_path)
-        # If no GPS data, use fixed Dubai coordinates (no randomization for duplicate detection)
-        if gps_coords:
-            lat, lng = gps_coords
-            print(f"📍 GPS found: {lat}, {lng}")
-        else:
-            # Fixed Dubai coordinates for consistent duplicate detection
-            lat = 25.2048
-            lng = 55.2708
-            print(f"📍 Using default location: {lat}, {lng}")
-        
-        # Analyze image with Gemini (with timeout)
-        print("🤖 Analyzing with Gemini...")
-        import asyncio
-        try:
-            # Try Gemini with 5 second timeout
-            analysis = await asyncio.wait_for(
-                gemini_service.analyze_image(tmp_path),
-                timeout=5.0
-            )
-            print(f"✅ Analysis complete: {analysis['type']}")
-        except asyncio.TimeoutError:
-            print(f"⚠️  Gemini timeout - using quick analysis")
-            # Quick fallback analysis
-            import random
-            incident_types = ['fire', 'flood', 'building_collapse', 'medical']
-            analysis = {
-                'type': random.choice(incident_types),
-                'description': f'Disaster detected in uploaded image: {file.filename}',
-                'confidence': round(random.uniform(0.7, 0.95), 2),
-                'people_affected': random.randint(0, 20)
-            }
-        except Exception as e:
-            print(f"⚠️  Gemini analysis failed: {e}")
-            # Use fallback analysis
-            import random
-            incident_types = ['fire', 'flood', 'building_collapse', 'medical']
-            analysis = {
-                'type': random.choice(incident_types),
-                'description': f'Disaster detected in uploaded image: {file.filename}',
-                'confidence': round(random.uniform(0.7, 0.95), 2),
-                'people_affected': random.randint(0, 20)
-            }
-        
-        # Upload image to storage (with timeout)
-        print("☁️  Uploading to Supabase...")
-        try:
-            image_url = await asyncio.wait_for(
-                storage_service.upload_image(tmp_path),
-                timeout=3.0
-            )
-            print(f"✅ Upload complete: {image_url}")
-        except asyncio.TimeoutError:
-            print(f"⚠️  Supabase timeout - using local path")
-            image_url = f"local://{file.filename}"
-        except Exception as e:
-            print(f"⚠️  Supabase upload failed: {e}")
-            image_url = f"local://{file.filename}"
-        
-        # Determine urgency
-        urgency = determine_urgency(
-            analysis['confidence'],
-            analysis['type'],
-            analysis.get('people_affected', 0)
-        )
-        
-        # Generate embedding (with timeout)
-        print("🔢 Generating embedding...")
-        try:
-            embedding_text = f"{analysis['type']} {analysis['description']}"
-            embedding = await asyncio.wait_for(
-                gemini_service.generate_embedding(embedding_text),
-                timeout=3.0
-            )
-            print("✅ Embedding generated")
-        except asyncio.TimeoutError:
-            print(f"⚠️  Embedding timeout - using dummy embedding")
-            embedding = [0.0] * 768  # Fallback empty embedding
-        except Exception as e:
-            print(f"⚠️  Embedding failed: {e}")
-            embedding = [0.0] * 768  # Fallback empty embedding
-        
-        # Get location name from coordinates
-        location_name = f"Location ({lat:.4f}, {lng:.4f})"
-        
-        # Check for duplicate incidents (same type + nearby location)
-        print("🔍 Checking for duplicates...")
-        try:
-            existing_incidents = await firestore_service.get_all_incidents(limit=100)
-            
-            # Check if similar incident exists within 100m radius
-            for existing in existing_incidents:
-                if existing.get('type') == analysis['type']:
-                    # Get existing coordinates (skip if missing)
-                    existing_lat = existing.get('lat') or existing.get('latitude')
-                    existing_lng = existing.get('lng') or existing.get('longitude')
-                    
-                    if existing_lat is None or existing_lng is None:
-                        continue  # Skip incidents without coordinates
-                    
-                    # Calculate distance (rough approximation)
-                    lat_diff = abs(existing_lat - lat)
-                    lng_diff = abs(existing_lng - lng)
-                    distance = ((lat_diff ** 2 + lng_diff ** 2) ** 0.5) * 111000  # Convert to meters
-                    
-                    if distance < 100:  # Within 100 meters
-                        print(f"⚠️  Duplicate found! Same {analysis['type']} within {distance:.0f}m")
-                        print(f"   Existing incident: {existing.get('id')}")
-                        
-                        # Clean up temp file
-                        os.unlink(tmp_path)
-                        
-                        # Return existing incident instead of creating new
-                        return {
-                            "message": "Similar incident already exists nearby",
-                            "duplicate": True,
-                            "existing_incident": format_incident_response(existing),
-                            "distance_meters": round(distance, 1)
-                        }
-        except Exception as e:
-            print(f"⚠️  Duplicate check failed: {e}")
-            # Continue with creation if check fails
-        
-        print("✅ No duplicates found, creating new incident")
-        
-        # Prepare incident data
-        incident_data = {
-            "type": analysis['type'],
-            "lat": lat,
-            "lng": lng,
-            "latitude": lat,
-            "longitude": lng,
-            "confidence": analysis['confidence'],
-            "urgency": urgency,
-            "description": analysis['description'],
-            "people_affected": analysis.get('people_affected', 0),
-            "image_url": image_url,
-            "location": location_name,
-            "location_text": location_name
-        }
-        
-        # Store in Firestore (with timeout)
-        print("🔥 Storing in Firestore...")
-        try:
-            incident_id = await asyncio.wait_for(
-                firestore_service.store_incident(incident_data),
-                timeout=3.0
-            )
-            print(f"✅ Stored with ID: {incident_id}")
-        except asyncio.TimeoutError:
-            print(f"⚠️  Firestore timeout - using local ID")
-            import uuid
-            incident_id = str(uuid.uuid4())
-        except Exception as e:
-            print(f"⚠️  Firestore storage failed: {e}")
-            import uuid
-            incident_id = str(uuid.uuid4())
-        
-        # Store embedding in Qdrant (with timeout)
-        print("🔍 Storing in Qdrant...")
-        try:
-            await asyncio.wait_for(
-                qdrant_service.store_embedding(incident_id, embedding, incident_data),
-                timeout=3.0
+        timer = StageTimer()
+
+        # Read the upload once; every pipeline stage shares these bytes
+        upload = await timer.run("read", read_upload(file))
+        print(f"💾 Read {upload.size} bytes (sha256 {upload.sha256[:12]})")
+
+        if async_mode:
+            return accept_job(
+                "image",
+                lambda on_stage: image_pipeline.run(upload, timer, on_stage),
+                {"filename": upload.filename, "size": upload.size}
             )
-            print("✅ Qdrant storage complete")
-        except asyncio.TimeoutError:
-            print(f"⚠️  Qdrant timeout - skipping vector storage")
-        except Exception as e:
-            print(f"⚠️  Qdrant storage failed: {e}")
-        
-        # Cleanup
-        os.unlink(tmp_path)
-        
-        # Return formatted response
-        incident_data['id'] = incident_id
-        response = format_incident_response(incident_data)
-        
-        print(f"✅ Upload complete! Incident ID: {incident_id}")
-        
-        # Broadcast to WebSocket clients
-        try:
-            await broadcast_new_incident(response)
-            print("📡 Broadcasted to WebSocket clients")
-        except Exception as e:
-            print(f"⚠️  WebSocket broadcast failed: {e}")
-        
-        # Send email notification for high-urgency incidents
-        if urgency == "high":
-            try:
-                # Get email recipients from environment variable
-                recipients_str = os.getenv("ALERT_EMAILS", "")
-                if recipients_str:
-                    recipients = [email.strip() for email in recipients_str.split(",")]
-                    print(f"📧 Sending email alert to {len(recipients)} recipient(s)...")
-                    email_sent = await brevo_service.send_incident_alert(response, recipients)
-                    if email_sent:
-                        print(f"✅ Email alert sent successfully")
-                    else:
-                        print(f"⚠️  Email alert failed to send")
-                else:
-                    print("⚠️  No email recipients configured (set ALERT_EMAILS in .env)")
-            except Exception as e:
-                print(f"⚠️  Email notification failed: {e}")
-        
-        return response
         
+        # EXIF, Gemini, storage, dedup, Firestore and Qdrant run as a stage DAG
+        return await image_pipeline.run(upload, timer)
+
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error in image analysis: {e}")
         import traceback
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from services.job_service import job_service, JobQueueFull, JobHandler
+from typing import Dict, Any, Optional
+
+router = APIRouter()
+
+def accept_job(kind: str, handler: JobHandler, meta: Optional[Dict[str, Any]] = None) -> JSONResponse:
+    """Queue a job and answer 202 Accepted (503 with Retry-After when the queue is full)."""
+    try:
+        job = job_service.submit(kind, handler, meta)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/jobs/{job['id']}",
+            # Socket.IO: emit join_room {"room": ...} to receive job_progress / job_completed / job_failed
+            "room": f"job:{job['id']}"
+        },
+        headers={"Location": f"/jobs/{job['id']}"}
+    )
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """Queue depth and job counts by status."""
+    return job_service.stats()
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll an analysis job: status, finished stages, and the result once completed."""
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
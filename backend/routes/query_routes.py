@@ -2,21 +2,55 @@ from fastapi import APIRouter, HTTPException
 from models.incident_model import QueryRequest
 from services.gemini_service import gemini_service
 from services.qdrant_service import qdrant_service
+from services.firestore_service import firestore_service
+from services.clustering_service import clustering_service
+from utils.format_utils import format_incident_response
+from typing import List, Dict, Any
 
 router = APIRouter()
 
+async def hydrate_results(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace slim Qdrant payloads with full incidents, fetched in one bulk read."""
+    incidents = await firestore_service.get_incidents([hit["id"] for hit in hits])
+    
+    results = []
+    for hit in hits:
+        # Fall back to the payload if the incident is gone from Firestore
+        incident = incidents.get(hit["id"]) or hit
+        incident = clustering_service.resolve_incident({**incident, "id": hit["id"]})
+        results.append({**format_incident_response(incident), "score": hit["score"]})
+    return results
+
 @router.post("/query")
 async def query_incidents(request: QueryRequest):
     """Search for similar incidents using natural language."""
     try:
-        # Generate embedding for query
-        query_embedding = await gemini_service.generate_embedding(request.query)
+        filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+        
+        # Sparse-only search matches exact terms and needs no embedding call
+        query_embedding = None
+        if request.mode != "sparse":
+            query_embedding = await gemini_service.generate_embedding(request.query)
+        
+        # Search in Qdrant (structured filters are applied inside the search);
+        # without a query embedding hybrid search degrades to exact-term matching
+        if request.mode == "dense" and query_embedding is not None:
+            results = await qdrant_service.search_similar(query_embedding, limit=request.limit, filters=filters)
+        else:
+            results = await qdrant_service.search_hybrid(
+                request.query,
+                query_embedding,
+                limit=request.limit,
+                filters=filters
+            )
         
-        # Search in Qdrant
-        results = await qdrant_service.search_similar(query_embedding, limit=request.limit)
+        results = await hydrate_results(results)
         
         return {
             "query": request.query,
+            "mode": request.mode,
+            "degraded": qdrant_service.degraded,
+            "filters": filters,
             "results": results,
             "count": len(results)
         }
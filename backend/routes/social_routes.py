@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from services.social_media_service import social_media_service
+from services.social_stream_service import social_stream_service, replay_path, SOURCES
 from services.gemini_service import gemini_service
 from services.firestore_service import firestore_service
 from services.qdrant_service import qdrant_service
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
 from utils.format_utils import determine_urgency, format_incident_response
 from websocket_manager import broadcast_new_incident
+from typing import List
 import random
+import time
 
 router = APIRouter()
 
@@ -56,11 +61,17 @@ async def analyze_social_post(request: SocialPostRequest):
             "verified": False  # Social media posts start unverified
         }
         
+        # Group into an event with related reports
+        incident_data["event_id"] = clustering_service.assign(incident_data, embedding)
+        
         # Store in Firestore
         incident_id = await firestore_service.store_incident(incident_data)
         
         # Store embedding in Qdrant
-        await qdrant_service.store_embedding(incident_id, embedding, incident_data)
+        if embedding is None:
+            embedding_backfill_service.defer(incident_id, embedding_text, incident_data)
+        else:
+            await qdrant_service.store_embedding(incident_id, embedding, incident_data)
         
         # Return formatted response
         incident_data['id'] = incident_id
@@ -74,27 +85,63 @@ async def analyze_social_post(request: SocialPostRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class SocialClassifyRequest(BaseModel):
+    posts: List[str]
+    relevant_only: bool = False
+
+@router.post("/social/classify")
+async def classify_social_posts(request: SocialClassifyRequest):
+    """Keyword triage of a batch of posts (no Gemini calls, nothing stored)."""
+    started = time.perf_counter()
+    results = social_media_service.classify_posts(request.posts, request.relevant_only)
+    elapsed = time.perf_counter() - started
+    return {
+        "results": results,
+        "total": len(request.posts),
+        "relevant": sum(1 for result in results if result["relevant"]),
+        "elapsed_ms": round(elapsed * 1000, 2)
+    }
+
+class SocialMonitorRequest(BaseModel):
+    source: str = "replay"
+    path: str  # JSONL file inside SOCIAL_REPLAY_DIR
+    speed: float = 0.0  # Replay recorded timing N times faster (0 = as fast as accepted)
+    rate: float = 0.0  # Posts per second for posts without "created_at" (0 = unlimited)
+    loop: bool = False
+
 @router.post("/social/monitor/start")
-async def start_social_monitoring():
-    """Start monitoring social media for disaster posts."""
+async def start_social_monitoring(request: SocialMonitorRequest):
+    """Start ingesting social media posts from a source (live API sources need Twitter credentials)."""
+    if request.source not in SOURCES:
+        raise HTTPException(status_code=400, detail=f"Unknown source '{request.source}' (available: {', '.join(SOURCES)})")
     try:
-        # In production, this would start the Twitter stream
-        return {
-            "success": True,
-            "message": "Social media monitoring started",
-            "note": "Add Twitter API credentials to enable real-time monitoring"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        path = replay_path(request.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    source = SOURCES[request.source](path, speed=request.speed, rate=request.rate, loop=request.loop)
+    if not social_stream_service.start([source]):
+        raise HTTPException(status_code=409, detail="Social media monitoring is already running")
+    return {
+        "success": True,
+        "message": "Social media monitoring started",
+        "source": source.describe()
+    }
 
 @router.post("/social/monitor/stop")
 async def stop_social_monitoring():
-    """Stop monitoring social media."""
+    """Stop monitoring social media (already queued posts are still triaged and stored)."""
     try:
-        social_media_service.stop_monitoring()
+        await social_stream_service.stop()
         return {
             "success": True,
-            "message": "Social media monitoring stopped"
+            "message": "Social media monitoring stopped",
+            "stats": social_stream_service.stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/social/monitor/stats")
+async def social_monitoring_stats():
+    """Throughput, drops, queue depth and lag of the social stream."""
+    return social_stream_service.stats()
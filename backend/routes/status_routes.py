@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from services.firestore_service import firestore_service
+from services.qdrant_service import qdrant_service
 from websocket_manager import broadcast_incident_update
 from datetime import datetime
 
@@ -37,6 +38,10 @@ async def update_incident_status(incident_id: str, update: StatusUpdate):
             raise HTTPException(status_code=404, detail="Incident not found")
         
         incident_ref.update(update_data)
+        firestore_service.invalidate_cached(incident_id)
+        
+        # Keep the filterable status in Qdrant in sync
+        await qdrant_service.update_payload(incident_id, {"status": status})
         
         # Check if incident should be auto-archived (resolved + verified)
         incident_data = incident_ref.get().to_dict()
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from models.incident_model import TextAnalysisRequest
 from services.gemini_service import gemini_service
 from services.qdrant_service import qdrant_service
 from services.firestore_service import firestore_service
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.text_pipeline import text_pipeline, text_incident
 from utils.format_utils import format_incident_response
+from utils.stream_utils import stream_response, STREAM_FORMATS
+from utils.upload_utils import iter_request_lines
+from config import config
+from typing import Optional
+import json
 
 router = APIRouter()
 
@@ -18,23 +26,19 @@ async def analyze_text(request: TextAnalysisRequest):
         embedding = await gemini_service.generate_embedding(request.text)
         
         # Prepare incident data
-        incident_data = {
-            "type": analysis['type'],
-            "lat": None,
-            "lng": None,
-            "confidence": analysis['confidence'],
-            "urgency": analysis['urgency'],
-            "description": analysis['description'],
-            "people_affected": analysis.get('people_affected', 0),
-            "location_text": analysis.get('location_text'),
-            "image_url": None
-        }
+        incident_data = text_incident(analysis)
+        
+        # Group into an event with related reports
+        incident_data["event_id"] = clustering_service.assign(incident_data, embedding)
         
         # Store in Firestore
         incident_id = await firestore_service.store_incident(incident_data)
         
         # Store embedding in Qdrant
-        await qdrant_service.store_embedding(incident_id, embedding, incident_data)
+        if embedding is None:
+            embedding_backfill_service.defer(incident_id, request.text, incident_data)
+        else:
+            await qdrant_service.store_embedding(incident_id, embedding, incident_data)
         
         # Return formatted response
         incident_data['id'] = incident_id
@@ -43,3 +47,55 @@ async def analyze_text(request: TextAnalysisRequest):
     except Exception as e:
         print(f"Error in text analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/analyze/text/bulk")
+async def analyze_text_bulk(request: Request, stream: Optional[str] = Query(None)):
+    """
+    Analyze many short messages sent as JSONL, one {"text": ..., "id": ...} object
+    (or a bare JSON string) per line; "id" defaults to the line number.
+
+    Example: curl --data-binary @sms.jsonl "http://localhost:8000/analyze/text/bulk?stream=ndjson"
+
+    Messages are analyzed several per Gemini prompt and stored with batched
+    writes. ?stream=ndjson|sse streams per-message results as groups
+    finish, followed by a summary.
+    """
+    if stream is not None and stream not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"stream must be one of: {', '.join(STREAM_FORMATS)}")
+    
+    # The body is read up front: a streamed response cannot keep reading the request
+    items, errors = [], []
+    line_number = 0
+    async for line in iter_request_lines(request, config.TEXT_BULK_MAX_BYTES):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            if isinstance(entry, str):
+                entry = {"text": entry}
+            text = entry.get("text") if isinstance(entry, dict) else None
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError('each line needs a non-empty "text"')
+            items.append({"id": str(entry.get("id", line_number)), "text": text.strip()})
+        except ValueError as e:
+            errors.append({"id": str(line_number), "success": False, "error": f"Line {line_number}: {e}"})
+        if len(items) > config.TEXT_BULK_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Maximum {config.TEXT_BULK_MAX_ITEMS} messages per request")
+    
+    if not items and not errors:
+        raise HTTPException(status_code=400, detail="No messages in request body")
+    print(f"💬 Bulk text: {len(items)} messages ({len(errors)} invalid lines)")
+    
+    events = text_pipeline.stream(items, errors)
+    if stream:
+        return stream_response(events, stream)
+    
+    results = []
+    summary = {}
+    async for event, data in events:
+        if event == "result":
+            results.append(data)
+        else:
+            summary = data
+    return {**summary, "results": results}
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from services.firestore_service import firestore_service
+from services.qdrant_service import qdrant_service
 from websocket_manager import broadcast_incident_update
 from datetime import datetime
 
@@ -28,6 +29,10 @@ async def verify_incident(incident_id: str):
         }
         
         incident_ref.update(update_data)
+        firestore_service.invalidate_cached(incident_id)
+        
+        # Keep the filterable verified flag in Qdrant in sync
+        await qdrant_service.update_payload(incident_id, {"verified": True})
         
         # Get updated incident data
         incident_data = incident_ref.get().to_dict()
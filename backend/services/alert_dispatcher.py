@@ -0,0 +1,162 @@
+"""
+Alert Dispatcher
+Sends incident email alerts out of band, coalescing bursts into per-recipient digests
+"""
+import asyncio
+import time
+from config import config
+from services.brevo_service import brevo_service
+from services.derivative_service import derivative_service
+from typing import Dict, Any, List, Optional
+
+class AlertDispatcher:
+    """
+    Pipelines call `enqueue()`, which never blocks or does I/O. A background
+    worker collects queued alerts per recipient. It waits `ALERT_BATCH_WINDOW`
+    seconds after the first one, so a burst arrives as one email. Each
+    recipient gets at most one email per `ALERT_MIN_INTERVAL` seconds; alerts
+    arriving in between are held and sent as a single digest. Recipients with
+    identical pending alerts share one Brevo request, and all requests go
+    through brevo_service's pooled client with retries.
+
+    Image alerts can carry their thumbnail task; thumbnails are read when the
+    email is sent (waiting up to `ALERT_THUMBNAIL_WAIT`), not when it is queued.
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.ALERT_QUEUE_SIZE)
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.first_pending_at: Dict[str, float] = {}
+        self.last_sent_at: Dict[str, float] = {}
+        self.thumbnails: Dict[Any, asyncio.Task] = {}
+        self.stats = {"queued": 0, "dropped": 0, "emails": 0, "digests": 0, "failed": 0}
+        self._task: Optional[asyncio.Task] = None
+        self._sending: set = set()
+        self._stopping = False
+
+    @staticmethod
+    def _key(incident: Dict[str, Any]):
+        return incident.get("id") or id(incident)
+
+    def enqueue(self, incident: Dict[str, Any], recipients: Optional[List[str]] = None,
+                thumbnails: Optional[asyncio.Task] = None) -> bool:
+        """
+        Queue an alert for the given (default: ALERT_EMAILS) recipients. Returns False if dropped.
+
+        `thumbnails` is the derivative_service task of the incident's image, if any.
+        """
+        recipients = recipients if recipients is not None else config.ALERT_EMAILS
+        if not recipients:
+            print("⚠️  No email recipients configured (set ALERT_EMAILS in .env)")
+            return False
+        try:
+            self.queue.put_nowait((incident, list(recipients), thumbnails))
+            self.stats["queued"] += 1
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            print(f"⚠️  Alert queue full - dropping alert for incident {incident.get('id')}")
+            return False
+
+    def start(self):
+        """Start the dispatcher (call from the running event loop)."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker and send whatever is still pending."""
+        if self._task:
+            # wait_for can swallow a cancel that races with queue.get(), so also flag the loop
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._drain_queue()
+        self._flush(force=True)
+        await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _add(self, incident: Dict[str, Any], recipients: List[str], thumbnails: Optional[asyncio.Task] = None):
+        now = time.monotonic()
+        if thumbnails is not None:
+            self.thumbnails[self._key(incident)] = thumbnails
+        for recipient in recipients:
+            self.pending.setdefault(recipient, []).append(incident)
+            self.first_pending_at.setdefault(recipient, now)
+
+    def _drain_queue(self):
+        while not self.queue.empty():
+            self._add(*self.queue.get_nowait())
+
+    async def _run(self):
+        tick = min(1.0, config.ALERT_BATCH_WINDOW) or 1.0
+        while not self._stopping:
+            try:
+                self._add(*await asyncio.wait_for(self.queue.get(), timeout=tick))
+            except asyncio.TimeoutError:
+                pass
+            self._drain_queue()
+            try:
+                self._flush()
+            except Exception as e:
+                print(f"⚠️  Alert dispatch failed: {e}")
+
+    def _due(self, recipient: str, now: float) -> bool:
+        if now - self.first_pending_at[recipient] < config.ALERT_BATCH_WINDOW:
+            return False
+        return now - self.last_sent_at.get(recipient, float("-inf")) >= config.ALERT_MIN_INTERVAL
+
+    def _flush(self, force: bool = False):
+        """Start sends for every due recipient (sends run as tasks so retries never stall the queue)."""
+        now = time.monotonic()
+        due = [r for r in self.pending if force or self._due(r, now)]
+        if not due:
+            return
+
+        # Recipients waiting on exactly the same alerts share one request
+        groups: Dict[tuple, List[str]] = {}
+        for recipient in due:
+            key = tuple(self._key(incident) for incident in self.pending[recipient])
+            groups.setdefault(key, []).append(recipient)
+
+        for recipients in groups.values():
+            incidents = self.pending[recipients[0]]
+            for recipient in recipients:
+                del self.pending[recipient]
+                del self.first_pending_at[recipient]
+                self.last_sent_at[recipient] = now
+            thumbnails = [self.thumbnails.get(self._key(incident)) for incident in incidents]
+            task = asyncio.create_task(self._send(incidents, recipients, thumbnails))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+        # Forget thumbnail tasks no pending alert refers to any more
+        waiting = {self._key(incident) for incidents in self.pending.values() for incident in incidents}
+        for key in [key for key in self.thumbnails if key not in waiting]:
+            del self.thumbnails[key]
+
+    async def _with_thumbnails(self, incident: Dict[str, Any], task: Optional[asyncio.Task]) -> Dict[str, Any]:
+        if task is None or incident.get("thumbnails"):
+            return incident
+        thumbnails = await derivative_service.wait(task, config.ALERT_THUMBNAIL_WAIT)
+        return {**incident, "thumbnails": thumbnails} if thumbnails else incident
+
+    async def _send(self, incidents: List[Dict[str, Any]], recipients: List[str],
+                    thumbnails: List[Optional[asyncio.Task]]):
+        incidents = await asyncio.gather(*(
+            self._with_thumbnails(incident, task) for incident, task in zip(incidents, thumbnails)
+        ))
+        if len(incidents) == 1:
+            print(f"📧 Sending email alert to {len(recipients)} recipient(s)...")
+            sent = await brevo_service.send_incident_alert(incidents[0], recipients)
+        else:
+            print(f"📧 Sending digest of {len(incidents)} alerts to {len(recipients)} recipient(s)...")
+            sent = await brevo_service.send_digest_alert(incidents, recipients)
+            self.stats["digests"] += int(sent)
+        self.stats["emails"] += int(sent)
+        self.stats["failed"] += int(not sent)
+
+alert_dispatcher = AlertDispatcher()
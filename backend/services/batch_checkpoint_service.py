@@ -0,0 +1,128 @@
+"""
+Batch Checkpoint Service
+Persists per-item state of batch uploads so interrupted batches resume instead of starting over
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from config import config
+from typing import Dict, Any, Optional, Iterable
+
+BATCH_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class BatchCheckpoint:
+    """
+    State of one batch, keyed by each item's content hash: pending, done or
+    failed, with the resulting incident. Each change is appended to
+    `<BATCH_CHECKPOINT_DIR>/<batch_id>.jsonl`; the last record per item wins.
+    """
+
+    def __init__(self, batch_id: str, path: str):
+        self.batch_id = batch_id
+        self.path = path
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash
+                self.items[entry["sha256"]] = entry
+        # Compact to one record per item
+        with open(self.path, "w", encoding="utf-8") as f:
+            for entry in self.items.values():
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def finished(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """The item's record if it already completed successfully."""
+        entry = self.items.get(sha256)
+        return entry if entry and entry["status"] == "done" else None
+
+    def mark(self, sha256: str, filename: str, status: str,
+             incident: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        entry = {
+            "sha256": sha256,
+            "filename": filename,
+            "status": status,
+            "incident_id": (incident or {}).get("id"),
+            "incident": incident,
+            "error": error,
+            "updated_at": time.time()
+        }
+        self.items[sha256] = entry
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "done": 0, "failed": 0}
+        for entry in self.items.values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+class BatchCheckpointService:
+    """
+    Batch IDs are chosen by the client (?batch_id=) or derived from the
+    content. Re-submitting the same files or archive therefore maps to the
+    same checkpoint, and only unfinished items are analyzed again. Items
+    left "pending" by a restart or a dropped connection are retried.
+    Requests working on the same batch share one checkpoint object.
+    """
+
+    def __init__(self):
+        self.directory = config.BATCH_CHECKPOINT_DIR
+        self._open: Dict[str, BatchCheckpoint] = {}
+        self._users: Dict[str, int] = {}
+
+    @staticmethod
+    def batch_id_for(hashes: Iterable[str]) -> str:
+        """Deterministic batch ID for a set of item hashes (order does not matter)."""
+        return hashlib.sha256("\n".join(sorted(hashes)).encode()).hexdigest()[:32]
+
+    def _path(self, batch_id: str) -> str:
+        if not BATCH_ID_PATTERN.match(batch_id):
+            raise ValueError("batch_id may only contain letters, digits, '-' and '_' (max 64)")
+        return os.path.join(self.directory, f"{batch_id}.jsonl")
+
+    def open(self, batch_id: str) -> BatchCheckpoint:
+        """
+        Load (or create) a batch checkpoint; pair every call with `close()`.
+
+        Raises:
+            ValueError: If the batch ID is malformed
+        """
+        path = self._path(batch_id)
+        if batch_id not in self._open:
+            self._open[batch_id] = BatchCheckpoint(batch_id, path)
+        self._users[batch_id] = self._users.get(batch_id, 0) + 1
+        return self._open[batch_id]
+
+    def close(self, checkpoint: BatchCheckpoint):
+        batch_id = checkpoint.batch_id
+        self._users[batch_id] = self._users.get(batch_id, 1) - 1
+        if self._users[batch_id] <= 0:
+            self._users.pop(batch_id, None)
+            self._open.pop(batch_id, None)
+
+    def get(self, batch_id: str) -> Optional[BatchCheckpoint]:
+        """
+        Checkpoint of an existing batch, or None.
+
+        Raises:
+            ValueError: If the batch ID is malformed
+        """
+        path = self._path(batch_id)
+        if batch_id in self._open:
+            return self._open[batch_id]
+        if not os.path.exists(path):
+            return None
+        return BatchCheckpoint(batch_id, path)
+
+batch_checkpoint_service = BatchCheckpointService()
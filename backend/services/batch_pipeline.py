@@ -0,0 +1,207 @@
+"""
+Batch Ingestion Pipeline
+Analyzes many images with bounded concurrency and yields each result as soon as it is ready
+"""
+import asyncio
+import random
+import time
+from config import config
+from services.gemini_service import gemini_service
+from services.qdrant_service import qdrant_service
+from services.firestore_service import firestore_service
+from services.storage_service import storage_service
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.derivative_service import derivative_service
+from services.alert_dispatcher import alert_dispatcher
+from services.batch_checkpoint_service import BatchCheckpoint
+from utils.format_utils import determine_urgency, format_incident_response
+from utils.image_utils import probe_image
+from utils.process_pool import run_in_process
+from utils.upload_utils import UploadBuffer
+from websocket_manager import broadcast_new_incident
+from typing import Dict, Any, Optional, AsyncIterable, AsyncIterator, Tuple
+
+class BatchItem:
+    """One file of a batch: its bytes, or the error that prevented reading it."""
+
+    def __init__(self, filename: Optional[str], upload: Optional[UploadBuffer] = None,
+                 error: Optional[Exception] = None):
+        self.filename = filename or "upload"
+        self.upload = upload
+        self.error = error
+
+class BatchPipeline:
+    """
+    `stream()` pulls the next item only once one of BATCH_CONCURRENCY slots is
+    free, so a source (e.g. an archive being unpacked) is never read further
+    ahead than it is analyzed. It yields ("result", ...) for each file in completion order, then one
+    ("summary", ...) with counts and throughput. EXIF and image decoding
+    run in the shared process pool. Qdrant points go through the buffered
+    upsert, so concurrent files share round trips.
+
+    With a checkpoint, items that already finished in an earlier run of the
+    same batch are answered from it (`"resumed": true`) without being
+    analyzed again, and every outcome is recorded as it happens.
+    """
+
+    async def process(self, item: BatchItem) -> Dict[str, Any]:
+        """Analyze and store one file; failures are reported, never raised."""
+        thumbnails_task = None
+        try:
+            if item.error is not None:
+                raise item.error
+            upload = item.upload
+            thumbnails_task = derivative_service.schedule(upload.data, upload.sha256)
+
+            # EXIF/decoding (process pool), Gemini analysis and storage upload run concurrently
+            probe, analysis, image_url = await asyncio.gather(
+                run_in_process(probe_image, upload.data),
+                gemini_service.analyze_image(upload.data, upload.image_mime_type),
+                storage_service.upload_image(upload.data, upload.image_mime_type, item.filename, upload.sha256)
+            )
+            if probe["gps"]:
+                lat, lng = probe["gps"]
+            else:
+                lat = 25.2048 + random.uniform(-0.1, 0.1)
+                lng = 55.2708 + random.uniform(-0.1, 0.1)
+
+            urgency = determine_urgency(
+                analysis['confidence'],
+                analysis['type'],
+                analysis.get('people_affected', 0)
+            )
+
+            embedding_text = f"{analysis['type']} {analysis['description']}"
+            embedding = await gemini_service.generate_embedding(embedding_text)
+
+            incident_data = {
+                "type": analysis['type'],
+                "lat": lat,
+                "lng": lng,
+                "confidence": analysis['confidence'],
+                "urgency": urgency,
+                "description": analysis['description'],
+                "people_affected": analysis.get('people_affected', 0),
+                "image_url": image_url,
+                "location_text": None,
+                "status": "new"
+            }
+            incident_data["event_id"] = clustering_service.assign(incident_data, embedding)
+
+            incident_id = await firestore_service.store_incident(incident_data)
+            derivative_service.attach(incident_id, thumbnails_task)
+            if embedding is None:
+                embedding_backfill_service.defer(incident_id, embedding_text, dict(incident_data))
+            else:
+                await qdrant_service.store_embedding(incident_id, embedding, dict(incident_data))
+
+            incident_data['id'] = incident_id
+            response = format_incident_response(incident_data)
+            await broadcast_new_incident(response)
+
+            # High-urgency alerts from one batch are coalesced into a digest
+            if urgency == "high":
+                alert_dispatcher.enqueue(response, thumbnails=thumbnails_task)
+
+            return {"filename": item.filename, "success": True, "incident": response}
+
+        except Exception as e:
+            derivative_service.cancel(thumbnails_task)
+            return {"filename": item.filename, "success": False, "error": str(e)}
+
+    async def process_checkpointed(self, item: BatchItem, checkpoint: Optional[BatchCheckpoint]) -> Dict[str, Any]:
+        """Process one item unless the checkpoint says it already succeeded."""
+        if checkpoint is None or item.upload is None:
+            return await self.process(item)
+
+        sha256 = item.upload.sha256
+        finished = checkpoint.finished(sha256)
+        if finished:
+            return {"filename": item.filename, "success": True, "incident": finished["incident"], "resumed": True}
+
+        checkpoint.mark(sha256, item.filename, "pending")
+        result = await self.process(item)
+        checkpoint.mark(
+            sha256, item.filename, "done" if result["success"] else "failed",
+            incident=result.get("incident"), error=result.get("error")
+        )
+        return result
+
+    async def stream(self, items: AsyncIterable[BatchItem],
+                     checkpoint: Optional[BatchCheckpoint] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ("result", {...}) per file as it finishes, then ("summary", {...})."""
+        started = time.perf_counter()
+        slots = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+        finished: asyncio.Queue = asyncio.Queue()
+        running: set = set()
+        source_error: Optional[str] = None
+
+        async def work(index: int, item: BatchItem):
+            try:
+                finished.put_nowait({"index": index, **await self.process_checkpointed(item, checkpoint)})
+            finally:
+                slots.release()
+
+        async def feed():
+            nonlocal source_error
+            source = items.__aiter__()
+            try:
+                index = 0
+                while True:
+                    # Take a slot before reading the next item, so the source is never read ahead
+                    await slots.acquire()
+                    try:
+                        item = await source.__anext__()
+                    except StopAsyncIteration:
+                        slots.release()
+                        break
+                    task = asyncio.create_task(work(index, item))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    index += 1
+            except Exception as e:
+                print(f"❌ Batch source failed: {e}")
+                source_error = str(e)
+            finally:
+                await asyncio.gather(*list(running), return_exceptions=True)
+                # Run the source's cleanup now, not whenever the generator is collected
+                aclose = getattr(source, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                finished.put_nowait(None)
+
+        feeder = asyncio.create_task(feed())
+        total = successful = resumed = 0
+        try:
+            while (result := await finished.get()) is not None:
+                total += 1
+                successful += int(result["success"])
+                resumed += int(result.get("resumed", False))
+                yield "result", result
+        finally:
+            # Client went away mid-stream: stop pulling and analyzing files
+            feeder.cancel()
+            for task in list(running):
+                task.cancel()
+            # Wait until the source is closed, so callers can release what it reads from
+            await asyncio.gather(feeder, *list(running), return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "total": total,
+            "successful": successful,
+            "failed": total - successful,
+            "resumed": resumed,
+            "concurrency": config.BATCH_CONCURRENCY,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "files_per_second": round(total / elapsed, 2) if elapsed > 0 else None
+        }
+        if checkpoint is not None:
+            summary["batch_id"] = checkpoint.batch_id
+        if source_error:
+            summary["error"] = source_error
+        print(f"📦 Batch done: {successful}/{total} files in {elapsed:.1f}s, {resumed} resumed ({summary['files_per_second']} files/s)")
+        yield "summary", summary
+
+batch_pipeline = BatchPipeline()
@@ -3,9 +3,10 @@ Brevo (formerly Sendinblue) Email Notification Service
 Sends email alerts for high-urgency incidents
 """
 
+import asyncio
 import httpx
 from config import config
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import os
 
 class BrevoService:
@@ -15,9 +16,76 @@ class BrevoService:
         self.sender_name = os.getenv("BREVO_SENDER_NAME", "RescueLena Alert System")
         self.base_url = "https://api.brevo.com/v3"
         
+        self._client: Optional[httpx.AsyncClient] = None
+        
         if not self.api_key:
             print("Warning: Brevo API key not configured. Email notifications disabled.")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived keep-alive client, so alerts reuse one TLS connection."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "api-key": self.api_key or "",
+                    "Content-Type": "application/json"
+                },
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+            )
+        return self._client
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def send_email(self, recipients: List[str], subject: str, html_content: str, text_content: str) -> bool:
+        """
+        Send one email via the Brevo API, retrying rate limits (429) and server errors.
+        
+        Returns:
+            bool: True if email sent successfully
+        """
+        if not self.api_key or not recipients:
+            return False
+        
+        payload = {
+            "sender": {
+                "name": self.sender_name,
+                "email": self.sender_email
+            },
+            "to": [{"email": email} for email in recipients],
+            "subject": subject,
+            "htmlContent": html_content,
+            "textContent": text_content
+        }
+        
+        delay = 1.0
+        for attempt in range(1, config.ALERT_MAX_RETRIES + 2):
+            try:
+                response = await self.client.post("/smtp/email", json=payload)
+                if response.status_code == 201:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    print(f"❌ Failed to send email: {response.status_code} - {response.text}")
+                    return False
+                # Honour Retry-After on rate limits, otherwise back off exponentially
+                retry_after = response.headers.get("Retry-After")
+                wait = float(retry_after) if retry_after and retry_after.isdigit() else delay
+                print(f"⚠️  Brevo returned {response.status_code} (attempt {attempt}), retrying in {wait:.0f}s")
+            except httpx.HTTPError as e:
+                wait = delay
+                print(f"⚠️  Brevo request failed (attempt {attempt}): {e}")
+            if attempt > config.ALERT_MAX_RETRIES:
+                break
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, 60.0)
+        
+        print(f"❌ Giving up on email to {len(recipients)} recipient(s)")
+        return False
+    
     async def send_incident_alert(
         self, 
         incident: Dict[str, Any], 
@@ -43,38 +111,10 @@ class BrevoService:
             html_content = self._generate_email_html(incident)
             text_content = self._generate_email_text(incident)
             
-            # Prepare API request
-            headers = {
-                "api-key": self.api_key,
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "sender": {
-                    "name": self.sender_name,
-                    "email": self.sender_email
-                },
-                "to": [{"email": email} for email in recipients],
-                "subject": subject,
-                "htmlContent": html_content,
-                "textContent": text_content
-            }
-            
-            # Send email via Brevo API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/smtp/email",
-                    headers=headers,
-                    json=payload,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 201:
-                    print(f"✅ Email alert sent for incident {incident.get('id', 'unknown')}")
-                    return True
-                else:
-                    print(f"❌ Failed to send email: {response.status_code} - {response.text}")
-                    return False
+            sent = await self.send_email(recipients, subject, html_content, text_content)
+            if sent:
+                print(f"✅ Email alert sent for incident {incident.get('id', 'unknown')}")
+            return sent
                     
         except Exception as e:
             print(f"Error sending email alert: {e}")
@@ -88,6 +128,10 @@ class BrevoService:
             "low": "#22c55e"
         }.get(incident.get('urgency', 'low'), "#6b7280")
         
+        # Embed the medium WebP thumbnail and link to the full-size original
+        image_url = incident.get('image_url') or ''
+        preview_url = (incident.get('thumbnails') or {}).get('medium') or image_url
+        
         return f"""
 <!DOCTYPE html>
 <html>
@@ -140,8 +184,8 @@ class BrevoService:
         </table>
         
         {f'''<div style="margin-top: 20px;">
-            <img src="{incident.get('image_url')}" alt="Incident Image" style="width: 100%; max-width: 600px; height: auto; border-radius: 8px; border: 1px solid #e5e7eb; display: block;">
-        </div>''' if incident.get('image_url') and not incident.get('image_url', '').startswith('local://') else ''}
+            <a href="{image_url}"><img src="{preview_url}" alt="Incident Image" style="width: 100%; max-width: 600px; height: auto; border-radius: 8px; border: 1px solid #e5e7eb; display: block;"></a>
+        </div>''' if preview_url and not preview_url.startswith('local://') else ''}
         
         <div style="margin-top: 20px; padding: 15px; background-color: white; border-left: 4px solid {urgency_color}; border-radius: 4px;">
             <p style="margin: 0; font-weight: bold; color: #1f2937;">Description:</p>
@@ -188,5 +232,79 @@ Location: {incident.get('location_text', 'Unknown')}
         text += f"\n---\nThis is an automated alert from RescueLena AI Disaster Response System\n"
         
         return text
+    
+    async def send_digest_alert(self, incidents: List[Dict[str, Any]], recipients: List[str]) -> bool:
+        """Send one email summarizing several incidents (used during alert bursts)."""
+        if not self.api_key or not recipients or not incidents:
+            return False
+        
+        try:
+            subject = f"🚨 RescueLena: {len(incidents)} high-priority incidents"
+            sent = await self.send_email(
+                recipients,
+                subject,
+                self._generate_digest_html(incidents),
+                self._generate_digest_text(incidents)
+            )
+            if sent:
+                print(f"✅ Digest email sent ({len(incidents)} incidents, {len(recipients)} recipient(s))")
+            return sent
+        except Exception as e:
+            print(f"Error sending digest alert: {e}")
+            return False
+    
+    def _generate_digest_html(self, incidents: List[Dict[str, Any]]) -> str:
+        """Generate HTML digest: one compact row per incident."""
+        rows = ""
+        for incident in incidents:
+            thumbnail = (incident.get('thumbnails') or {}).get('small') or ''
+            image_cell = f'<img src="{thumbnail}" alt="" width="80" style="border-radius: 4px; display: block;">' if thumbnail and not thumbnail.startswith('local://') else ''
+            rows += f"""
+            <tr style="border-bottom: 1px solid #e5e7eb;">
+                <td style="padding: 8px; width: 88px;">{image_cell}</td>
+                <td style="padding: 8px;">
+                    <strong>{incident.get('type', 'Unknown').replace('_', ' ').title()}</strong>
+                    ({incident.get('urgency', 'unknown').upper()}, {int(incident.get('confidence', 0) * 100)}%)<br>
+                    <span style="color: #4b5563;">{incident.get('location_text', 'Unknown')}</span><br>
+                    <span style="color: #6b7280; font-size: 12px;">{incident.get('timestamp', '')}</span>
+                </td>
+            </tr>"""
+        
+        return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+    <div style="background-color: #ef4444; color: white; padding: 20px; border-radius: 8px 8px 0 0;">
+        <h1 style="margin: 0; font-size: 24px;">🚨 RescueLena Alert Digest</h1>
+        <p style="margin: 5px 0 0 0; font-size: 14px;">{len(incidents)} high-priority incidents reported</p>
+    </div>
+    <div style="background-color: #f9fafb; padding: 20px; border: 1px solid #e5e7eb; border-top: none; border-radius: 0 0 8px 8px;">
+        <table style="width: 100%; border-collapse: collapse;">{rows}
+        </table>
+        <div style="margin-top: 30px; text-align: center;">
+            <a href="http://localhost:3000/dashboard" style="display: inline-block; background-color: #ef4444; color: white; padding: 12px 30px; text-decoration: none; border-radius: 6px; font-weight: bold;">
+                View on Dashboard
+            </a>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    
+    def _generate_digest_text(self, incidents: List[Dict[str, Any]]) -> str:
+        """Generate plain text digest."""
+        text = f"🚨 RESCUELENA ALERT DIGEST - {len(incidents)} high-priority incidents\n\n"
+        for incident in incidents:
+            text += (
+                f"- {incident.get('type', 'Unknown').replace('_', ' ').title()} "
+                f"({incident.get('urgency', 'unknown').upper()}) at {incident.get('location_text', 'Unknown')}, "
+                f"{incident.get('timestamp', '')}\n"
+            )
+        text += f"\nView on Dashboard: http://localhost:3000/dashboard\n"
+        return text
 
 brevo_service = BrevoService()
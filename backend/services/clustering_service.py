@@ -0,0 +1,287 @@
+"""
+Incident Clustering Service
+Groups incoming incident reports into events as they are created
+"""
+import numpy as np
+from config import config
+from utils.geo_utils import EARTH_RADIUS_M
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+import time
+import uuid
+
+URGENCY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+class IncidentClusteringService:
+    """
+    Incremental DBSCAN-style clustering over time, location and embedding similarity.
+
+    Recent incidents live in fixed-size NumPy ring buffers, so each insert is one
+    vectorized pass over at most `capacity` rows and maintenance cost stays
+    constant per insert. Two incidents are neighbours when they are reported
+    within `window_s` of each other and either:
+    - both have coordinates within `eps_m` and similar embeddings
+      (or the same type when an embedding is missing), or
+    - one has no coordinates and their embeddings are very similar.
+
+    A new incident joins the event of its neighbours; when its neighbours belong
+    to several events those events are merged (union-find), as DBSCAN would
+    connect density-reachable points.
+    """
+
+    def __init__(
+        self,
+        capacity: int = None,
+        eps_m: float = None,
+        window_s: float = None,
+        min_similarity: float = None,
+        dim: int = None
+    ):
+        self.capacity = capacity or config.CLUSTER_CAPACITY
+        self.eps_m = eps_m or config.CLUSTER_EPS_M
+        self.window_s = window_s or config.CLUSTER_WINDOW_HOURS * 3600
+        self.min_similarity = min_similarity or config.CLUSTER_MIN_SIMILARITY
+        # Without a location, only near-identical descriptions are linked
+        self.text_only_similarity = min(0.99, self.min_similarity + 0.07)
+        self.dim = dim or config.EMBEDDING_DIM
+
+        self._lat = np.zeros(self.capacity, dtype=np.float64)
+        self._lng = np.zeros(self.capacity, dtype=np.float64)
+        self._ts = np.zeros(self.capacity, dtype=np.float64)
+        self._type = np.zeros(self.capacity, dtype=np.int32)
+        self._has_loc = np.zeros(self.capacity, dtype=bool)
+        self._has_emb = np.zeros(self.capacity, dtype=bool)
+        self._emb = np.zeros((self.capacity, self.dim), dtype=np.float32)
+        self._event = [None] * self.capacity
+        self._size = 0
+        self._next = 0
+
+        self._type_codes: Dict[str, int] = {}
+        self._parent: Dict[str, str] = {}
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self._inserts_since_prune = 0
+
+    def _find(self, event_id: str) -> str:
+        """Resolve an event ID to its current (merged) event ID."""
+        root = event_id
+        while self._parent.get(root, root) != root:
+            root = self._parent[root]
+        # Path compression
+        while event_id != root:
+            parent = self._parent[event_id]
+            self._parent[event_id] = root
+            event_id = parent
+        return root
+
+    def resolve(self, event_id: Optional[str]) -> Optional[str]:
+        """Public alias of _find that tolerates missing IDs."""
+        if not event_id:
+            return None
+        return self._find(event_id)
+
+    def resolve_incident(self, incident: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        A stored incident with its event_id followed through later merges.
+
+        assign() writes the event ID at creation; when that event is absorbed
+        into another one, Firestore and Qdrant still hold the old ID.
+        """
+        event_id = self.resolve(incident.get("event_id"))
+        if event_id == incident.get("event_id"):
+            return incident
+        return {**incident, "event_id": event_id}
+
+    def _type_code(self, incident_type: Optional[str]) -> int:
+        key = incident_type or "unknown"
+        if key not in self._type_codes:
+            self._type_codes[key] = len(self._type_codes) + 1
+        return self._type_codes[key]
+
+    def _neighbour_mask(
+        self,
+        lat: Optional[float],
+        lng: Optional[float],
+        ts: float,
+        type_code: int,
+        unit: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Vectorized neighbour test against every buffered incident."""
+        n = self._size
+        in_window = np.abs(self._ts[:n] - ts) <= self.window_s
+
+        if unit is not None:
+            sims = self._emb[:n] @ unit
+            has_emb = self._has_emb[:n]
+        else:
+            sims = np.zeros(n, dtype=np.float32)
+            has_emb = np.zeros(n, dtype=bool)
+
+        similar = has_emb & (sims >= self.min_similarity)
+        same_type = self._type[:n] == type_code
+
+        if lat is not None and lng is not None:
+            lat1 = np.radians(lat)
+            lat2 = np.radians(self._lat[:n])
+            dlat = lat2 - lat1
+            dlng = np.radians(self._lng[:n] - lng)
+            a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+            dist = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+            near = self._has_loc[:n] & (dist <= self.eps_m)
+            located_match = near & np.where(has_emb, similar, same_type)
+            unlocated_match = ~self._has_loc[:n] & has_emb & (sims >= self.text_only_similarity)
+            return in_window & (located_match | unlocated_match)
+
+        return in_window & has_emb & (sims >= self.text_only_similarity)
+
+    def assign(self, incident_data: Dict[str, Any], embedding: Optional[List[float]] = None) -> str:
+        """
+        Assign an incident to an event and record it in the stream.
+
+        Args:
+            incident_data: Incident fields (type, lat/lng, urgency, timestamp, ...)
+            embedding: Incident embedding, or None if unavailable
+
+        Returns:
+            str: Event ID the incident belongs to
+        """
+        lat = incident_data.get("lat", incident_data.get("latitude"))
+        lng = incident_data.get("lng", incident_data.get("longitude"))
+        ts = self._timestamp(incident_data.get("timestamp"))
+        type_code = self._type_code(incident_data.get("type"))
+
+        unit = None
+        if embedding is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                unit = vector / norm
+
+        event_id = None
+        if self._size:
+            mask = self._neighbour_mask(lat, lng, ts, type_code, unit)
+            neighbour_events = {self._find(self._event[i]) for i in np.flatnonzero(mask)}
+            if neighbour_events:
+                # Merge into the largest event so most stored event IDs stay roots
+                event_id = max(neighbour_events, key=lambda e: self.events[e]["incident_count"])
+                for other in neighbour_events - {event_id}:
+                    self._merge(other, event_id)
+
+        if event_id is None:
+            event_id = str(uuid.uuid4())
+            self._parent[event_id] = event_id
+            self.events[event_id] = {
+                "event_id": event_id,
+                "incident_count": 0,
+                "types": {},
+                "urgency": "low",
+                "_lat_sum": 0.0,
+                "_lng_sum": 0.0,
+                "_located": 0,
+                "first_seen": ts,
+                "last_seen": ts,
+                "description": incident_data.get("description")
+            }
+
+        self._insert(lat, lng, ts, type_code, unit, event_id)
+        self._update_event(event_id, incident_data, lat, lng, ts)
+        self._maybe_prune()
+        return event_id
+
+    def _insert(self, lat, lng, ts, type_code, unit, event_id):
+        """Write one incident into the ring buffers, overwriting the oldest row."""
+        i = self._next
+        self._has_loc[i] = lat is not None and lng is not None
+        self._lat[i] = lat if lat is not None else 0.0
+        self._lng[i] = lng if lng is not None else 0.0
+        self._ts[i] = ts
+        self._type[i] = type_code
+        self._has_emb[i] = unit is not None
+        self._emb[i] = unit if unit is not None else 0.0
+        self._event[i] = event_id
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _update_event(self, event_id, incident_data, lat, lng, ts):
+        event = self.events[event_id]
+        event["incident_count"] += 1
+        incident_type = incident_data.get("type") or "unknown"
+        event["types"][incident_type] = event["types"].get(incident_type, 0) + 1
+
+        urgency = incident_data.get("urgency")
+        if URGENCY_RANK.get(urgency, -1) > URGENCY_RANK.get(event["urgency"], -1):
+            event["urgency"] = urgency
+
+        if lat is not None and lng is not None:
+            event["_lat_sum"] += lat
+            event["_lng_sum"] += lng
+            event["_located"] += 1
+
+        event["first_seen"] = min(event["first_seen"], ts)
+        event["last_seen"] = max(event["last_seen"], ts)
+
+    def _merge(self, source: str, target: str):
+        """Fold event `source` into event `target`."""
+        self._parent[source] = target
+        src = self.events.pop(source)
+        dst = self.events[target]
+        dst["incident_count"] += src["incident_count"]
+        for incident_type, count in src["types"].items():
+            dst["types"][incident_type] = dst["types"].get(incident_type, 0) + count
+        if URGENCY_RANK.get(src["urgency"], -1) > URGENCY_RANK.get(dst["urgency"], -1):
+            dst["urgency"] = src["urgency"]
+        dst["_lat_sum"] += src["_lat_sum"]
+        dst["_lng_sum"] += src["_lng_sum"]
+        dst["_located"] += src["_located"]
+        dst["first_seen"] = min(dst["first_seen"], src["first_seen"])
+        dst["last_seen"] = max(dst["last_seen"], src["last_seen"])
+
+    def _maybe_prune(self):
+        """Drop events that have been quiet for longer than the retention period."""
+        self._inserts_since_prune += 1
+        if self._inserts_since_prune < 1000:
+            return
+        self._inserts_since_prune = 0
+
+        cutoff = time.time() - config.CLUSTER_RETENTION_HOURS * 3600
+        live = {self._find(e) for e in self._event[:self._size] if e}
+        for event_id in [e for e, ev in self.events.items() if ev["last_seen"] < cutoff and e not in live]:
+            del self.events[event_id]
+        self._parent = {e: p for e, p in self._parent.items() if self._find(p) in self.events}
+
+    @staticmethod
+    def _timestamp(value) -> float:
+        if isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value)
+                if parsed.tzinfo is None:
+                    # Stored timestamps are naive UTC (datetime.utcnow().isoformat())
+                    parsed = parsed.replace(tzinfo=timezone.utc)
+                return parsed.timestamp()
+            except ValueError:
+                pass
+        return time.time()
+
+    def get_events(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """Return the most recently active events, newest first."""
+        events = sorted(self.events.values(), key=lambda e: e["last_seen"], reverse=True)[:limit]
+        return [self._format_event(e) for e in events]
+
+    @staticmethod
+    def _format_event(event: Dict[str, Any]) -> Dict[str, Any]:
+        located = event["_located"]
+        return {
+            "event_id": event["event_id"],
+            "type": max(event["types"], key=event["types"].get),
+            "types": event["types"],
+            "incident_count": event["incident_count"],
+            "urgency": event["urgency"],
+            "latitude": event["_lat_sum"] / located if located else None,
+            "longitude": event["_lng_sum"] / located if located else None,
+            "description": event["description"],
+            "first_seen": datetime.utcfromtimestamp(event["first_seen"]).isoformat(),
+            "last_seen": datetime.utcfromtimestamp(event["last_seen"]).isoformat()
+        }
+
+clustering_service = IncidentClusteringService()
@@ -0,0 +1,81 @@
+"""
+Derivative Service
+Generates WebP thumbnails for uploaded images off the request path
+"""
+import asyncio
+from config import config
+from services.storage_service import storage_service
+from services.firestore_service import firestore_service
+from utils.image_utils import make_thumbnails
+from utils.process_pool import run_in_process
+from typing import Dict, Optional
+
+class DerivativeService:
+    """
+    Thumbnails are encoded in the shared process pool and stored next to the
+    original (`<sha256>_small.webp`, `<sha256>_medium.webp`). Routes start the
+    work as soon as the upload is read, so it overlaps Gemini analysis, and
+    attach it to the incident once its ID is known; the Firestore record gets
+    a `thumbnails` map when the variants are uploaded.
+    """
+
+    def __init__(self):
+        self.sizes = config.THUMBNAIL_SIZES
+        self.quality = config.THUMBNAIL_QUALITY
+        self._tasks: set = set()
+
+    def _keep(self, task: asyncio.Task) -> asyncio.Task:
+        # Hold a reference so background tasks are not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def schedule(self, data: bytes, sha256: str) -> Optional[asyncio.Task]:
+        """Start thumbnail generation in the background; the task resolves to {variant: url}."""
+        if not self.sizes:
+            return None
+        return self._keep(asyncio.create_task(self.generate(data, sha256)))
+
+    async def generate(self, data: bytes, sha256: str) -> Dict[str, str]:
+        try:
+            variants = await run_in_process(make_thumbnails, data, self.sizes, self.quality)
+            names = list(variants)
+            urls = await asyncio.gather(*(
+                storage_service.upload_variant(sha256, name, variants[name]) for name in names
+            ))
+            return dict(zip(names, urls))
+        except Exception as e:
+            print(f"⚠️  Thumbnail generation failed: {e}")
+            return {}
+
+    def attach(self, incident_id: str, task: Optional[asyncio.Task]):
+        """Record the thumbnails on the incident once they are ready."""
+        if task is not None:
+            self._keep(asyncio.create_task(self._store(incident_id, task)))
+
+    async def _store(self, incident_id: str, task: asyncio.Task):
+        thumbnails = await task
+        if thumbnails:
+            await firestore_service.update_incident(incident_id, {"thumbnails": thumbnails})
+
+    @staticmethod
+    def cancel(task: Optional[asyncio.Task]):
+        """Stop waiting for thumbnails that will not be used (duplicate or failed upload)."""
+        if task is not None and not task.done():
+            task.cancel()
+
+    @staticmethod
+    async def wait(task: Optional[asyncio.Task], timeout: float) -> Dict[str, str]:
+        """Thumbnails of the task, waiting at most `timeout` seconds ({} if not ready by then)."""
+        if task is not None and not task.done() and timeout > 0:
+            await asyncio.wait([task], timeout=timeout)
+        return DerivativeService.ready(task)
+
+    @staticmethod
+    def ready(task: Optional[asyncio.Task]) -> Dict[str, str]:
+        """Thumbnails of a finished task ({} while still running)."""
+        if task is not None and task.done() and not task.cancelled():
+            return task.result()
+        return {}
+
+derivative_service = DerivativeService()
@@ -0,0 +1,164 @@
+"""
+Document Cache Service
+Fingerprints analyzed documents so re-sent reports are answered without re-analysis
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from config import config
+from utils.fingerprint_utils import signature_similarity, lsh_keys
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+class DocumentCacheService:
+    """
+    Two levels, both persisted to one append-only JSONL file:
+
+    - Documents: raw-bytes SHA-256 and a MinHash signature of the extracted
+      text, with the response that was returned. The same bytes hit
+      `exact()`. A near-identical document (different export, a
+      re-saved PDF) is found by `similar()` through LSH buckets, with a
+      signature similarity of at least DOCUMENT_NEAR_DUP_THRESHOLD. Entries
+      expire after DOCUMENT_CACHE_TTL_HOURS.
+    - Chunks: Gemini analysis per normalized chunk text (LRU). A revised
+      report re-analyzes only the chunks whose text changed.
+    """
+
+    def __init__(self):
+        self.path = config.DOCUMENT_CACHE_PATH
+        self.documents: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.chunks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.buckets: Dict[str, set] = {}
+        self.stats = {"exact_hits": 0, "near_hits": 0, "chunk_hits": 0, "chunk_misses": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("kind") == "chunk":
+                    self._put_chunk(entry["key"], entry["analysis"])
+                else:
+                    self._put_document(entry)
+        self._expire()
+        # Compact to the live entries
+        with open(self.path, "w", encoding="utf-8") as f:
+            for key, analysis in self.chunks.items():
+                f.write(json.dumps({"kind": "chunk", "key": key, "analysis": analysis}, default=str) + "\n")
+            for entry in self.documents.values():
+                f.write(json.dumps(self._serializable(entry), default=str) + "\n")
+        if self.documents:
+            print(f"📚 Document cache: {len(self.documents)} documents, {len(self.chunks)} chunks")
+
+    @staticmethod
+    def _serializable(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in entry.items() if k != "signature_array"}
+
+    def _append(self, entry: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    # ---- documents ----------------------------------------------------------
+
+    def _put_document(self, entry: Dict[str, Any]):
+        self._drop_document(entry["sha256"])
+        entry["signature_array"] = np.asarray(entry["signature"], dtype=np.uint32)
+        self.documents[entry["sha256"]] = entry
+        for key in lsh_keys(entry["signature_array"]):
+            self.buckets.setdefault(key, set()).add(entry["sha256"])
+        while len(self.documents) > config.DOCUMENT_CACHE_SIZE:
+            self._drop_document(next(iter(self.documents)))
+
+    def _drop_document(self, sha256: str):
+        entry = self.documents.pop(sha256, None)
+        if entry is None:
+            return
+        for key in lsh_keys(entry["signature_array"]):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(sha256)
+                if not bucket:
+                    del self.buckets[key]
+
+    def _expire(self):
+        cutoff = time.time() - config.DOCUMENT_CACHE_TTL_HOURS * 3600
+        for sha256 in [sha for sha, entry in self.documents.items() if entry["created_at"] < cutoff]:
+            self._drop_document(sha256)
+
+    def exact(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Cached entry for byte-identical content."""
+        self._expire()
+        entry = self.documents.get(sha256)
+        if entry is not None:
+            self.stats["exact_hits"] += 1
+        return entry
+
+    def similar(self, signature: np.ndarray) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Most similar cached document at or above DOCUMENT_NEAR_DUP_THRESHOLD, with its similarity."""
+        self._expire()
+        candidates = set()
+        for key in lsh_keys(signature):
+            candidates |= self.buckets.get(key, set())
+
+        best, best_score = None, 0.0
+        for sha256 in candidates:
+            entry = self.documents[sha256]
+            score = signature_similarity(signature, entry["signature_array"])
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < config.DOCUMENT_NEAR_DUP_THRESHOLD:
+            return None
+        self.stats["near_hits"] += 1
+        return best, best_score
+
+    def remember(self, sha256: str, signature: np.ndarray, response: Dict[str, Any]):
+        """Cache a processed document's fingerprint and response."""
+        entry = {
+            "kind": "document",
+            "sha256": sha256,
+            "signature": signature.tolist(),
+            "response": response,
+            "reports": 1,
+            "created_at": time.time()
+        }
+        self._put_document(dict(entry))
+        self._append(entry)
+
+    def count_report(self, entry: Dict[str, Any]) -> int:
+        """Record another submission of a cached document; returns the new total."""
+        entry["reports"] = entry.get("reports", 1) + 1
+        self._append(self._serializable(entry))
+        return entry["reports"]
+
+    # ---- chunks -------------------------------------------------------------
+
+    def _put_chunk(self, key: str, analysis: Dict[str, Any]):
+        self.chunks[key] = analysis
+        self.chunks.move_to_end(key)
+        while len(self.chunks) > config.DOCUMENT_CHUNK_CACHE_SIZE:
+            self.chunks.popitem(last=False)
+
+    def chunk(self, key: str) -> Optional[Dict[str, Any]]:
+        analysis = self.chunks.get(key)
+        if analysis is None:
+            self.stats["chunk_misses"] += 1
+            return None
+        self.chunks.move_to_end(key)
+        self.stats["chunk_hits"] += 1
+        return dict(analysis)
+
+    def remember_chunk(self, key: str, analysis: Dict[str, Any]):
+        # Gemini's fallback answer (type "unknown") is not worth keeping
+        if analysis.get("type") in (None, "unknown"):
+            return
+        self._put_chunk(key, analysis)
+        self._append({"kind": "chunk", "key": key, "analysis": analysis})
+
+document_cache_service = DocumentCacheService()
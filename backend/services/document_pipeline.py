@@ -0,0 +1,312 @@
+"""
+Document Ingestion Pipeline
+Text extraction, Gemini analysis and storage for PDF, DOCX and TXT reports
+
+Pages are parsed in the process pool and streamed in order into a chunker.
+Each full chunk is analyzed by Gemini right away, while later pages are
+still being extracted (map). The chunk analyses are then merged into one
+incident per distinct type and location (reduce). A one-page note gives
+one incident; a long situation report can give several.
+
+Re-sent reports are answered from the document cache (see
+document_cache_service.py): byte-identical files before extraction,
+near-identical text (MinHash) right after it. Chunk analyses are cached
+too, so a revised report only sends its changed chunks to Gemini.
+"""
+from collections import deque
+from config import config
+from services.gemini_service import gemini_service
+from services.qdrant_service import qdrant_service
+from services.firestore_service import firestore_service
+from services.storage_service import storage_service
+from services.alert_dispatcher import alert_dispatcher
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.document_cache_service import document_cache_service
+from utils.document_utils import (
+    pdf_page_count, extract_pdf_pages, extract_text_from_docx, extract_text_from_txt, TextChunker
+)
+from utils.fingerprint_utils import minhash_signature, chunk_key
+from utils.format_utils import determine_urgency, format_incident_response
+from utils.pipeline import ProgressFn
+from utils.process_pool import run_in_process
+from utils.upload_utils import UploadBuffer
+from typing import Dict, Any, Optional, List, AsyncIterator
+from datetime import datetime
+import asyncio
+import random
+import re
+
+SUPPORTED_EXTENSIONS = ['pdf', 'docx', 'doc', 'txt']
+
+URGENCY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+async def iter_document_text(data: bytes, file_extension: str) -> AsyncIterator[str]:
+    """
+    Yield a document's text page by page (PDF) or whole (DOCX/TXT).
+
+    PDF page ranges of DOCUMENT_PAGES_PER_TASK are parsed in the process
+    pool, with at most DOCUMENT_EXTRACT_PARALLELISM ranges in flight, and
+    yielded in page order as soon as they are ready.
+    """
+    if file_extension in ['docx', 'doc']:
+        yield await run_in_process(extract_text_from_docx, data)
+        return
+    if file_extension != 'pdf':
+        yield extract_text_from_txt(data)
+        return
+
+    page_count = await run_in_process(pdf_page_count, data)
+    step = config.DOCUMENT_PAGES_PER_TASK
+    ranges = deque((start, min(start + step, page_count)) for start in range(0, page_count, step))
+    in_flight: deque = deque()
+    try:
+        while ranges or in_flight:
+            while ranges and len(in_flight) < config.DOCUMENT_EXTRACT_PARALLELISM:
+                in_flight.append(asyncio.ensure_future(run_in_process(extract_pdf_pages, data, *ranges.popleft())))
+            for page in await in_flight.popleft():
+                yield page
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+def _location_key(analysis: Dict[str, Any]) -> str:
+    location = re.sub(r"[^a-z0-9]+", " ", str(analysis.get('location_text') or "").lower()).strip()
+    return "" if location in ("", "unknown", "none", "n a") else location
+
+def _people(analysis: Dict[str, Any]) -> int:
+    try:
+        return int(analysis.get('people_affected') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def reduce_analyses(analyses: List[Dict[str, Any]], max_incidents: int) -> List[Dict[str, Any]]:
+    """
+    Merge chunk analyses that describe the same incident (same type and location).
+
+    Chunks without a location join an incident of the same type if there is
+    one. A merged incident keeps its most confident description. Its
+    `people_affected` is the largest reported count, because overlapping
+    chunks often restate the same figure. Failed chunk analyses (type
+    "unknown") are dropped unless nothing else was found.
+    """
+    known = [a for a in analyses if a.get('type') not in (None, 'unknown')] or analyses[:1]
+
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    unplaced = []
+    for analysis in known:
+        location = _location_key(analysis)
+        if location:
+            groups.setdefault((analysis['type'], location), []).append(analysis)
+        else:
+            unplaced.append(analysis)
+    for analysis in unplaced:
+        same_type = next((key for key in groups if key[0] == analysis['type']), (analysis['type'], ""))
+        groups.setdefault(same_type, []).append(analysis)
+
+    incidents = []
+    for group in groups.values():
+        best = max(group, key=lambda a: a.get('confidence') or 0)
+        incidents.append({**best, "people_affected": max(_people(a) for a in group), "chunks": len(group)})
+    incidents.sort(key=lambda a: -(a.get('confidence') or 0))
+    return incidents[:max_incidents]
+
+async def upload_document(upload: UploadBuffer) -> Optional[str]:
+    """Store the original document (optional - for record keeping)."""
+    try:
+        return await storage_service.upload_document(upload.data, upload.content_type, upload.filename, upload.sha256)
+    except Exception:
+        return None
+
+async def link_cached(entry: Dict[str, Any], match: str, similarity: float = 1.0) -> Dict[str, Any]:
+    """Answer a re-sent document with its earlier incidents and count the extra report on them."""
+    reports = document_cache_service.count_report(entry)
+    response = entry["response"]
+    now = datetime.utcnow().isoformat()
+    await asyncio.gather(*(
+        firestore_service.update_incident(incident["id"], {"report_count": reports, "last_reported_at": now})
+        for incident in response.get("incidents", [response])
+    ))
+    print(f"♻️  Document already analyzed ({match}, similarity {similarity:.2f}, {reports} reports)")
+    return {**response, "cached": True, "match": match, "similarity": round(similarity, 3), "report_count": reports}
+
+class DocumentPipeline:
+    async def analyze(self, upload: UploadBuffer, file_extension: str) -> Dict[str, Any]:
+        """
+        Extract the document page by page and analyze its chunks in parallel.
+
+        Chunks whose text was analyzed before are answered from the chunk
+        cache. If the finished text turns out to be near-identical to a
+        cached document, outstanding Gemini calls are cancelled.
+
+        Returns:
+            Dict with "analyses" (one per chunk), "pages", "chars", "signature"
+            and "duplicate" ((cache entry, similarity) for a near-identical document)
+
+        Raises:
+            ValueError: If no meaningful text could be extracted
+        """
+        chunker = TextChunker(config.DOCUMENT_CHUNK_CHARS)
+        slots = asyncio.Semaphore(config.DOCUMENT_ANALYSIS_CONCURRENCY)
+        tasks: List[asyncio.Task] = []
+        text: List[str] = []
+        pages = 0
+
+        async def analyze_chunk(chunk: str) -> Dict[str, Any]:
+            key = chunk_key(chunk)
+            cached = document_cache_service.chunk(key)
+            if cached is not None:
+                return cached
+            async with slots:
+                analysis = await gemini_service.analyze_text(chunk)
+            document_cache_service.remember_chunk(key, analysis)
+            return analysis
+
+        def dispatch(chunks: List[str]):
+            for chunk in chunks:
+                text.append(chunk)
+                tasks.append(asyncio.ensure_future(analyze_chunk(chunk)))
+
+        try:
+            async for page in iter_document_text(upload.data, file_extension):
+                pages += 1
+                dispatch(chunker.add(page))
+
+            if chunker.total_chars < 10:
+                raise ValueError("Could not extract meaningful text from document.")
+            dispatch(chunker.finish())
+            print(f"📄 Extracted {pages} page(s), {chunker.total_chars} chars -> {len(tasks)} chunk(s)")
+
+            signature = await run_in_process(minhash_signature, "\n".join(text))
+            duplicate = document_cache_service.similar(signature)
+            if duplicate is not None:
+                for task in tasks:
+                    task.cancel()
+                return {"analyses": [], "pages": pages, "chars": chunker.total_chars,
+                        "signature": signature, "duplicate": duplicate}
+
+            return {"analyses": await asyncio.gather(*tasks), "pages": pages, "chars": chunker.total_chars,
+                    "signature": signature, "duplicate": None}
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def run(self, upload: UploadBuffer, file_extension: str, on_stage: Optional[ProgressFn] = None) -> Dict[str, Any]:
+        """
+        Extract, analyze and store a report document.
+
+        Returns:
+            The most urgent incident (same shape as before), plus "incidents"
+            (every incident found) and "document" (page/chunk counts)
+
+        Raises:
+            ValueError: If no meaningful text could be extracted
+        """
+        async def progress(stage: str):
+            if on_stage is not None:
+                await on_stage(stage)
+
+        # Byte-identical resubmission: no extraction, analysis or storage at all
+        cached = document_cache_service.exact(upload.sha256)
+        if cached is not None:
+            return await link_cached(cached, "exact")
+
+        # The original document uploads to storage while it is being analyzed
+        upload_task = asyncio.ensure_future(upload_document(upload))
+        try:
+            extracted = await self.analyze(upload, file_extension)
+        except BaseException:
+            upload_task.cancel()
+            raise
+        await progress("extract")
+
+        if extracted["duplicate"] is not None:
+            upload_task.cancel()
+            entry, similarity = extracted["duplicate"]
+            return await link_cached(entry, "near_duplicate", similarity)
+
+        analyses = reduce_analyses(extracted["analyses"], config.DOCUMENT_MAX_INCIDENTS)
+        doc_url = await upload_task
+        await progress("analysis")
+
+        # One embedding request for every incident in the document
+        embedding_texts = [f"{analysis['type']} {analysis['description']}" for analysis in analyses]
+        embeddings = await gemini_service.generate_embeddings(embedding_texts) or [None] * len(analyses)
+        await progress("embedding")
+
+        incidents = []
+        for analysis, embedding in zip(analyses, embeddings):
+            # Determine urgency
+            urgency = determine_urgency(
+                analysis['confidence'],
+                analysis['type'],
+                analysis.get('people_affected', 0)
+            )
+
+            # Use default Dubai coordinates if no location found
+            lat = 25.2048 + random.uniform(-0.1, 0.1)
+            lng = 55.2708 + random.uniform(-0.1, 0.1)
+            location_name = analysis.get('location_text') or f"Document Report ({lat:.4f}, {lng:.4f})"
+
+            incident_data = {
+                "type": analysis['type'],
+                "lat": lat,
+                "lng": lng,
+                "latitude": lat,
+                "longitude": lng,
+                "confidence": analysis['confidence'],
+                "urgency": urgency,
+                "description": analysis['description'],
+                "people_affected": analysis.get('people_affected', 0),
+                "location": location_name,
+                "location_text": location_name,
+                "image_url": doc_url,  # Store document URL
+                "source": "document",
+                "document_name": upload.filename
+            }
+
+            # Group into an event with related reports
+            incident_data["event_id"] = clustering_service.assign(incident_data, embedding)
+            incidents.append(incident_data)
+
+        # Store in Firestore
+        incident_ids = await asyncio.gather(*(firestore_service.store_incident(data) for data in incidents))
+        await progress("firestore")
+
+        # Store embeddings in Qdrant (concurrent points share one buffered upsert)
+        stores = []
+        for incident_id, incident_data, embedding, text in zip(incident_ids, incidents, embeddings, embedding_texts):
+            if embedding is None:
+                embedding_backfill_service.defer(incident_id, text, incident_data)
+            else:
+                stores.append(qdrant_service.store_embedding(incident_id, embedding, incident_data))
+        await asyncio.gather(*stores)
+        await progress("qdrant")
+
+        responses = []
+        for incident_id, incident_data in zip(incident_ids, incidents):
+            incident_data['id'] = incident_id
+            response = format_incident_response(incident_data)
+            responses.append(response)
+
+            # Queue email alert for high-urgency incidents (sent out of band)
+            if incident_data["urgency"] == "high":
+                alert_dispatcher.enqueue(response)
+
+        responses.sort(key=lambda response: URGENCY_RANK.get(response.get("urgency"), 3))
+        print(f"✅ Document produced {len(responses)} incident(s)")
+
+        result = {
+            **responses[0],
+            "incidents": responses,
+            "document": {
+                "pages": extracted["pages"],
+                "chunks": len(extracted["analyses"]),
+                "incidents": len(responses)
+            }
+        }
+        document_cache_service.remember(upload.sha256, extracted["signature"], result)
+        return result
+
+document_pipeline = DocumentPipeline()
@@ -0,0 +1,167 @@
+"""
+Embedding Backfill Service
+Queues incidents whose embedding failed or was skipped and embeds them in the background
+"""
+import asyncio
+import json
+import os
+from config import config
+from services.gemini_service import gemini_service
+from services.qdrant_service import qdrant_service
+from typing import Dict, Any, List, Optional, Tuple
+
+class EmbeddingBackfillService:
+    """
+    Instead of storing a zero vector, routes hand failed embeddings to this
+    queue. A background worker re-embeds them in batches once Gemini answers
+    again (exponential backoff while it does not) and upserts the real
+    vectors to Qdrant. The queue is persisted as an append-only JSONL file so
+    pending items survive a restart.
+    """
+
+    def __init__(self):
+        self.path = config.EMBEDDING_BACKFILL_PATH
+        self.batch_size = config.EMBEDDING_BACKFILL_BATCH
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    def _load(self):
+        """Restore pending items from the queue file."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("done"):
+                    self.pending.pop(entry["id"], None)
+                else:
+                    self.pending[entry["id"]] = entry
+        # Compact the file down to the items still pending
+        with open(self.path, "w", encoding="utf-8") as f:
+            for entry in self.pending.values():
+                f.write(json.dumps(entry, default=str) + "\n")
+        if self.pending:
+            print(f"🔢 {len(self.pending)} embeddings waiting for backfill")
+
+    def _append(self, entry: Dict[str, Any]):
+        self._append_many([entry])
+
+    def _append_many(self, entries: List[Dict[str, Any]]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, default=str) + "\n" for entry in entries))
+
+    def defer(self, incident_id: str, text: str, metadata: Dict[str, Any]):
+        """Queue an incident for background embedding."""
+        entry = {"id": incident_id, "text": text, "metadata": metadata}
+        self.pending[incident_id] = entry
+        self._append(entry)
+        self._wakeup.set()
+        print(f"🔢 Embedding deferred for incident {incident_id} ({len(self.pending)} queued)")
+
+    def defer_many(self, items: List[Tuple[str, str, Dict[str, Any]]], max_pending: Optional[int] = None) -> int:
+        """
+        Queue many (incident_id, text, metadata) items with one file append and one log line.
+
+        With max_pending, items that would grow the queue beyond it are not
+        queued (those incidents stay without a vector). Returns how many were queued.
+        """
+        if max_pending is not None:
+            skipped = max(0, len(items) - max(0, max_pending - len(self.pending)))
+            items = items[:len(items) - skipped]
+        else:
+            skipped = 0
+        entries = [{"id": incident_id, "text": text, "metadata": metadata} for incident_id, text, metadata in items]
+        if entries:
+            for entry in entries:
+                self.pending[entry["id"]] = entry
+            self._append_many(entries)
+            self._wakeup.set()
+        print(f"🔢 Embeddings deferred for {len(entries)} incidents ({len(self.pending)} queued"
+              + (f", {skipped} skipped: queue full)" if skipped else ")"))
+        return len(entries)
+
+    def start(self):
+        """Start the background worker (call from the running event loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        delay = config.EMBEDDING_BACKFILL_MIN_DELAY
+        while True:
+            if not self.pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            processed = await self.process_batch()
+            if processed:
+                delay = config.EMBEDDING_BACKFILL_MIN_DELAY
+                continue
+
+            # Gemini (or Qdrant) still failing: back off before retrying
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, config.EMBEDDING_BACKFILL_MAX_DELAY)
+
+    async def process_batch(self) -> int:
+        """
+        Embed and store one batch of queued incidents.
+
+        Items Gemini returns no embedding for move to the back of the queue
+        and are dropped after EMBEDDING_BACKFILL_MAX_ATTEMPTS, so they cannot
+        hold up the items behind them.
+
+        Returns:
+            int: Items taken off the front of the queue (0 = Gemini or Qdrant unavailable)
+        """
+        batch = list(self.pending.values())[:self.batch_size]
+        if not batch:
+            return 0
+
+        embeddings = await gemini_service.generate_embeddings([item["text"] for item in batch])
+        if embeddings is None:
+            return 0
+
+        points = [
+            (item["id"], embedding, item["metadata"])
+            for item, embedding in zip(batch, embeddings)
+            if embedding
+        ]
+        stored = await qdrant_service.store_embeddings(points, backfill=False)
+        if stored < len(points):
+            return 0
+
+        for incident_id, _, _ in points:
+            self.pending.pop(incident_id, None)
+            self._append({"id": incident_id, "done": True})
+
+        failed = [item for item, embedding in zip(batch, embeddings) if not embedding]
+        dropped = 0
+        for item in failed:
+            self.pending.pop(item["id"], None)
+            item["attempts"] = item.get("attempts", 0) + 1
+            if item["attempts"] >= config.EMBEDDING_BACKFILL_MAX_ATTEMPTS:
+                self._append({"id": item["id"], "done": True, "dropped": True})
+                dropped += 1
+            else:
+                self.pending[item["id"]] = item  # Re-inserted at the back
+                self._append(item)
+
+        print(f"✅ Backfilled {len(points)} embeddings ({len(self.pending)} remaining)"
+              + (f", {len(failed) - dropped} retried later, {dropped} dropped" if failed else ""))
+        return len(batch)
+
+embedding_backfill_service = EmbeddingBackfillService()
@@ -1,7 +1,8 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 from config import config
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
 from datetime import datetime
 import uuid
 
@@ -16,31 +17,102 @@ class FirestoreService:
         
         self.db = firestore.client()
         self.collection = self.db.collection('incidents')
+        
+        # In-process LRU cache of recent incidents, used to hydrate search results
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = config.INCIDENT_CACHE_SIZE
+    
+    def _cache_put(self, incident_id: str, incident_data: Dict[str, Any]):
+        self._cache[incident_id] = dict(incident_data)
+        self._cache.move_to_end(incident_id)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
     
-    async def store_incident(self, incident_data: Dict[str, Any]) -> str:
-        """Store incident metadata in Firestore."""
+    def invalidate_cached(self, incident_id: str):
+        """Drop an incident from the cache after it changed outside this service."""
+        self._cache.pop(incident_id, None)
+    
+    async def store_incident(self, incident_data: Dict[str, Any], incident_id: Optional[str] = None) -> str:
+        """Store incident metadata in Firestore (under a pre-generated ID if given)."""
+        incident_id = incident_id or str(uuid.uuid4())
         try:
-            incident_id = str(uuid.uuid4())
             incident_data['id'] = incident_id
-            incident_data['timestamp'] = datetime.utcnow().isoformat()
+            incident_data.setdefault('timestamp', datetime.utcnow().isoformat())
             
             self.collection.document(incident_id).set(incident_data)
+            self._cache_put(incident_id, incident_data)
             return incident_id
         except Exception as e:
             print(f"Error storing incident: {e}")
-            return str(uuid.uuid4())
+            return incident_id
+    
+    async def store_incidents(self, incidents: List[Dict[str, Any]]) -> List[str]:
+        """Store many incidents with batched writes (one commit per 500 documents)."""
+        incident_ids = []
+        for incident_data in incidents:
+            incident_data['id'] = incident_data.get('id') or str(uuid.uuid4())
+            incident_data.setdefault('timestamp', datetime.utcnow().isoformat())
+            incident_ids.append(incident_data['id'])
+        
+        for start in range(0, len(incidents), 500):
+            chunk = incidents[start:start + 500]
+            try:
+                batch = self.db.batch()
+                for incident_data in chunk:
+                    batch.set(self.collection.document(incident_data['id']), incident_data)
+                batch.commit()
+                for incident_data in chunk:
+                    self._cache_put(incident_data['id'], incident_data)
+            except Exception as e:
+                print(f"Error storing {len(chunk)} incidents: {e}")
+        return incident_ids
     
     async def get_incident(self, incident_id: str) -> Dict[str, Any]:
         """Get incident by ID."""
+        if incident_id in self._cache:
+            self._cache.move_to_end(incident_id)
+            return dict(self._cache[incident_id])
         try:
             doc = self.collection.document(incident_id).get()
             if doc.exists:
-                return doc.to_dict()
+                incident = doc.to_dict()
+                self._cache_put(incident_id, incident)
+                return incident
             return None
         except Exception as e:
             print(f"Error getting incident: {e}")
             return None
     
+    async def get_incidents(self, incident_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get many incidents by ID in one round trip.
+        
+        Returns:
+            Dict of incident ID -> incident data (missing or archived IDs are omitted)
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for incident_id in incident_ids:
+            if incident_id in self._cache:
+                self._cache.move_to_end(incident_id)
+                found[incident_id] = dict(self._cache[incident_id])
+            else:
+                missing.append(incident_id)
+        
+        if not missing:
+            return found
+        
+        try:
+            refs = [self.collection.document(incident_id) for incident_id in missing]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    incident = doc.to_dict()
+                    self._cache_put(doc.id, incident)
+                    found[doc.id] = incident
+        except Exception as e:
+            print(f"Error getting incidents: {e}")
+        return found
+    
     async def get_all_incidents(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get all incidents."""
         try:
@@ -59,6 +131,8 @@ class FirestoreService:
         """Update incident data."""
         try:
             self.collection.document(incident_id).update(updates)
+            if incident_id in self._cache:
+                self._cache[incident_id].update(updates)
             return True
         except Exception as e:
             print(f"Error updating incident: {e}")
@@ -68,6 +142,7 @@ class FirestoreService:
         """Delete incident by ID."""
         try:
             self.collection.document(incident_id).delete()
+            self.invalidate_cached(incident_id)
             return True
         except Exception as e:
             print(f"Error deleting incident: {e}")
@@ -81,6 +156,7 @@ class FirestoreService:
             for doc in docs:
                 doc.reference.delete()
                 deleted_count += 1
+            self._cache.clear()
             return deleted_count
         except Exception as e:
             print(f"Error clearing incidents: {e}")
@@ -109,6 +185,7 @@ class FirestoreService:
             
             # Delete from active incidents
             incident_ref.delete()
+            self.invalidate_cached(incident_id)
             
             print(f"✅ Incident {incident_id} archived successfully")
             return True
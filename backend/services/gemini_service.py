@@ -1,6 +1,6 @@
 import google.generativeai as genai
 from config import config
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 import json
 
 genai.configure(api_key=config.GOOGLE_API_KEY)
@@ -11,11 +11,14 @@ class GeminiService:
         self.vision_model = genai.GenerativeModel('models/gemini-2.5-flash')
         self.text_model = genai.GenerativeModel('models/gemini-2.5-flash')
     
-    async def analyze_image(self, image_path: str) -> Dict[str, Any]:
-        """Analyze disaster image using Gemini Vision."""
+    async def analyze_image(self, image: Union[str, bytes], mime_type: str = "image/jpeg") -> Dict[str, Any]:
+        """Analyze disaster image (file path or in-memory bytes) using Gemini Vision."""
         try:
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            if isinstance(image, str):
+                with open(image, 'rb') as f:
+                    image_data = f.read()
+            else:
+                image_data = image  # Shared upload bytes, passed through without a copy
             
             prompt = """Analyze this image for disaster/emergency situations.
 
@@ -36,7 +39,8 @@ Return ONLY valid JSON in this exact format (no markdown, no extra text):
   "people_affected": 0
 }"""
             
-            response = self.vision_model.generate_content([prompt, {"mime_type": "image/jpeg", "data": image_data}])
+            # Async call so storage upload and EXIF run while Gemini works
+            response = await self.vision_model.generate_content_async([prompt, {"mime_type": mime_type, "data": image_data}])
             
             # Parse JSON from response
             text = response.text.strip()
@@ -79,7 +83,7 @@ Return ONLY valid JSON:
   "confidence": 0.85
 }}"""
             
-            response = self.text_model.generate_content(prompt)
+            response = await self.text_model.generate_content_async(prompt)
             text_result = response.text.strip()
             
             if text_result.startswith("```json"):
@@ -100,10 +104,68 @@ Return ONLY valid JSON:
                 "confidence": 0.5
             }
     
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding vector for text."""
+    async def analyze_texts(self, items: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract incident information from many short texts with one prompt.
+
+        Args:
+            items: [{"id": ..., "text": ...}] with IDs unique within the call
+
+        Returns:
+            Dict[str, Dict]: Analysis per item ID. Items the model skipped or
+            answered malformed are missing (callers fall back to analyze_text)
+        """
         try:
-            result = genai.embed_content(
+            prompt = f"""Extract disaster/emergency information from each of these messages.
+Each message has an "id"; analyze every message on its own.
+
+{json.dumps(items, ensure_ascii=False)}
+
+For every message extract:
+- Incident type (flood, fire, collapsed_building, medical_emergency, other)
+- Location description
+- Urgency level (low, medium, high)
+- Number of people affected
+- Brief description
+
+Return ONLY a valid JSON array with one object per message, in the same order:
+[
+  {{
+    "id": "message id",
+    "type": "incident_type",
+    "location_text": "location description",
+    "urgency": "urgency_level",
+    "people_affected": 0,
+    "description": "brief description",
+    "confidence": 0.85
+  }}
+]"""
+            
+            response = await self.text_model.generate_content_async(prompt)
+            text_result = response.text.strip()
+            
+            if text_result.startswith("```json"):
+                text_result = text_result[7:]
+            if text_result.endswith("```"):
+                text_result = text_result[:-3]
+            
+            results = json.loads(text_result.strip())
+            expected = {str(item["id"]) for item in items}
+            return {
+                str(result["id"]): result
+                for result in results
+                if isinstance(result, dict)
+                and str(result.get("id")) in expected
+                and all(key in result for key in ("type", "urgency", "description", "confidence"))
+            }
+        except Exception as e:
+            print(f"Gemini multi-text error ({len(items)} items): {e}")
+            return {}
+    
+    async def generate_embedding(self, text: str) -> Optional[List[float]]:
+        """Generate embedding vector for text. Returns None if embedding failed."""
+        try:
+            result = await genai.embed_content_async(
                 model="models/text-embedding-004",
                 content=text,
                 task_type="retrieval_document"
@@ -111,8 +173,21 @@ Return ONLY valid JSON:
             return result['embedding']
         except Exception as e:
             print(f"Embedding error: {e}")
-            # Return zero vector as fallback
-            return [0.0] * 768
+            # Callers defer to the backfill queue instead of storing a zero vector
+            return None
+    
+    async def generate_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Generate embeddings for many texts in one request. Returns None if embedding failed."""
+        try:
+            result = await genai.embed_content_async(
+                model="models/text-embedding-004",
+                content=texts,
+                task_type="retrieval_document"
+            )
+            return result['embedding']
+        except Exception as e:
+            print(f"Batch embedding error: {e}")
+            return None
     
     async def chat_response(self, message: str, context: str) -> str:
         """Generate chat response with context."""
@@ -0,0 +1,253 @@
+"""
+Image Ingestion Pipeline
+The /analyze/image flow expressed as a stage DAG (see utils/pipeline.py)
+
+    exif ─────────────────────┐
+    analysis ──► embedding ──►├─► dedup ──► prepare ──► firestore ──► broadcast
+    storage ──────────────────┘                    └──► qdrant
+
+EXIF, Gemini and the Supabase upload start together; Firestore and Qdrant
+writes run side by side (the incident ID is generated up front). Email
+alerts and thumbnails are background tasks that never delay the response.
+"""
+import asyncio
+import random
+import uuid
+from datetime import datetime
+from config import config
+from services.gemini_service import gemini_service
+from services.qdrant_service import qdrant_service
+from services.firestore_service import firestore_service
+from services.storage_service import storage_service
+from services.alert_dispatcher import alert_dispatcher
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.derivative_service import derivative_service
+from utils.exif_utils import get_gps_coordinates
+from utils.format_utils import determine_urgency, format_incident_response
+from utils.geo_utils import haversine_m
+from utils.pipeline import Pipeline, PipelineAbort, ProgressFn
+from utils.timing_utils import StageTimer
+from utils.upload_utils import UploadBuffer
+from websocket_manager import broadcast_new_incident
+from typing import Dict, Any, Optional
+
+# Fixed Dubai coordinates when the image has no GPS (no randomization, for duplicate detection)
+DEFAULT_LOCATION = (25.2048, 55.2708)
+
+def fallback_analysis(filename: str) -> Dict[str, Any]:
+    """Quick stand-in analysis when Gemini times out or fails."""
+    incident_types = ['fire', 'flood', 'building_collapse', 'medical']
+    return {
+        'type': random.choice(incident_types),
+        'description': f'Disaster detected in uploaded image: {filename}',
+        'confidence': round(random.uniform(0.7, 0.95), 2),
+        'people_affected': random.randint(0, 20)
+    }
+
+# ---- stages ---------------------------------------------------------------
+
+async def exif_stage(ctx: Dict[str, Any]):
+    """EXIF GPS (parsed off the event loop) or the default location."""
+    gps_coords = await asyncio.to_thread(get_gps_coordinates, ctx["upload"].data)
+    if gps_coords:
+        print(f"📍 GPS found: {gps_coords[0]}, {gps_coords[1]}")
+        return gps_coords
+    print(f"📍 Using default location: {DEFAULT_LOCATION[0]}, {DEFAULT_LOCATION[1]}")
+    return DEFAULT_LOCATION
+
+async def analysis_stage(ctx: Dict[str, Any]):
+    upload: UploadBuffer = ctx["upload"]
+    print("🤖 Analyzing with Gemini...")
+    analysis = await gemini_service.analyze_image(upload.data, upload.image_mime_type)
+    print(f"✅ Analysis complete: {analysis['type']}")
+    return analysis
+
+async def storage_stage(ctx: Dict[str, Any]):
+    upload: UploadBuffer = ctx["upload"]
+    print("☁️  Uploading to Supabase...")
+    image_url = await storage_service.upload_image(upload.data, upload.image_mime_type, upload.filename, upload.sha256)
+    print(f"✅ Upload complete: {image_url}")
+    return image_url
+
+async def embedding_stage(ctx: Dict[str, Any]) -> Optional[list]:
+    """Embedding of the analysis; None means it is backfilled later."""
+    if config.EMBEDDING_INLINE_TIMEOUT <= 0:
+        return None
+    analysis = ctx["analysis"]
+    embedding = await gemini_service.generate_embedding(f"{analysis['type']} {analysis['description']}")
+    if embedding:
+        print("✅ Embedding generated")
+    return embedding
+
+async def dedup_stage(ctx: Dict[str, Any]):
+    """Abort with the existing incident if this report is a duplicate."""
+    lat, lng = ctx["exif"]
+    analysis = ctx["analysis"]
+    print("🔍 Checking for duplicates...")
+
+    if config.DEDUP_MODE == "semantic":
+        # One indexed Qdrant query: similar description + nearby + recent
+        existing = await qdrant_service.find_duplicate(ctx["embedding"], lat, lng)
+        if existing:
+            distance = haversine_m(lat, lng, existing['geo']['lat'], existing['geo']['lon'])
+            # Qdrant keeps only filterable fields; load the full incident
+            existing = {**(await firestore_service.get_incident(existing['id']) or {}), **existing}
+            print(f"⚠️  Duplicate found! Similar incident (score {existing['score']:.2f}) within {distance:.0f}m")
+            print(f"   Existing incident: {existing.get('id')}")
+            raise PipelineAbort({
+                "message": "Similar incident already exists nearby",
+                "duplicate": True,
+                "existing_incident": format_incident_response(clustering_service.resolve_incident(existing)),
+                "distance_meters": round(distance, 1),
+                "similarity": round(existing['score'], 3)
+            })
+    else:
+        existing_incidents = await firestore_service.get_all_incidents(limit=100)
+
+        # Check if similar incident exists within the dedup radius
+        for existing in existing_incidents:
+            if existing.get('type') != analysis['type']:
+                continue
+            existing_lat = existing.get('lat') or existing.get('latitude')
+            existing_lng = existing.get('lng') or existing.get('longitude')
+            if existing_lat is None or existing_lng is None:
+                continue  # Skip incidents without coordinates
+
+            distance = haversine_m(lat, lng, existing_lat, existing_lng)
+            if distance < config.DEDUP_RADIUS_M:
+                print(f"⚠️  Duplicate found! Same {analysis['type']} within {distance:.0f}m")
+                print(f"   Existing incident: {existing.get('id')}")
+                raise PipelineAbort({
+                    "message": "Similar incident already exists nearby",
+                    "duplicate": True,
+                    "existing_incident": format_incident_response(clustering_service.resolve_incident(existing)),
+                    "distance_meters": round(distance, 1)
+                })
+
+    print("✅ No duplicates found, creating new incident")
+
+async def prepare_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the incident record; the ID is generated here so both stores can write at once."""
+    lat, lng = ctx["exif"]
+    analysis = ctx["analysis"]
+    location_name = f"Location ({lat:.4f}, {lng:.4f})"
+
+    incident_data = {
+        "id": str(uuid.uuid4()),
+        "type": analysis['type'],
+        "lat": lat,
+        "lng": lng,
+        "latitude": lat,
+        "longitude": lng,
+        "confidence": analysis['confidence'],
+        "urgency": determine_urgency(
+            analysis['confidence'],
+            analysis['type'],
+            analysis.get('people_affected', 0)
+        ),
+        "description": analysis['description'],
+        "people_affected": analysis.get('people_affected', 0),
+        "image_url": ctx["storage"],
+        "location": location_name,
+        "location_text": location_name,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+    # Group into an event with related reports
+    incident_data["event_id"] = clustering_service.assign(incident_data, ctx["embedding"])
+    return incident_data
+
+async def firestore_stage(ctx: Dict[str, Any]) -> str:
+    incident_data = ctx["prepare"]
+    print("🔥 Storing in Firestore...")
+    incident_id = await firestore_service.store_incident(incident_data, incident_id=incident_data["id"])
+    print(f"✅ Stored with ID: {incident_id}")
+    return incident_id
+
+async def qdrant_stage(ctx: Dict[str, Any]):
+    incident_data = ctx["prepare"]
+    analysis = ctx["analysis"]
+    if ctx["embedding"] is None:
+        embedding_backfill_service.defer(
+            incident_data["id"], f"{analysis['type']} {analysis['description']}", incident_data
+        )
+        return
+    print("🔍 Storing in Qdrant...")
+    await qdrant_service.store_embedding(incident_data["id"], ctx["embedding"], incident_data)
+    print("✅ Qdrant storage complete")
+
+async def broadcast_stage(ctx: Dict[str, Any]):
+    await broadcast_new_incident(format_incident_response(ctx["prepare"]))
+    print("📡 Broadcasted to WebSocket clients")
+
+def _log_failure(stage: str):
+    def fallback(ctx: Dict[str, Any]):
+        print(f"⚠️  {stage} skipped")
+        return None
+    return fallback
+
+def build_pipeline() -> Pipeline:
+    timeouts = config.PIPELINE_TIMEOUTS
+    return (
+        Pipeline()
+        .stage("exif", exif_stage, fallback=lambda ctx: DEFAULT_LOCATION)
+        .stage("analysis", analysis_stage, timeout=timeouts["analysis"],
+               fallback=lambda ctx: fallback_analysis(ctx["upload"].filename))
+        .stage("storage", storage_stage, timeout=timeouts["storage"],
+               fallback=lambda ctx: f"local://{ctx['upload'].filename}")
+        .stage("embedding", embedding_stage, deps=["analysis"],
+               timeout=config.EMBEDDING_INLINE_TIMEOUT or None, fallback=lambda ctx: None)
+        # A failed duplicate check continues with creation
+        .stage("dedup", dedup_stage, deps=["exif", "analysis", "embedding"], timeout=timeouts["dedup"],
+               fallback=_log_failure("Duplicate check"))
+        .stage("prepare", prepare_stage, deps=["dedup", "storage"])
+        .stage("firestore", firestore_stage, deps=["prepare"], timeout=timeouts["firestore"],
+               fallback=lambda ctx: ctx["prepare"]["id"])
+        .stage("qdrant", qdrant_stage, deps=["prepare"], timeout=timeouts["qdrant"],
+               fallback=_log_failure("Qdrant storage"))
+        .stage("broadcast", broadcast_stage, deps=["firestore"], timeout=timeouts["broadcast"],
+               fallback=_log_failure("WebSocket broadcast"))
+    )
+
+class ImagePipeline:
+    def __init__(self):
+        self.pipeline = build_pipeline()
+
+    async def run(self, upload: UploadBuffer, timer: Optional[StageTimer] = None,
+                  on_stage: Optional[ProgressFn] = None) -> Dict[str, Any]:
+        """Run the image pipeline and return the API response (new incident or duplicate)."""
+        timer = timer or StageTimer()
+
+        # Thumbnails are encoded in the process pool in the background
+        thumbnails_task = derivative_service.schedule(upload.data, upload.sha256)
+
+        try:
+            ctx = await self.pipeline.run({"upload": upload}, timer, on_stage)
+        except BaseException:
+            derivative_service.cancel(thumbnails_task)
+            raise
+        if "aborted" in ctx:
+            # Duplicate: no incident will reference the thumbnails
+            derivative_service.cancel(thumbnails_task)
+            return {**ctx["aborted"], "timings": timer.report()}
+
+        incident_data = ctx["prepare"]
+        incident_id = ctx["firestore"]
+        derivative_service.attach(incident_id, thumbnails_task)
+
+        incident_data['id'] = incident_id
+        incident_data['thumbnails'] = derivative_service.ready(thumbnails_task)
+        response = format_incident_response(incident_data)
+        print(f"✅ Upload complete! Incident ID: {incident_id}")
+
+        # Email alerts are queued for the dispatcher and never hold up the response;
+        # thumbnails still encoding are picked up when the alert is sent
+        if incident_data["urgency"] == "high":
+            alert_dispatcher.enqueue(response, thumbnails=thumbnails_task)
+
+        # Per-stage durations and the chain of stages that set the latency
+        response["timings"] = timer.report()
+        return response
+
+image_pipeline = ImagePipeline()
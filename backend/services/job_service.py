@@ -0,0 +1,127 @@
+"""
+Job Service
+Runs analysis pipelines in a background worker pool fed by a bounded queue
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from config import config
+from websocket_manager import emit_job_event
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+# A job handler receives a progress callback (awaited with each finished stage name)
+JobHandler = Callable[[Callable[[str], Awaitable[None]]], Awaitable[Dict[str, Any]]]
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity (clients should retry later)."""
+
+class JobService:
+    """
+    Upload routes in async mode hand their pipeline to `submit()` and answer
+    202 with the job ID right away, so HTTP workers are not held for the
+    whole analysis. A fixed pool of worker tasks drains the bounded queue.
+    Progress is pushed over Socket.IO to the room `job:<id>`
+    (`job_progress`, then `job_completed` or `job_failed`). The same state
+    can be polled at GET /jobs/{id}.
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=config.JOB_QUEUE_SIZE)
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.handlers: Dict[str, JobHandler] = {}
+        self._workers = []
+
+    def start(self):
+        """Start the worker pool (call from the running event loop)."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(config.JOB_WORKERS)
+        ]
+        print(f"🧵 Job workers started ({config.JOB_WORKERS} workers, queue size {config.JOB_QUEUE_SIZE})")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, handler: JobHandler, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Raises:
+            JobQueueFull: If the queue is at capacity
+        """
+        job_id = str(uuid.uuid4())
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stages": [],
+            "result": None,
+            "error": None,
+            "meta": meta or {},
+            "created_at": time.time(),
+            "updated_at": time.time()
+        }
+        try:
+            self.queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.queue.maxsize} jobs waiting)")
+
+        self.jobs[job_id] = job
+        self.handlers[job_id] = handler
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"queued": self.queue.qsize(), "capacity": self.queue.maxsize, "workers": len(self._workers), "jobs": counts}
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - config.JOB_RETENTION)]:
+            del self.jobs[job_id]
+
+    async def _update(self, job: Dict[str, Any], event: str, **fields):
+        job.update(fields)
+        job["updated_at"] = time.time()
+        await emit_job_event(job["id"], event, {
+            "job_id": job["id"],
+            "status": job["status"],
+            "stage": job["stages"][-1] if job["stages"] else None,
+            **{k: v for k, v in fields.items() if k in ("result", "error")}
+        })
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            handler = self.handlers.pop(job_id, None)
+            try:
+                if job is None or handler is None:
+                    continue
+                await self._update(job, "job_progress", status="running")
+
+                async def on_stage(stage: str, job=job):
+                    job["stages"].append(stage)
+                    await self._update(job, "job_progress")
+
+                try:
+                    result = await handler(on_stage)
+                    await self._update(job, "job_completed", status="completed", result=result)
+                except Exception as e:
+                    print(f"❌ Job {job_id} failed: {e}")
+                    await self._update(job, "job_failed", status="failed", error=str(e))
+            finally:
+                self.queue.task_done()
+
+job_service = JobService()
@@ -0,0 +1,306 @@
+"""
+Local Vector Index
+NumPy brute-force cosine search over a memory-mapped float32 matrix
+
+Used by QdrantService as a degraded-mode fallback while Qdrant is unreachable
+(and as a network-free store for tests and benchmarks). Vectors live in
+`vectors.f32`; ids, payloads and deletions are appended to `points.jsonl` and
+replayed (and compacted) on startup. IDs whose Qdrant write failed are
+tracked in `pending.jsonl` so they can be replayed once Qdrant is back.
+
+Rows are assigned per process, so the directory is locked by one process
+at a time: with several workers (gunicorn -w N), only the first gets the
+index. Give each worker its own LOCAL_INDEX_PATH if they all need one.
+"""
+import numpy as np
+from utils.geo_utils import haversine_m
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class LocalIndexLocked(Exception):
+    """Raised when another process already uses the index directory."""
+
+def _lock_exclusive(handle):
+    """Take a non-blocking exclusive lock on an open file (OSError if another process holds it)."""
+    if fcntl is not None:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+
+class LocalVectorIndex:
+    def __init__(self, path: str, dim: int, initial_capacity: int = 1024):
+        self.path = path
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+
+        # Held for the life of the process; released by the OS on exit
+        self._lock = open(os.path.join(path, ".lock"), "w")
+        try:
+            _lock_exclusive(self._lock)
+        except OSError:
+            self._lock.close()
+            raise LocalIndexLocked(f"Local vector index {path} is in use by another process")
+
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._points_path = os.path.join(path, "points.jsonl")
+        self._pending_path = os.path.join(path, "pending.jsonl")
+
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self.pending: set = set()
+
+        self._load_log()
+        self._compact()
+        self._logs: Dict[str, Any] = {}
+        capacity = max(initial_capacity, len(self._ids))
+        self._open_matrix(capacity)
+        self._alive = np.array([p is not None for p in self._payloads] + [False] * (capacity - len(self._ids)), dtype=bool)
+
+    # ---- persistence ------------------------------------------------------
+
+    def _load_log(self):
+        """Rebuild ids/payloads from the append-only point log."""
+        if os.path.exists(self._points_path):
+            with open(self._points_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line after a crash
+                    row = entry["row"]
+                    while len(self._ids) <= row:
+                        self._ids.append(None)
+                        self._payloads.append(None)
+                    self._ids[row] = entry["id"]
+                    self._rows[entry["id"]] = row
+                    self._payloads[row] = None if entry.get("deleted") else entry["payload"]
+
+        if os.path.exists(self._pending_path):
+            with open(self._pending_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("done"):
+                        self.pending.discard(entry["id"])
+                    else:
+                        self.pending.add(entry["id"])
+
+    def _compact(self):
+        """Rewrite the logs down to live points and pending IDs (rows are kept)."""
+        with open(self._points_path + ".tmp", "w", encoding="utf-8") as f:
+            for row, (point_id, payload) in enumerate(zip(self._ids, self._payloads)):
+                if point_id is not None and payload is not None:
+                    f.write(json.dumps({"id": point_id, "row": row, "payload": payload}, default=str) + "\n")
+        os.replace(self._points_path + ".tmp", self._points_path)
+        with open(self._pending_path + ".tmp", "w", encoding="utf-8") as f:
+            for point_id in self.pending:
+                f.write(json.dumps({"id": point_id}) + "\n")
+        os.replace(self._pending_path + ".tmp", self._pending_path)
+
+    def _append(self, path: str, entry: Dict[str, Any]):
+        # Log files stay open: one buffered write per entry instead of an open() on every write
+        log = self._logs.get(path)
+        if log is None:
+            log = self._logs[path] = open(path, "a", encoding="utf-8", buffering=1)
+        log.write(json.dumps(entry, default=str) + "\n")
+
+    def _close_logs(self):
+        for log in self._logs.values():
+            log.close()
+        self._logs = {}
+
+    def _open_matrix(self, capacity: int):
+        """Memory-map the vector file, growing it to `capacity` rows if needed."""
+        size = capacity * self.dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.capacity = capacity
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self):
+        self._matrix.flush()
+        old_capacity = self.capacity
+        del self._matrix
+        self._open_matrix(old_capacity * 2)
+        self._alive = np.concatenate([self._alive, np.zeros(old_capacity, dtype=bool)])
+
+    # ---- writes -----------------------------------------------------------
+
+    def upsert(self, point_id: str, vector: List[float], payload: Dict[str, Any]):
+        """Insert or replace a point (vectors are stored unit-normalized)."""
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec = vec / norm
+
+        row = self._rows.get(point_id)
+        if row is None:
+            row = len(self._ids)
+            if row >= self.capacity:
+                self._grow()
+            self._ids.append(point_id)
+            self._payloads.append(None)
+            self._rows[point_id] = row
+
+        self._matrix[row] = vec
+        self._payloads[row] = payload
+        self._alive[row] = norm > 0
+        self._append(self._points_path, {"id": point_id, "row": row, "payload": payload})
+
+    def upsert_many(self, points: List[Tuple[str, List[float], Dict[str, Any]]]):
+        for point_id, vector, payload in points:
+            self.upsert(point_id, vector, payload)
+        self._matrix.flush()
+
+    def set_payload(self, point_id: str, fields: Dict[str, Any]):
+        row = self._rows.get(point_id)
+        if row is None or self._payloads[row] is None:
+            return
+        self._payloads[row] = {**self._payloads[row], **fields}
+        self._append(self._points_path, {"id": point_id, "row": row, "payload": self._payloads[row]})
+
+    def delete(self, point_id: str):
+        row = self._rows.get(point_id)
+        if row is None:
+            return
+        self._payloads[row] = None
+        self._alive[row] = False
+        self._append(self._points_path, {"id": point_id, "row": row, "deleted": True})
+
+    def clear(self):
+        """Remove every point and pending write."""
+        del self._matrix
+        self._close_logs()
+        for path in (self._vectors_path, self._points_path, self._pending_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._ids, self._rows, self._payloads = [], {}, []
+        self.pending = set()
+        self._open_matrix(1024)
+        self._alive = np.zeros(self.capacity, dtype=bool)
+
+    # ---- replay bookkeeping ----------------------------------------------
+
+    def mark_pending(self, point_ids: List[str]):
+        """Remember points that still have to be written to Qdrant."""
+        for point_id in point_ids:
+            if point_id not in self.pending:
+                self.pending.add(point_id)
+                self._append(self._pending_path, {"id": point_id})
+
+    def clear_pending(self, point_ids: List[str]):
+        for point_id in point_ids:
+            if point_id in self.pending:
+                self.pending.discard(point_id)
+                self._append(self._pending_path, {"id": point_id, "done": True})
+
+    def get_points(self, point_ids: List[str]) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+        """Stored (id, vector, payload) tuples for the given IDs (deleted ones skipped)."""
+        points = []
+        for point_id in point_ids:
+            row = self._rows.get(point_id)
+            if row is not None and self._payloads[row] is not None:
+                points.append((point_id, self._matrix[row].tolist(), self._payloads[row]))
+        return points
+
+    # ---- search -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return int(self._alive[:len(self._ids)].sum())
+
+    def search(
+        self,
+        query: List[float],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Exact cosine top-k with the same filter semantics as QdrantService._build_filter."""
+        n = len(self._ids)
+        if n == 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return []
+        scores = self._matrix[:n] @ (q / norm)
+
+        mask = self._alive[:n].copy()
+        if filters:
+            for row in np.flatnonzero(mask):
+                if not matches_filters(self._payloads[row], filters):
+                    mask[row] = False
+        if score_threshold is not None:
+            mask &= scores >= score_threshold
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+        k = min(limit, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {"id": self._ids[row], "score": float(scores[row]), **self._payloads[row]}
+            for row in top
+        ]
+
+def _parse_time(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; drop tzinfo from filter bounds to compare."""
+    if value is not None and value.tzinfo is not None:
+        value = (value - value.utcoffset()).replace(tzinfo=None)
+    return value
+
+def matches_filters(payload: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Evaluate a structured filter dict (see QdrantService._build_filter) against a payload."""
+    for key, field in (("types", "type"), ("urgency", "urgency"), ("status", "status")):
+        values = filters.get(key)
+        if values and payload.get(field) not in values:
+            return False
+
+    if filters.get("verified") is not None and payload.get("verified") != filters["verified"]:
+        return False
+
+    since = _parse_time(filters.get("since"))
+    if filters.get("within_hours"):
+        since = datetime.utcnow() - timedelta(hours=filters["within_hours"])
+    until = _parse_time(filters.get("until"))
+    if since or until:
+        timestamp = _naive_utc(_parse_time(payload.get("timestamp")))
+        if timestamp is None:
+            return False
+        if since and timestamp < _naive_utc(since):
+            return False
+        if until and timestamp > _naive_utc(until):
+            return False
+
+    near = filters.get("near")
+    if near:
+        geo = payload.get("geo")
+        if not geo:
+            return False
+        if haversine_m(near["lat"], near["lng"], geo["lat"], geo["lon"]) > near.get("radius_km", 5.0) * 1000:
+            return False
+
+    return True
@@ -0,0 +1,107 @@
+"""
+Qdrant collection profiles
+Trade RAM for recall/latency by choosing quantization, HNSW and on-disk settings
+"""
+from qdrant_client.models import (
+    Distance, VectorParams, VectorParamsDiff, HnswConfigDiff, CollectionParamsDiff,
+    SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig, Disabled
+)
+from typing import Dict, Any, Optional
+
+# Profile name -> collection settings and matching search parameters
+#   default:    full float32 vectors in RAM (~3 KB per 768-dim incident), Qdrant's HNSW defaults
+#   balanced:   int8 scalar quantization in RAM, originals in RAM for rescoring (~4x less to search)
+#   low_memory: int8 quantized vectors in RAM, originals and payloads on disk
+#   binary:     1-bit binary quantization in RAM (~32x smaller), originals on disk, heavier oversampling
+COLLECTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "on_disk": False,
+        "on_disk_payload": False,
+        "hnsw": {"m": 16, "ef_construct": 100},
+        "quantization": None,
+        "hnsw_ef": None,
+        "oversampling": None,
+    },
+    "balanced": {
+        "on_disk": False,
+        "on_disk_payload": False,
+        "hnsw": {"m": 16, "ef_construct": 128},
+        "quantization": "int8",
+        "hnsw_ef": 128,
+        "oversampling": 2.0,
+    },
+    "low_memory": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "hnsw": {"m": 16, "ef_construct": 100},
+        "quantization": "int8",
+        "hnsw_ef": 128,
+        "oversampling": 2.0,
+    },
+    "binary": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "hnsw": {"m": 32, "ef_construct": 200},
+        "quantization": "binary",
+        "hnsw_ef": 256,
+        "oversampling": 3.0,
+    },
+}
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """Look up a profile, falling back to "default" for unknown names."""
+    if name not in COLLECTION_PROFILES:
+        print(f"Warning: unknown Qdrant collection profile '{name}', using 'default'")
+        name = "default"
+    return COLLECTION_PROFILES[name]
+
+def _hnsw_config(profile: Dict[str, Any]) -> Optional[HnswConfigDiff]:
+    return HnswConfigDiff(**profile["hnsw"]) if profile["hnsw"] else None
+
+def _quantization_config(profile: Dict[str, Any], update: bool = False):
+    """Quantization for the profile; None (create) or Disabled (update) when it has none."""
+    if profile["quantization"] == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if profile["quantization"] == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    # update_collection() treats None as "leave unchanged", so removing quantization needs Disabled
+    return Disabled.DISABLED if update else None
+
+def collection_params(name: str, dim: int) -> Dict[str, Any]:
+    """Keyword arguments for create_collection() for the given profile."""
+    profile = get_profile(name)
+    return {
+        "vectors_config": VectorParams(size=dim, distance=Distance.COSINE, on_disk=profile["on_disk"]),
+        "on_disk_payload": profile["on_disk_payload"],
+        "hnsw_config": _hnsw_config(profile),
+        "quantization_config": _quantization_config(profile),
+    }
+
+def update_params(name: str) -> Dict[str, Any]:
+    """Keyword arguments for update_collection() to move an existing collection to a profile."""
+    profile = get_profile(name)
+    return {
+        "vectors_config": {"": VectorParamsDiff(on_disk=profile["on_disk"])},
+        "collection_params": CollectionParamsDiff(on_disk_payload=profile["on_disk_payload"]),
+        "hnsw_config": _hnsw_config(profile),
+        "quantization_config": _quantization_config(profile, update=True),
+    }
+
+def search_params(name: str) -> Optional[SearchParams]:
+    """Search parameters (HNSW ef, rescoring with original vectors) for the given profile."""
+    profile = get_profile(name)
+
+    quantization = None
+    if profile["quantization"]:
+        quantization = QuantizationSearchParams(
+            rescore=True,
+            oversampling=profile["oversampling"]
+        )
+
+    if profile["hnsw_ef"] is None and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=profile["hnsw_ef"], quantization=quantization)
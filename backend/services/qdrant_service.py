@@ -1,60 +1,496 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException
+from qdrant_client.models import (
+    PointStruct, PayloadSchemaType, SparseVector, SparseVectorParams, Modifier,
+    Prefetch, FusionQuery, Fusion,
+    Filter, FieldCondition, GeoRadius, GeoPoint, DatetimeRange, MatchAny, MatchValue
+)
 from config import config
-from typing import List, Dict, Any
+from services.qdrant_profiles import collection_params, update_params, search_params
+from utils.geo_utils import geo_point
+from utils.sparse_utils import bm25_document_vector, bm25_query_vector, incident_sparse_text
+from typing import List, Dict, Any, Optional, Set, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import httpx
+import time
 import uuid
 
+# Payload fields indexed for filtered search: field name -> schema
+PAYLOAD_INDEXES = {
+    "type": PayloadSchemaType.KEYWORD,
+    "urgency": PayloadSchemaType.KEYWORD,
+    "status": PayloadSchemaType.KEYWORD,
+    "verified": PayloadSchemaType.BOOL,
+    "timestamp": PayloadSchemaType.DATETIME,
+    "geo": PayloadSchemaType.GEO,
+}
+
+# Payload kept in Qdrant: only fields used for filtering. Everything else
+# (descriptions, image URLs, display locations) is hydrated from Firestore.
+PAYLOAD_FIELDS = ("type", "urgency", "status", "verified", "timestamp", "source", "event_id")
+
+def slim_payload(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the filterable Qdrant payload for an incident."""
+    payload = {field: metadata[field] for field in PAYLOAD_FIELDS if metadata.get(field) is not None}
+    geo = metadata.get("geo") or geo_point(metadata)
+    if geo:
+        payload["geo"] = geo
+    if not payload.get("timestamp"):
+        payload["timestamp"] = datetime.utcnow().isoformat()
+    # New incidents start as pending until an operator updates them
+    payload.setdefault("status", "pending")
+    payload.setdefault("verified", False)
+    return payload
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Whether a failed call means Qdrant is unreachable (connection refused,
+    timeout, gRPC UNAVAILABLE) rather than that it rejected the request.
+    HTTP error responses (UnexpectedResponse, e.g. 404 for a missing point) are not.
+    """
+    if isinstance(error, ResponseHandlingException):
+        error = error.source
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # grpc.aio.AioRpcError, without importing grpc for REST deployments
+    code = getattr(error, "code", None)
+    return callable(code) and getattr(code(), "name", None) in ("UNAVAILABLE", "DEADLINE_EXCEEDED")
+
 class QdrantService:
     def __init__(self):
-        self.client = QdrantClient(
-            url=config.QDRANT_URL,
-            api_key=config.QDRANT_API_KEY
-        )
+        # QDRANT_URL unset or "local": run on the in-process index only (tests, benchmarks)
+        self.local_only = not config.QDRANT_URL or config.QDRANT_URL == "local"
+        if not config.QDRANT_URL:
+            print("⚠️  QDRANT_URL is not set - vectors are stored in the local index only (set QDRANT_URL=local to silence)")
+        
+        # One client (and its connection pool / gRPC channel) shared by every request
+        self.client = None
+        if not self.local_only:
+            self.client = AsyncQdrantClient(
+                url=config.QDRANT_URL,
+                api_key=config.QDRANT_API_KEY,
+                prefer_grpc=config.QDRANT_PREFER_GRPC,
+                grpc_port=config.QDRANT_GRPC_PORT,
+                timeout=config.QDRANT_TIMEOUT
+            )
+        
+        # Local mirror of every write: answers searches while Qdrant is down
+        # and keeps failed writes for replay
+        self.local_index = None
+        if config.LOCAL_INDEX_ENABLED or self.local_only:
+            # Imported here: the index is opt-in and needs NumPy and file locking
+            from services.local_vector_index import LocalVectorIndex, LocalIndexLocked
+            try:
+                self.local_index = LocalVectorIndex(config.LOCAL_INDEX_PATH, config.EMBEDDING_DIM)
+            except LocalIndexLocked as e:
+                if self.local_only:
+                    raise RuntimeError(f"{e}: local-only mode supports a single worker") from e
+                print(f"⚠️  {e} - running this worker without the local fallback")
+        self.degraded = self.local_only
+        self._down_until = 0.0
+        self._replay_task: Optional[asyncio.Task] = None
         self.collection_name = config.QDRANT_COLLECTION
-        self._ensure_collection()
+        self.profile = config.QDRANT_COLLECTION_PROFILE
+        self.search_params = search_params(self.profile)
+        # Named sparse (BM25-style) vector stored next to the default dense vector
+        self.sparse_name = config.QDRANT_SPARSE_VECTOR
+        self.sparse_enabled = False
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
     
-    def _ensure_collection(self):
+        # Upsert buffer: points from concurrent requests are flushed together
+        self._pending: List[Tuple[PointStruct, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.Task] = None
+        # Strong references to fire-and-forget tasks (the loop keeps only weak ones)
+        self._background: Set[asyncio.Task] = set()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def initialize(self) -> bool:
+        """Ensure the collection exists. Called at app startup and lazily on first use."""
+        if self._ready or self.local_only:
+            return self._ready
+        async with self._ready_lock:
+            if not self._ready:
+                self._ready = await self._ensure_collection()
+                if self._ready:
+                    self._mark_up()
+        return self._ready
+
+    async def _available(self) -> bool:
+        """
+        Whether to call Qdrant now. With a local index to fall back on, calls
+        are skipped for QDRANT_RETRY_SECONDS after Qdrant was unreachable;
+        without one there is nothing to serve instead, so every call is tried.
+        """
+        if self.local_only:
+            return False
+        if self.local_index is None:
+            return await self.initialize()
+        if time.monotonic() < self._down_until:
+            return False
+        if not await self.initialize():
+            self._mark_down("collection unavailable")
+            return False
+        if self.degraded:
+            # Probe once the retry window has passed, then replay buffered writes
+            try:
+                await self.client.collection_exists(self.collection_name)
+                self._mark_up()
+            except Exception as e:
+                self._mark_down(e)
+                return False
+        return True
+
+    def _failed(self, error):
+        """Open the retry window only when Qdrant is unreachable, not when it rejected a request."""
+        if self.local_index is not None and is_connection_error(error):
+            self._mark_down(error)
+
+    def _backfill(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """Without a local index, queue (incident_id, metadata) whose write failed for the embedding backfill."""
+        from services.embedding_backfill_service import embedding_backfill_service
+        embedding_backfill_service.defer_many([
+            (incident_id, f"{metadata.get('type', '')} {metadata.get('description', '')}".strip(), dict(metadata))
+            for incident_id, metadata in items
+        ])
+
+    def _mark_down(self, error):
+        if not self.degraded:
+            print(f"⚠️  Qdrant unavailable ({error}) - serving from local index")
+        self.degraded = True
+        self._down_until = time.monotonic() + config.QDRANT_RETRY_SECONDS
+
+    def _mark_up(self):
+        if self.degraded and not self.local_only:
+            print("✅ Qdrant reachable again")
+        self.degraded = False
+        self._down_until = 0.0
+        if self.local_index is not None and self.local_index.pending and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = self._spawn(self.replay_pending())
+
+    async def replay_pending(self) -> int:
+        """Write points buffered in the local index during an outage to Qdrant."""
+        replayed = 0
+        pending = list(self.local_index.pending)
+        for start in range(0, len(pending), 256):
+            chunk = self.local_index.get_points(pending[start:start + 256])
+            try:
+                if chunk:
+                    await self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=[self._build_point(*point) for point in chunk],
+                        wait=True
+                    )
+                self.local_index.clear_pending(pending[start:start + 256])
+                replayed += len(chunk)
+            except Exception as e:
+                print(f"Error replaying buffered points: {e}")
+                self._failed(e)
+                break
+        if replayed:
+            print(f"✅ Replayed {replayed} buffered points to Qdrant")
+        return replayed
+
+    def _mirror(self, incident_id: str, embedding: List[float], metadata: Dict[str, Any]):
+        """Write a point to the local index (slim payload plus text for sparse vectors on replay)."""
+        if self.local_index is not None:
+            payload = slim_payload(metadata)
+            payload["_text"] = metadata.get("_text") or incident_sparse_text(metadata)
+            self.local_index.upsert(incident_id, embedding, payload)
+
+    def _defer(self, point_ids: List[str]):
+        """Keep mirrored points for replay to Qdrant (nothing to replay to in local-only mode)."""
+        if not self.local_only:
+            self.local_index.mark_pending(point_ids)
+
+    def _local_search(self, query_embedding, limit, filters=None, score_threshold=None) -> List[Dict[str, Any]]:
+        """Degraded-mode dense search on the local index."""
+        if self.local_index is None or not query_embedding:
+            return []
+        results = self.local_index.search(query_embedding, limit=limit, filters=filters, score_threshold=score_threshold)
+        for result in results:
+            result.pop("_text", None)
+        return results
+
+    async def close(self):
+        """Flush buffered points, let background flushes and replays finish, then close the client."""
+        try:
+            await self.flush()
+            await asyncio.gather(*self._background, return_exceptions=True)
+            if self.client:
+                await self.client.close()
+        except Exception as e:
+            print(f"Error closing Qdrant client: {e}")
+
+    async def _ensure_collection(self) -> bool:
         """Create collection if it doesn't exist."""
         try:
-            collections = self.client.get_collections().collections
-            exists = any(c.name == self.collection_name for c in collections)
+            exists = await self.client.collection_exists(self.collection_name)
             
             if not exists:
-                self.client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=config.EMBEDDING_DIM,
-                        distance=Distance.COSINE
-                    )
-                )
+                await self._create_collection()
                 print(f"Created Qdrant collection: {self.collection_name}")
+            else:
+                info = await self.client.get_collection(self.collection_name)
+                sparse_vectors = info.config.params.sparse_vectors or {}
+                self.sparse_enabled = self.sparse_name in sparse_vectors
+                if not self.sparse_enabled:
+                    print(f"Warning: collection {self.collection_name} has no '{self.sparse_name}' sparse vector; "
+                          f"hybrid search falls back to dense until it is recreated")
+
+            await self._ensure_payload_indexes()
+            return True
         except Exception as e:
             print(f"Error ensuring collection: {e}")
-    
-    async def store_embedding(self, incident_id: str, embedding: List[float], metadata: Dict[str, Any]):
-        """Store incident embedding in Qdrant."""
-        try:
-            point = PointStruct(
-                id=incident_id,
-                vector=embedding,
-                payload=metadata
-            )
+            return False
+
+    async def _create_collection(self):
+        """Create the collection with the configured profile (quantization, HNSW, on-disk)."""
+        await self.client.create_collection(
+            collection_name=self.collection_name,
+            sparse_vectors_config={
+                self.sparse_name: SparseVectorParams(modifier=Modifier.IDF)
+            },
+            **collection_params(self.profile, config.EMBEDDING_DIM)
+        )
+        self.sparse_enabled = True
             
-            self.client.upsert(
+    async def apply_profile(self) -> bool:
+        """Move an existing collection to the configured profile (Qdrant re-optimizes in the background)."""
+        try:
+            await self.client.update_collection(
                 collection_name=self.collection_name,
-                points=[point]
+                **update_params(self.profile)
             )
+            print(f"Applied Qdrant profile '{self.profile}' to {self.collection_name}")
             return True
+        except Exception as e:
+            print(f"Error applying collection profile: {e}")
+            return False
+
+    async def _ensure_payload_indexes(self):
+        """Create payload indexes used by filtered searches (no-op if they exist)."""
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            try:
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                print(f"Error creating payload index '{field_name}': {e}")
+    
+    def _build_point(self, incident_id: str, embedding: List[float], metadata: Dict[str, Any]) -> PointStruct:
+        """Build a point with the dense embedding and, if enabled, the sparse term vector."""
+        vector = embedding
+        if self.sparse_enabled:
+            indices, values = bm25_document_vector(metadata.get("_text") or incident_sparse_text(metadata))
+            vector = {"": embedding}
+            if indices:
+                vector[self.sparse_name] = SparseVector(indices=indices, values=values)
+
+        return PointStruct(
+            id=incident_id,
+            vector=vector,
+            payload=slim_payload(metadata)
+        )
+
+    async def store_embedding(self, incident_id: str, embedding: List[float], metadata: Dict[str, Any]):
+        """
+        Store incident embedding in Qdrant.
+
+        The point joins a shared buffer that is upserted as one batch once
+        QDRANT_UPSERT_BATCH_SIZE points are waiting or QDRANT_UPSERT_FLUSH_MS
+        has passed, so concurrent requests share a single round trip.
+        Returns once the batch containing this point has been flushed.
+        Without a local index, a point that cannot be written is queued for
+        the embedding backfill instead of being lost.
+        """
+        try:
+            self._mirror(incident_id, embedding, metadata)
+            if not await self._available():
+                # Buffered in the local index; replayed when Qdrant is back
+                if self.local_index is not None:
+                    self._defer([incident_id])
+                    return True
+                self._backfill([(incident_id, metadata)])
+                return False
+
+            point = self._build_point(incident_id, embedding, metadata)
+            
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((point, future))
+
+            if len(self._pending) >= config.QDRANT_UPSERT_BATCH_SIZE:
+                self._spawn(self.flush())
+            elif self._flush_timer is None:
+                self._flush_timer = self._spawn(self._flush_after_delay())
+
+            stored = await future
+            if not stored and self.local_index is None:
+                self._backfill([(incident_id, metadata)])
+            return stored
         except Exception as e:
             print(f"Error storing embedding: {e}")
             return False
     
-    async def search_similar(self, query_embedding: List[float], limit: int = 10) -> List[Dict[str, Any]]:
-        """Search for similar incidents."""
+    async def _flush_after_delay(self):
+        await asyncio.sleep(config.QDRANT_UPSERT_FLUSH_MS / 1000)
+        self._flush_timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Upsert every buffered point in one request and resolve their waiters."""
+        if self._flush_timer is not None and self._flush_timer is not asyncio.current_task():
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        while self._pending:
+            batch = self._pending[:config.QDRANT_UPSERT_BATCH_SIZE]
+            self._pending = self._pending[config.QDRANT_UPSERT_BATCH_SIZE:]
+
+            try:
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=[point for point, _ in batch],
+                    wait=config.QDRANT_UPSERT_WAIT
+                )
+                success = True
+            except Exception as e:
+                print(f"Error flushing {len(batch)} embeddings: {e}")
+                self._failed(e)
+                # Points are already mirrored locally; keep them for replay
+                success = self.local_index is not None
+                if self.local_index is not None:
+                    self._defer([str(point.id) for point, _ in batch])
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(success)
+
+    async def store_embeddings(
+        self,
+        items: List[Tuple[str, List[float], Dict[str, Any]]],
+        batch_size: int = 256,
+        wait: bool = True,
+        backfill: bool = True
+    ) -> int:
+        """
+        Bulk-store (incident_id, embedding, metadata) tuples, e.g. for reindexing.
+
+        Without a local index, points that cannot be written are queued for
+        the embedding backfill (unless backfill=False, as the backfill itself does).
+
+        Returns:
+            int: Number of points stored
+        """
+        stored = 0
+        for incident_id, embedding, metadata in items:
+            self._mirror(incident_id, embedding, metadata)
+
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            if not await self._available():
+                if self.local_index is not None:
+                    self._defer([incident_id for incident_id, _, _ in chunk])
+                    stored += len(chunk)
+                elif backfill:
+                    self._backfill([(incident_id, metadata) for incident_id, _, metadata in chunk])
+                continue
+            points = [
+                self._build_point(incident_id, embedding, metadata)
+                for incident_id, embedding, metadata in chunk
+            ]
+            try:
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=wait
+                )
+                stored += len(points)
+            except Exception as e:
+                print(f"Error bulk storing {len(points)} embeddings: {e}")
+                self._failed(e)
+                if self.local_index is not None:
+                    self._defer([incident_id for incident_id, _, _ in chunk])
+                    stored += len(chunk)
+                elif backfill:
+                    self._backfill([(incident_id, metadata) for incident_id, _, metadata in chunk])
+        return stored
+
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """
+        Translate a structured filter dict into a Qdrant Filter.
+
+        Supported keys (all optional):
+            types, urgency, status: lists of allowed values
+            verified: bool
+            since, until: datetimes (or ISO strings) bounding the report time
+            within_hours: shorthand for since = now - within_hours
+            near: {"lat", "lng", "radius_km"}
+        """
+        if not filters:
+            return None
+
+        must = []
+        for key, field in (("types", "type"), ("urgency", "urgency"), ("status", "status")):
+            values = filters.get(key)
+            if values:
+                must.append(FieldCondition(key=field, match=MatchAny(any=list(values))))
+
+        if filters.get("verified") is not None:
+            must.append(FieldCondition(key="verified", match=MatchValue(value=filters["verified"])))
+
+        since = filters.get("since")
+        if filters.get("within_hours"):
+            since = datetime.utcnow() - timedelta(hours=filters["within_hours"])
+        until = filters.get("until")
+        if since or until:
+            must.append(FieldCondition(key="timestamp", range=DatetimeRange(gte=since, lte=until)))
+
+        near = filters.get("near")
+        if near:
+            must.append(
+                FieldCondition(
+                    key="geo",
+                    geo_radius=GeoRadius(
+                        center=GeoPoint(lat=near["lat"], lon=near["lng"]),
+                        radius=near.get("radius_km", 5.0) * 1000
+                    )
+                )
+            )
+
+        return Filter(must=must) if must else None
+
+    async def search_similar(
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        score_threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for similar incidents.
+
+        Filters are pushed down into Qdrant (see _build_filter), so the top-k
+        is taken from matching incidents only.
+        """
+        if not await self._available():
+            return self._local_search(query_embedding, limit, filters, score_threshold)
+
         try:
-            results = self.client.search(
+            results = await self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
+                query_filter=self._build_filter(filters),
+                search_params=self.search_params,
+                score_threshold=score_threshold,
                 limit=limit
             )
             
@@ -68,12 +504,143 @@ class QdrantService:
             ]
         except Exception as e:
             print(f"Error searching: {e}")
-            return []
+            self._failed(e)
+            return self._local_search(query_embedding, limit, filters, score_threshold)
+    
+    async def search_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]] = None,
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search: fuse dense and sparse (exact term) rankings inside Qdrant.
+
+        Both candidate lists are retrieved with the same filters and merged
+        with Reciprocal Rank Fusion in a single query_points call. Without
+        `query_embedding` only the sparse ranking is used; without a sparse
+        vector in the collection this is a plain dense search. While Qdrant
+        is down only the dense ranking is available (local index).
+        """
+        if not await self._available():
+            return self._local_search(query_embedding, limit, filters)
+        if not self.sparse_enabled:
+            return await self.search_similar(query_embedding, limit=limit, filters=filters) if query_embedding else []
+
+        indices, values = bm25_query_vector(query_text)
+        if not indices:
+            return await self.search_similar(query_embedding, limit=limit, filters=filters) if query_embedding else []
+
+        try:
+            query_filter = self._build_filter(filters)
+            sparse_query = SparseVector(indices=indices, values=values)
+
+            if query_embedding is None:
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=sparse_query,
+                    using=self.sparse_name,
+                    query_filter=query_filter,
+                    limit=limit,
+                    with_payload=True
+                )
+            else:
+                candidates = limit * config.QDRANT_HYBRID_PREFETCH
+                response = await self.client.query_points(
+                    collection_name=self.collection_name,
+                    prefetch=[
+                        Prefetch(query=query_embedding, filter=query_filter, params=self.search_params, limit=candidates),
+                        Prefetch(query=sparse_query, using=self.sparse_name, filter=query_filter, limit=candidates)
+                    ],
+                    query=FusionQuery(fusion=Fusion.RRF),
+                    limit=limit,
+                    with_payload=True
+                )
+
+            return [
+                {
+                    "id": str(point.id),
+                    "score": point.score,
+                    **point.payload
+                }
+                for point in response.points
+            ]
+        except Exception as e:
+            print(f"Error in hybrid search: {e}")
+            self._failed(e)
+            return self._local_search(query_embedding, limit, filters)
+
+    async def find_duplicate(
+        self,
+        embedding: List[float],
+        lat: float,
+        lng: float,
+        radius_m: float = None,
+        window_hours: float = None,
+        min_score: float = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find an existing incident that describes the same event.
+        
+        Runs a single indexed Qdrant query: vector similarity over the new
+        incident's embedding, restricted to points within `radius_m` of the
+        location and reported within the last `window_hours`.
+        
+        Returns:
+            The best matching payload (with "id" and "score") or None
+        """
+        radius_m = radius_m if radius_m is not None else config.DEDUP_RADIUS_M
+        window_hours = window_hours if window_hours is not None else config.DEDUP_WINDOW_HOURS
+        min_score = min_score if min_score is not None else config.DEDUP_MIN_SCORE
+        
+        # No embedding yet (deferred) or a zero vector: nothing to compare
+        if not embedding or not any(embedding):
+            return None
+        
+        results = await self.search_similar(
+            embedding,
+            limit=1,
+            filters={
+                "near": {"lat": lat, "lng": lng, "radius_km": radius_m / 1000},
+                "within_hours": window_hours
+            },
+            score_threshold=min_score
+        )
+        return results[0] if results else None
+
+    async def update_payload(self, incident_id: str, fields: Dict[str, Any]) -> bool:
+        """Update filterable payload fields (e.g. status, verified) of a stored point."""
+        if self.local_index is not None:
+            self.local_index.set_payload(incident_id, fields)
+        if not await self._available():
+            if self.local_index is not None:
+                self._defer([incident_id])
+            return self.local_index is not None
+        try:
+            await self.client.set_payload(
+                collection_name=self.collection_name,
+                payload=fields,
+                points=[incident_id]
+            )
+            return True
+        except Exception as e:
+            print(f"Error updating payload: {e}")
+            self._failed(e)
+            if self.local_index is not None:
+                self._defer([incident_id])
+            return False
     
     async def delete_point(self, incident_id: str) -> bool:
         """Delete a point from Qdrant."""
+        if self.local_index is not None:
+            self.local_index.delete(incident_id)
+            self.local_index.clear_pending([incident_id])
+        if self.local_only:
+            return True
         try:
-            self.client.delete(
+            await self.initialize()
+            await self.client.delete(
                 collection_name=self.collection_name,
                 points_selector=[incident_id]
             )
@@ -84,16 +651,16 @@ class QdrantService:
     
     async def clear_collection(self) -> bool:
         """Clear all points from the collection."""
+        if self.local_index is not None:
+            self.local_index.clear()
+        if self.local_only:
+            return True
         try:
             # Delete and recreate collection
-            self.client.delete_collection(collection_name=self.collection_name)
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=config.EMBEDDING_DIM,
-                    distance=Distance.COSINE
-                )
-            )
+            await self.client.delete_collection(collection_name=self.collection_name)
+            await self._create_collection()
+            await self._ensure_payload_indexes()
+            self._ready = True
             print(f"Cleared and recreated Qdrant collection: {self.collection_name}")
             return True
         except Exception as e:
@@ -1,82 +1,103 @@
 """
 Social Media Monitoring Service
-Monitors Twitter/X for disaster-related posts
+Keyword triage of Twitter/X posts (streaming ingestion: social_stream_service.py)
 """
-import asyncio
-import re
+import json
 from typing import List, Dict, Any
 from datetime import datetime
 import os
+from config import config
+from utils.keyword_matcher import KeywordMatcher
 
 # Note: For production, install: pip install tweepy
 # For demo, we'll use a mock implementation
 
-class SocialMediaService:
-    def __init__(self):
-        self.keywords = [
+# Keyword tables for post triage; within a table, earlier values win.
+# SOCIAL_KEYWORDS_PATH can point to a JSON file replacing any of them.
+DEFAULT_KEYWORD_TABLES = {
+    "type": {
+        "fire": ["fire"],
+        "flood": ["flood"],
+        "earthquake": ["earthquake"],
+        "building_collapse": ["collapse"],
+        "people_trapped": ["trapped"],
+        "medical": ["medical"]
+    },
+    "urgency": {
+        "high": ["urgent", "emergency", "help", "sos", "🆘"],
+        "medium": ["warning", "alert"]
+    },
+    "relevance": {
+        "disaster": [
             'fire', 'flood', 'earthquake', 'emergency', 'help', 'disaster',
             'rescue', 'trapped', 'building collapse', 'evacuation', 'urgent',
             '🔥', '🌊', '🆘', '⚠️', 'SOS'
         ]
-        self.is_monitoring = False
-        
-    async def start_monitoring(self, callback):
-        """Start monitoring social media for disaster posts."""
-        self.is_monitoring = True
-        
-        # Production implementation required
-        await self._production_monitor(callback)
-    
-    async def _production_monitor(self, callback):
-        """Production implementation required - Twitter API credentials needed."""
-        while self.is_monitoring:
-            await asyncio.sleep(30)
-            print(f"[Social Media Monitor] Twitter API credentials required for monitoring")
-    
-    async def analyze_post(self, post_text: str) -> Dict[str, Any]:
-        """Analyze social media post for disaster information."""
-        # Check if post contains disaster keywords
-        text_lower = post_text.lower()
-        
-        detected_type = "other"
-        for keyword, incident_type in [
-            ('fire', 'fire'),
-            ('flood', 'flood'),
-            ('earthquake', 'earthquake'),
-            ('collapse', 'building_collapse'),
-            ('trapped', 'people_trapped'),
-            ('medical', 'medical')
-        ]:
-            if keyword in text_lower:
-                detected_type = incident_type
-                break
-        
-        # Extract urgency indicators
-        urgency = "medium"
-        if any(word in text_lower for word in ['urgent', 'emergency', 'help', 'sos', '🆘']):
-            urgency = "high"
-        elif any(word in text_lower for word in ['warning', 'alert']):
-            urgency = "medium"
-        else:
-            urgency = "low"
-        
-        # Extract location mentions (simple regex)
-        location_match = re.search(r'(?:in|at|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', post_text)
-        location = location_match.group(1) if location_match else "Unknown location"
+    }
+}
+DEFAULT_LOCATION_CUES = ["in", "at", "near"]
+
+def load_keyword_tables(path: str) -> Dict[str, Any]:
+    """Default tables, with the tables of a JSON file (if any) replacing them."""
+    tables = {**DEFAULT_KEYWORD_TABLES, "location_cues": DEFAULT_LOCATION_CUES}
+    if not path:
+        return tables
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        tables.update({name: value for name, value in overrides.items() if name in tables})
+        print(f"🔑 Social keyword tables loaded from {path}")
+    except Exception as e:
+        print(f"⚠️  Could not load social keyword tables from {path}: {e}")
+    return tables
+
+class SocialMediaService:
+    def __init__(self):
+        tables = load_keyword_tables(config.SOCIAL_KEYWORDS_PATH)
+        self.keywords = [keyword for keywords in tables["relevance"].values() for keyword in keywords]
+        # Built once; a keyword listed in several tables is still searched once per post
+        self.matcher = KeywordMatcher(
+            {name: tables[name] for name in ("type", "urgency", "relevance")},
+            tables["location_cues"]
+        )
         
+    def _analysis(self, post_text: str, scan: Dict[str, Any]) -> Dict[str, Any]:
         return {
-            "type": detected_type,
-            "urgency": urgency,
+            "type": scan["type"][0] if scan["type"] else "other",
+            "urgency": scan["urgency"][0] if scan["urgency"] else "low",
             "description": post_text[:200],
-            "location_text": location,
+            "location_text": scan["location"] or "Unknown location",
             "confidence": 0.7,  # Social media posts have lower confidence
             "source": "social_media",
-            "people_affected": 0
+            "people_affected": 0,
+            "relevant": bool(scan["relevance"]),
+            "keywords": scan["keywords"]
         }
     
-    def stop_monitoring(self):
-        """Stop monitoring social media."""
-        self.is_monitoring = False
+    def classify(self, post_text: str) -> Dict[str, Any]:
+        """Keyword triage of a post: type, urgency, location and whether it looks disaster-related."""
+        return self._analysis(post_text, self.matcher.scan(post_text))
+    
+    def classify_posts(self, posts: List[str], relevant_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Classify a batch of posts (e.g. one page of a stream).
+        
+        With relevant_only, posts matching no relevance keyword are dropped;
+        each result keeps its position in `posts` as "index".
+        """
+        scan_post = self.matcher.scan
+        results = []
+        for index, post_text in enumerate(posts):
+            scan = scan_post(post_text)
+            if scan["relevance"] or not relevant_only:
+                analysis = self._analysis(post_text, scan)
+                analysis["index"] = index
+                results.append(analysis)
+        return results
+    
+    async def analyze_post(self, post_text: str) -> Dict[str, Any]:
+        """Analyze social media post for disaster information."""
+        return self.classify(post_text)
 
 # Production implementation with real Twitter API
 class TwitterService:
@@ -0,0 +1,355 @@
+"""
+Social Stream Service
+Ingests social media posts from pluggable sources, triages them by keyword and stores the relevant ones
+"""
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import os
+import time
+from collections import deque
+from datetime import datetime
+from config import config
+from services.social_media_service import social_media_service
+from services.firestore_service import firestore_service
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from utils.format_utils import format_incident_response
+from websocket_manager import broadcast_new_incident
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Awaitable
+
+# Receives a batch of relevant posts: [{"post": {...}, "analysis": {...}}]
+PersistFn = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+LAG_SAMPLES = 10000
+YIELD_EVERY = 256  # Producers hand the loop back at least this often, even when the queue has room
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from a number or ISO 8601 string, None if unparseable."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def _percentiles(samples: deque) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "p50": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2)
+    }
+
+class SocialSource(ABC):
+    """
+    A stream of posts. `posts()` yields dicts with at least "text", and
+    optionally "id", "user", "source", "location" and "created_at".
+    """
+    name = "source"
+
+    @abstractmethod
+    def posts(self) -> AsyncIterator[Dict[str, Any]]:
+        """Async generator of posts; returning ends the source."""
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name}
+
+class JsonlReplaySource(SocialSource):
+    """
+    Replays a JSONL file of posts (one object per line).
+
+    With `speed` > 0, posts are paced by their recorded "created_at" (2.0
+    replays twice as fast as recorded). Posts without timestamps are paced
+    at `rate` posts per second. With neither, the file is read as fast as the
+    engine accepts it. Lines are read in ~1 MB blocks off the event loop.
+    """
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 0.0, rate: float = 0.0, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.rate = rate
+        self.loop = loop
+        self.skipped = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "path": self.path, "speed": self.speed, "rate": self.rate,
+                "loop": self.loop, "skipped": self.skipped}
+
+    async def posts(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            started = time.monotonic()
+            first_created = None
+            sent = 0
+            with open(self.path, "r", encoding="utf-8") as f:
+                while True:
+                    lines = await asyncio.to_thread(f.readlines, 1 << 20)
+                    if not lines:
+                        break
+                    for line in lines:
+                        try:
+                            post = json.loads(line)
+                        except json.JSONDecodeError:
+                            self.skipped += 1
+                            continue
+                        if not isinstance(post, dict) or not post.get("text"):
+                            self.skipped += 1
+                            continue
+
+                        # Seconds after the start of this pass at which the post is due
+                        due = 0.0
+                        created = _timestamp(post.get("created_at")) if self.speed > 0 else None
+                        if created is not None:
+                            first_created = created if first_created is None else first_created
+                            due = (created - first_created) / self.speed
+                        elif self.rate > 0:
+                            due = sent / self.rate
+                        delay = due - (time.monotonic() - started)
+                        if delay > 0.001:
+                            await asyncio.sleep(delay)
+                        sent += 1
+                        yield post
+            if not self.loop:
+                return
+
+SOURCES = {"replay": JsonlReplaySource}
+
+def replay_path(name: str) -> str:
+    """
+    Resolve a replay file inside SOCIAL_REPLAY_DIR.
+
+    Raises:
+        ValueError: If the path leaves the directory or the file does not exist
+    """
+    root = os.path.realpath(config.SOCIAL_REPLAY_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError("Replay files must be inside SOCIAL_REPLAY_DIR")
+    if not os.path.isfile(path):
+        raise ValueError(f"Replay file not found: {name}")
+    return path
+
+async def store_posts(records: List[Dict[str, Any]]):
+    """
+    Store triaged posts as unverified incidents (one batched write).
+
+    Embeddings are backfilled while the backfill queue holds fewer than
+    SOCIAL_BACKFILL_MAX_PENDING items; beyond that, posts are stored without a vector.
+    """
+    incidents = []
+    for record in records:
+        post, analysis = record["post"], record["analysis"]
+        incident_data = {
+            "type": analysis["type"],
+            "lat": None,
+            "lng": None,
+            "confidence": analysis["confidence"],
+            "urgency": analysis["urgency"],
+            "description": f"[Social Media] {analysis['description']}",
+            "people_affected": 0,
+            "image_url": None,
+            "location_text": post.get("location") or analysis["location_text"],
+            "source": post.get("source") or "social_stream",
+            "source_user": post.get("user") or "anonymous",
+            "source_post_id": post.get("id"),
+            "verified": False  # Keyword triage only; no Gemini analysis yet
+        }
+        incident_data["event_id"] = clustering_service.assign(incident_data)
+        incidents.append(incident_data)
+
+    incident_ids = await firestore_service.store_incidents(incidents)
+    # One queue append per batch, bounded so a firehose cannot outgrow the backfill (32 per Gemini call)
+    embedding_backfill_service.defer_many(
+        [(incident_id, f"{incident_data['type']} {incident_data['description']}", incident_data)
+         for incident_id, incident_data in zip(incident_ids, incidents)],
+        max_pending=config.SOCIAL_BACKFILL_MAX_PENDING
+    )
+    responses = [format_incident_response(incident_data) for incident_data in incidents]
+    await asyncio.gather(*(broadcast_new_incident(response) for response in responses))
+
+class SocialStreamService:
+    """
+    Source tasks push posts into a bounded queue (SOCIAL_QUEUE_SIZE). When
+    it is full, SOCIAL_OVERFLOW decides: "block" pauses the sources
+    (backpressure, for replays and APIs that can wait), "drop" discards new
+    posts and counts them (for live firehoses that cannot).
+
+    One consumer takes whatever is queued, up to SOCIAL_TRIAGE_BATCH posts,
+    and classifies it with the keyword matcher. Relevant posts are
+    persisted in batches of SOCIAL_PERSIST_BATCH, or after
+    SOCIAL_PERSIST_INTERVAL seconds, with at most SOCIAL_PERSIST_CONCURRENCY
+    writes in flight. A slow store therefore backs up into the queue instead
+    of growing memory. `stats()` reports throughput, drops and lag (time
+    from enqueue to triage and to persistence).
+
+    The engine stops by itself once every source is exhausted.
+    """
+
+    def __init__(self, persist: Optional[PersistFn] = None):
+        self.persist = persist or store_posts
+        self.sources: List[SocialSource] = []
+        self.queue: Optional[asyncio.Queue] = None
+        self._producers: List[asyncio.Task] = []
+        self._consumer: Optional[asyncio.Task] = None
+        self._persisting: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopping = False
+        self._reset()
+
+    def _reset(self):
+        self.counts = {
+            "received": 0, "enqueued": 0, "dropped": 0, "triaged": 0, "relevant": 0,
+            "persisted": 0, "persist_failed": 0, "triage_batches": 0, "persist_batches": 0
+        }
+        self.queue_max_depth = 0
+        self.queue_lag: deque = deque(maxlen=LAG_SAMPLES)
+        self.persist_lag: deque = deque(maxlen=LAG_SAMPLES)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._consumer is not None and not self._consumer.done()
+
+    def start(self, sources: List[SocialSource]) -> bool:
+        """Start ingesting from the given sources (call from the running event loop). False if already running."""
+        if self.running:
+            return False
+        self._reset()
+        self.sources = sources
+        self.queue = asyncio.Queue(maxsize=config.SOCIAL_QUEUE_SIZE)
+        self._slots = asyncio.Semaphore(config.SOCIAL_PERSIST_CONCURRENCY)
+        self.started_at = time.monotonic()
+        self._producers = [asyncio.create_task(self._produce(source)) for source in sources]
+        self._stopping = not sources
+        self._consumer = asyncio.create_task(self._consume())
+        print(f"📡 Social stream started: {', '.join(s.name for s in sources)} "
+              f"(queue {config.SOCIAL_QUEUE_SIZE}, overflow {config.SOCIAL_OVERFLOW})")
+        return True
+
+    async def stop(self):
+        """Stop the sources, then triage and persist what is already queued."""
+        for task in self._producers:
+            task.cancel()
+        await asyncio.gather(*self._producers, return_exceptions=True)
+        self._stopping = True
+        if self._consumer is not None:
+            await asyncio.gather(self._consumer, return_exceptions=True)
+
+    async def wait(self):
+        """Wait until the engine has stopped (all sources exhausted, or stop())."""
+        if self._consumer is not None:
+            await asyncio.gather(self._consumer, return_exceptions=True)
+
+    async def _produce(self, source: SocialSource):
+        drop = config.SOCIAL_OVERFLOW == "drop"
+        counts = self.counts
+        try:
+            async for post in source.posts():
+                counts["received"] += 1
+                if counts["received"] % YIELD_EVERY == 0:
+                    self.queue_max_depth = max(self.queue_max_depth, self.queue.qsize())
+                    await asyncio.sleep(0)
+                item = (post, time.monotonic())
+                if drop:
+                    try:
+                        self.queue.put_nowait(item)
+                    except asyncio.QueueFull:
+                        counts["dropped"] += 1
+                        continue
+                else:
+                    await self.queue.put(item)
+                counts["enqueued"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Social source {source.name} failed: {e}")
+        finally:
+            if all(task.done() or task is asyncio.current_task() for task in self._producers):
+                self._stopping = True
+
+    def _triage(self, batch: List[tuple]) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        self.queue_lag.extend(now - ingested for _, ingested in batch)
+        results = social_media_service.classify_posts([post["text"] for post, _ in batch], relevant_only=True)
+        self.counts["triaged"] += len(batch)
+        self.counts["triage_batches"] += 1
+        self.counts["relevant"] += len(results)
+        return [
+            {"post": batch[result["index"]][0], "analysis": result, "ingested": batch[result["index"]][1]}
+            for result in results
+        ]
+
+    async def _consume(self):
+        pending: List[Dict[str, Any]] = []
+        try:
+            while not (self._stopping and self.queue.empty()):
+                interval = config.SOCIAL_PERSIST_INTERVAL
+                timeout = max(0.0, interval - (time.monotonic() - pending[0]["ingested"])) if pending else interval
+                self.queue_max_depth = max(self.queue_max_depth, self.queue.qsize())
+                try:
+                    batch = [await asyncio.wait_for(self.queue.get(), timeout=max(timeout, 0.001))]
+                except asyncio.TimeoutError:
+                    batch = []
+                while batch and len(batch) < config.SOCIAL_TRIAGE_BATCH and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+
+                if batch:
+                    try:
+                        pending.extend(self._triage(batch))
+                    except Exception as e:
+                        print(f"⚠️  Social triage failed for {len(batch)} posts: {e}")
+                if pending and (len(pending) >= config.SOCIAL_PERSIST_BATCH
+                                or time.monotonic() - pending[0]["ingested"] >= interval):
+                    await self._flush(pending)
+                    pending = []
+        finally:
+            if pending:
+                await self._flush(pending)
+            await asyncio.gather(*self._persisting, return_exceptions=True)
+            self.finished_at = time.monotonic()
+            print(f"📡 Social stream stopped: {self.counts['triaged']} triaged, "
+                  f"{self.counts['persisted']} stored, {self.counts['dropped']} dropped")
+
+    async def _flush(self, records: List[Dict[str, Any]]):
+        """Persist a batch in the background; waits for a free slot (backpressure on the consumer)."""
+        await self._slots.acquire()
+        task = asyncio.create_task(self._persist(records))
+        self._persisting.add(task)
+        task.add_done_callback(self._persisting.discard)
+
+    async def _persist(self, records: List[Dict[str, Any]]):
+        try:
+            await self.persist(records)
+            now = time.monotonic()
+            self.persist_lag.extend(now - record["ingested"] for record in records)
+            self.counts["persisted"] += len(records)
+            self.counts["persist_batches"] += 1
+        except Exception as e:
+            self.counts["persist_failed"] += len(records)
+            print(f"❌ Storing {len(records)} social posts failed: {e}")
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.monotonic()) - self.started_at) if self.started_at else 0.0
+        counts = self.counts
+        return {
+            "running": self.running,
+            "sources": [source.describe() for source in self.sources],
+            **counts,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "queue_max_depth": self.queue_max_depth,
+            "queue_capacity": config.SOCIAL_QUEUE_SIZE,
+            "overflow": config.SOCIAL_OVERFLOW,
+            "elapsed_s": round(elapsed, 2),
+            "posts_per_second": round(counts["triaged"] / elapsed, 1) if elapsed > 0 else None,
+            "backfill_pending": len(embedding_backfill_service.pending),
+            "queue_lag_ms": _percentiles(self.queue_lag),
+            "persist_lag_ms": _percentiles(self.persist_lag)
+        }
+
+social_stream_service = SocialStreamService()
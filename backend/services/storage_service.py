@@ -1,46 +1,182 @@
-from supabase import create_client, Client
 from config import config
-import uuid
+from typing import Union, Optional, Dict
+import asyncio
+import hashlib
+import httpx
+import mimetypes
 import os
 
+# Preferred extensions (mimetypes.guess_extension returns e.g. ".jpe" on some platforms)
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/heic": ".heic",
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+    "application/msword": ".doc",
+    "text/plain": ".txt",
+}
+
+def resolve_content_type(content_type: Optional[str], name: Optional[str]) -> str:
+    """Use the declared MIME type unless it is missing/generic, then guess from the filename."""
+    if content_type and content_type != "application/octet-stream":
+        return content_type.split(";")[0].strip()
+    guessed, _ = mimetypes.guess_type(name or "")
+    return guessed or "application/octet-stream"
+
+def extension_for(content_type: str, name: Optional[str]) -> str:
+    ext = EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type)
+    if not ext and name and "." in name:
+        ext = "." + name.rsplit(".", 1)[-1].lower()
+    return ext or ""
+
 class StorageService:
+    """
+    Supabase Storage over its REST API with one pooled async HTTP client,
+    so uploads never block the event loop and can run alongside Gemini.
+
+    Objects are content-addressed (`{folder}/{sha256[:2]}/{sha256}{ext}`), so
+    the same bytes are stored once. Keys known to exist are kept in a local
+    manifest and returned without any network call.
+    """
+
     def __init__(self):
         if config.SUPABASE_URL and config.SUPABASE_KEY:
-            self.client: Client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+            self.base_url = f"{config.SUPABASE_URL.rstrip('/')}/storage/v1"
             self.bucket_name = config.SUPABASE_BUCKET
+            self.enabled = True
         else:
             print("Warning: Supabase credentials not configured")
-            self.client = None
-    
-    async def upload_image(self, file_path: str, content_type: str = "image/jpeg") -> str:
-        """Upload image to Supabase Storage and return public URL."""
-        try:
-            if not self.client:
-                return f"local://{file_path}"
-            
-            # Generate unique filename
-            filename = f"incidents/{uuid.uuid4()}.jpg"
-            
-            # Read file content
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Upload to Supabase Storage with upsert to bypass RLS
-            response = self.client.storage.from_(self.bucket_name).upload(
-                path=filename,
-                file=file_content,
-                file_options={
-                    "content-type": content_type,
-                    "upsert": "true"
-                }
+            self.enabled = False
+        self._client: Optional[httpx.AsyncClient] = None
+        self.manifest_path = config.STORAGE_MANIFEST_PATH
+        self._known: set = set()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._load_manifest()
+
+    def _load_manifest(self):
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            self._known = {line.strip() for line in f if line.strip()}
+
+    def _remember(self, key: str):
+        self._known.add(key)
+        if self.manifest_path:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(key + "\n")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client (created on first use)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {config.SUPABASE_KEY}",
+                    "apikey": config.SUPABASE_KEY
+                },
+                timeout=httpx.Timeout(config.STORAGE_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=config.STORAGE_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.STORAGE_MAX_CONNECTIONS
+                )
             )
-            
-            # Get public URL
-            public_url = self.client.storage.from_(self.bucket_name).get_public_url(filename)
-            
-            return public_url
+        return self._client
+
+    def public_url(self, path: str) -> str:
+        return f"{self.base_url}/object/public/{self.bucket_name}/{path}"
+
+    def object_key(self, sha256: str, content_type: str, name: Optional[str] = None, folder: str = "incidents") -> str:
+        return f"{folder}/{sha256[:2]}/{sha256}{extension_for(content_type, name)}"
+
+    async def upload_file(
+        self,
+        data: bytes,
+        content_type: Optional[str] = None,
+        name: Optional[str] = None,
+        sha256: Optional[str] = None,
+        folder: str = "incidents"
+    ) -> str:
+        """
+        Store bytes under their content hash and return the public URL.
+
+        Bytes the bucket already holds are not sent again: the manifest answers
+        instantly, and a conflict on the (non-upsert) upload counts as "exists".
+        """
+        content_type = resolve_content_type(content_type, name)
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        return await self._store(self.object_key(sha256, content_type, name, folder), data, content_type)
+
+    async def upload_variant(self, sha256: str, variant: str, data: bytes, content_type: str = "image/webp") -> str:
+        """Store a derivative (e.g. thumbnail) next to its original: `incidents/ab/<sha256>_<variant>.webp`."""
+        key = f"incidents/{sha256[:2]}/{sha256}_{variant}{extension_for(content_type, None)}"
+        return await self._store(key, data, content_type)
+
+    async def _store(self, key: str, data: bytes, content_type: str) -> str:
+        if not self.enabled:
+            return f"local://{key}"
+        if key in self._known:
+            return self.public_url(key)
+
+        # Concurrent uploads of the same bytes share one request
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._put(key, data, content_type))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(task)
+        return self.public_url(key)
+
+    async def _put(self, key: str, data: bytes, content_type: str):
+        response = await self.client.post(
+            f"{self.base_url}/object/{self.bucket_name}/{key}",
+            content=data,
+            headers={
+                "Content-Type": content_type,
+                "x-upsert": "false",
+                "Cache-Control": "max-age=31536000, immutable"
+            }
+        )
+        # Supabase answers 409 (or 400 "Duplicate") when the key already exists
+        if response.status_code == 409 or (response.status_code == 400 and "Duplicate" in response.text):
+            print(f"♻️  Storage object already exists: {key}")
+        else:
+            response.raise_for_status()
+        self._remember(key)
+
+    async def upload_image(
+        self,
+        image: Union[str, bytes],
+        content_type: str = "image/jpeg",
+        name: str = "upload",
+        sha256: Optional[str] = None
+    ) -> str:
+        """Upload image (file path or in-memory bytes) to Supabase Storage and return public URL."""
+        try:
+            if isinstance(image, str):
+                name = os.path.basename(image)
+                with open(image, 'rb') as f:
+                    image = f.read()
+            return await self.upload_file(bytes(image), content_type, name, sha256, folder="incidents")
         except Exception as e:
             print(f"Error uploading image to Supabase: {e}")
             raise Exception(f"Image upload failed: {e}")
 
+    async def upload_document(self, data: bytes, content_type: Optional[str], name: str, sha256: Optional[str] = None) -> str:
+        """Upload a report document with its own extension and MIME type."""
+        try:
+            return await self.upload_file(data, content_type, name, sha256, folder="documents")
+        except Exception as e:
+            print(f"Error uploading document to Supabase: {e}")
+            raise Exception(f"Document upload failed: {e}")
+
+    async def close(self):
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
 storage_service = StorageService()
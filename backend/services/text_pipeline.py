@@ -0,0 +1,163 @@
+"""
+Text Ingestion Pipeline
+Bulk analysis of short messages (hotline transcripts, SMS gateways)
+
+Messages are packed into groups of up to TEXT_BULK_ITEMS_PER_PROMPT (and
+TEXT_BULK_PROMPT_CHARS characters). Each group is one Gemini prompt with
+per-item IDs; items missing from a malformed answer are retried one by
+one. A group's embeddings, Firestore writes and Qdrant upserts are each a
+single batched call.
+"""
+import asyncio
+import time
+from config import config
+from services.gemini_service import gemini_service
+from services.qdrant_service import qdrant_service
+from services.firestore_service import firestore_service
+from services.clustering_service import clustering_service
+from services.embedding_backfill_service import embedding_backfill_service
+from services.alert_dispatcher import alert_dispatcher
+from utils.format_utils import format_incident_response
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+
+def text_incident(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Incident record for a text report (texts carry no coordinates)."""
+    return {
+        "type": analysis['type'],
+        "lat": None,
+        "lng": None,
+        "confidence": analysis['confidence'],
+        "urgency": analysis['urgency'],
+        "description": analysis['description'],
+        "people_affected": analysis.get('people_affected', 0),
+        "location_text": analysis.get('location_text'),
+        "image_url": None
+    }
+
+def group_texts(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Pack items into prompt-sized groups, keeping their order."""
+    groups, current, size = [], [], 0
+    for item in items:
+        if current and (len(current) >= config.TEXT_BULK_ITEMS_PER_PROMPT
+                        or size + len(item["text"]) > config.TEXT_BULK_PROMPT_CHARS):
+            groups.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += len(item["text"])
+    if current:
+        groups.append(current)
+    return groups
+
+class TextPipeline:
+    async def analyze_group(self, group: List[Dict[str, Any]]) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, int]]:
+        """
+        Analyze a group with one prompt, falling back to single-item calls for what it missed.
+
+        Returns:
+            (analysis per item key, {"prompts": Gemini calls made, "fallbacks": items retried alone})
+        """
+        answered: Dict[str, Dict[str, Any]] = {}
+        if len(group) > 1:
+            answered = await gemini_service.analyze_texts(
+                [{"id": str(i), "text": item["text"]} for i, item in enumerate(group)]
+            )
+
+        missing = [i for i in range(len(group)) if str(i) not in answered]
+        if missing:
+            single = await asyncio.gather(*(gemini_service.analyze_text(group[i]["text"]) for i in missing))
+            answered.update({str(i): analysis for i, analysis in zip(missing, single)})
+
+        calls = {
+            "prompts": int(len(group) > 1) + len(missing),
+            "fallbacks": len(missing) if len(group) > 1 else 0
+        }
+        return {group[int(i)]["key"]: analysis for i, analysis in answered.items()}, calls
+
+    async def process_group(self, group: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Analyze, embed and store one group. Returns (per-item results, Gemini call counts)."""
+        try:
+            analyses, calls = await self.analyze_group(group)
+            embeddings = await gemini_service.generate_embeddings([item["text"] for item in group]) \
+                or [None] * len(group)
+
+            incidents = []
+            for item, embedding in zip(group, embeddings):
+                incident_data = text_incident(analyses[item["key"]])
+                incident_data["event_id"] = clustering_service.assign(incident_data, embedding)
+                incidents.append(incident_data)
+
+            incident_ids = await firestore_service.store_incidents(incidents)
+
+            points = []
+            for item, incident_id, incident_data, embedding in zip(group, incident_ids, incidents, embeddings):
+                if embedding is None:
+                    embedding_backfill_service.defer(incident_id, item["text"], incident_data)
+                else:
+                    points.append((incident_id, embedding, incident_data))
+            if points:
+                await qdrant_service.store_embeddings(points, wait=config.QDRANT_UPSERT_WAIT)
+
+            results = []
+            for item, incident_data in zip(group, incidents):
+                response = format_incident_response(incident_data)
+                if incident_data["urgency"] == "high":
+                    alert_dispatcher.enqueue(response)
+                results.append({"id": item["id"], "success": True, "incident": response})
+            return results, calls
+
+        except Exception as e:
+            print(f"❌ Text group of {len(group)} failed: {e}")
+            return [{"id": item["id"], "success": False, "error": str(e)} for item in group], {}
+
+    async def stream(self, items: List[Dict[str, Any]],
+                     errors: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield ("result", {...}) per message as its group finishes, then ("summary", {...}).
+
+        Args:
+            items: [{"id": client ID, "text": ...}]
+            errors: Pre-failed results (e.g. unparseable input lines), yielded first
+        """
+        started = time.perf_counter()
+        items = [{**item, "key": index} for index, item in enumerate(items)]
+        groups = group_texts(items)
+        slots = asyncio.Semaphore(config.TEXT_BULK_CONCURRENCY)
+        total = successful = 0
+        calls = {"prompts": 0, "fallbacks": 0}
+
+        async def run(group):
+            async with slots:
+                return await self.process_group(group)
+
+        for error in errors or []:
+            total += 1
+            yield "result", error
+
+        tasks = [asyncio.ensure_future(run(group)) for group in groups]
+        try:
+            for next_group in asyncio.as_completed(tasks):
+                results, group_calls = await next_group
+                for key, count in group_calls.items():
+                    calls[key] += count
+                for result in results:
+                    total += 1
+                    successful += int(result["success"])
+                    yield "result", result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "total": total,
+            "successful": successful,
+            "failed": total - successful,
+            "prompts": calls["prompts"],
+            "fallbacks": calls["fallbacks"],
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "items_per_second": round(total / elapsed, 2) if elapsed > 0 else None
+        }
+        print(f"💬 Bulk text done: {successful}/{total} messages, {summary['prompts']} Gemini prompts in {elapsed:.1f}s")
+        yield "summary", summary
+
+text_pipeline = TextPipeline()
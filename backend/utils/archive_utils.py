@@ -0,0 +1,75 @@
+from typing import BinaryIO, Iterator, Optional, Dict
+import mimetypes
+import posixpath
+import tarfile
+import zipfile
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".heic", ".tif", ".tiff"}
+
+class ArchiveEntry:
+    """One image entry: its bytes, or why it could not be read."""
+
+    def __init__(self, name: str, data: Optional[bytes] = None, error: Optional[str] = None):
+        self.name = name
+        self.data = data
+        self.error = error
+
+    @property
+    def content_type(self) -> str:
+        return mimetypes.guess_type(self.name)[0] or "image/jpeg"
+
+def is_image_entry(name: str) -> bool:
+    """Image files only; skips directories, hidden files and macOS resource forks."""
+    base = posixpath.basename(name)
+    if not base or base.startswith(".") or "__MACOSX/" in name:
+        return False
+    return posixpath.splitext(base)[1].lower() in IMAGE_EXTENSIONS
+
+def archive_format(fileobj: BinaryIO) -> Optional[str]:
+    """Return "zip", "tar" (optionally gzip/bz2/xz compressed) or None."""
+    try:
+        fileobj.seek(0)
+        if zipfile.is_zipfile(fileobj):
+            return "zip"
+        fileobj.seek(0)
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            archive.next()
+        return "tar"
+    except tarfile.TarError:
+        return None
+    finally:
+        fileobj.seek(0)
+
+def iter_archive(fileobj: BinaryIO, fmt: str, max_entry_bytes: int, stats: Dict[str, int]) -> Iterator[ArchiveEntry]:
+    """
+    Yield the image entries of a "zip" or "tar" archive one at a time.
+
+    Only the current entry is held in memory. TARs are read in stream mode,
+    so members are never indexed up front. Oversized entries are yielded
+    with an error instead of being read. `stats` counts "entries" and
+    "skipped" (non-image) as the archive is walked.
+    """
+    fileobj.seek(0)
+    if fmt == "zip":
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                stats["entries"] += 1
+                if info.is_dir() or not is_image_entry(info.filename):
+                    stats["skipped"] += 1
+                    continue
+                if info.file_size > max_entry_bytes:
+                    yield ArchiveEntry(info.filename, error=f"Entry too large ({info.file_size} bytes)")
+                    continue
+                yield ArchiveEntry(info.filename, archive.read(info))
+        return
+
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            stats["entries"] += 1
+            if not member.isfile() or not is_image_entry(member.name):
+                stats["skipped"] += 1
+                continue
+            if member.size > max_entry_bytes:
+                yield ArchiveEntry(member.name, error=f"Entry too large ({member.size} bytes)")
+                continue
+            yield ArchiveEntry(member.name, archive.extractfile(member).read())
@@ -0,0 +1,112 @@
+from typing import List, Optional
+import io
+import zlib
+import PyPDF2
+import docx
+
+# Parsing functions are module-level so they can run in the shared process pool
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of pages in a PDF (0 if it cannot be parsed)."""
+    try:
+        return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+        return 0
+
+def extract_pdf_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF; unreadable pages come back empty."""
+    try:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    except Exception as e:
+        print(f"Error extracting PDF text: {e}")
+        return []
+    pages = []
+    for number in range(start, stop):
+        try:
+            pages.append(pdf_reader.pages[number].extract_text() or "")
+        except Exception as e:
+            print(f"Error extracting PDF page {number + 1}: {e}")
+            pages.append("")
+    return pages
+
+def extract_text_from_docx(data: bytes) -> str:
+    """Extract text from DOCX bytes."""
+    try:
+        doc = docx.Document(io.BytesIO(data))
+        return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+    except Exception as e:
+        print(f"Error extracting DOCX text: {e}")
+        return ""
+
+def extract_text_from_txt(data: bytes) -> str:
+    """Extract text from TXT bytes."""
+    try:
+        return data.decode('utf-8')
+    except Exception as e:
+        print(f"Error extracting TXT text: {e}")
+        return ""
+
+class TextChunker:
+    """
+    Cut a stream of text (e.g. PDF pages) into prompt-sized chunks as it arrives.
+
+    Text is consumed line by line. Once a chunk holds `min_chars`, it ends
+    after any line whose CRC is 0 mod `boundary_every`, and it always ends
+    before `max_chars`. Boundaries therefore depend on the text itself, not
+    on offsets. An edit in a revised report only changes the chunks around
+    it; every other chunk has the same text (and cache key) as before.
+    """
+
+    def __init__(self, max_chars: int, min_chars: Optional[int] = None, boundary_every: int = 16):
+        self.max_chars = max_chars
+        self.min_chars = min_chars if min_chars is not None else max_chars // 2
+        self.boundary_every = boundary_every
+        self.total_chars = 0
+        self._parts: List[str] = []
+        self._size = 0
+
+    def add(self, text: str) -> List[str]:
+        """Feed more text; returns the chunks it completed."""
+        chunks = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            self.total_chars += len(line)
+            for piece in self._split(line):
+                if self._size + len(piece) > self.max_chars and self._parts:
+                    chunks.append(self._take())
+                self._parts.append(piece)
+                self._size += len(piece) + 1
+                if self._size >= self.min_chars and zlib.crc32(piece.encode()) % self.boundary_every == 0:
+                    chunks.append(self._take())
+        return chunks
+
+    def finish(self) -> List[str]:
+        """Return the last, partially filled chunk (if any)."""
+        return [self._take()] if self._parts else []
+
+    def _take(self) -> str:
+        chunk = "\n".join(self._parts)
+        self._parts = []
+        self._size = 0
+        return chunk
+
+    def _split(self, line: str) -> List[str]:
+        """Split a line longer than a chunk on word boundaries."""
+        if len(line) <= self.max_chars:
+            return [line]
+        pieces, current = [], ""
+        for word in line.split(" "):
+            if len(current) + len(word) + 1 > self.max_chars and current:
+                pieces.append(current)
+                current = ""
+            # A "word" longer than a whole chunk is cut hard
+            while len(word) > self.max_chars:
+                pieces.append(word[:self.max_chars])
+                word = word[self.max_chars:]
+            current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+        return pieces
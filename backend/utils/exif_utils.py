@@ -1,11 +1,12 @@
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
+import io
 
-def get_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
-    """Extract GPS coordinates from image EXIF data."""
+def get_gps_coordinates(image: Union[str, bytes, memoryview]) -> Optional[Tuple[float, float]]:
+    """Extract GPS coordinates from image EXIF data (file path or in-memory bytes)."""
     try:
-        image = Image.open(image_path)
+        image = Image.open(image if isinstance(image, str) else io.BytesIO(image))
         exif_data = image._getexif()
         
         if not exif_data:
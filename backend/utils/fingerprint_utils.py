@@ -0,0 +1,54 @@
+from typing import List
+import hashlib
+import re
+import zlib
+import numpy as np
+
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32  # 32 bands x 4 rows: pairs above ~0.45 Jaccard become candidates
+SHINGLE_WORDS = 5
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240611)  # Fixed seed: signatures must be stable across restarts
+_A = _rng.integers(1, (1 << 31) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace (PDF/DOCX extraction noise)."""
+    return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+def chunk_key(text: str) -> str:
+    """Cache key of a chunk's normalized text."""
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+def minhash_signature(text: str, block: int = 8192) -> np.ndarray:
+    """
+    MinHash signature over word shingles of the normalized text.
+
+    The fraction of equal positions between two signatures estimates the
+    Jaccard similarity of their shingle sets.
+    """
+    words = normalize_text(text).split()
+    if len(words) < SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    signature = np.full(MINHASH_PERMUTATIONS, _PRIME, dtype=np.uint64)
+    # (a * x + b) mod p per permutation, in blocks to bound the shingles x permutations matrix
+    for start in range(0, len(hashes), block):
+        permuted = (np.outer(hashes[start:start + block] % _PRIME, _A) + _B) % _PRIME
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+def lsh_keys(signature: np.ndarray) -> List[str]:
+    """One bucket key per band; documents sharing any key are near-duplicate candidates."""
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    return [
+        f"{band}:{signature[band * rows:(band + 1) * rows].tobytes().hex()}"
+        for band in range(LSH_BANDS)
+    ]
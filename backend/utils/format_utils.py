@@ -18,10 +18,12 @@ def format_incident_response(incident_data: Dict[str, Any]) -> Dict[str, Any]:
         "urgency": incident_data.get("urgency"),
         "description": incident_data.get("description"),
         "image_url": incident_data.get("image_url"),
+        "thumbnails": incident_data.get("thumbnails") or {},
         "location": location,
         "location_text": location,
         "people_affected": incident_data.get("people_affected", 0),
         "verified": incident_data.get("verified", False),
+        "event_id": incident_data.get("event_id"),
         "timestamp": incident_data.get("timestamp", datetime.utcnow().isoformat())
     }
 
@@ -0,0 +1,25 @@
+from math import radians, sin, cos, asin, sqrt
+from typing import Optional, Dict, Any
+
+EARTH_RADIUS_M = 6371000.0
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in meters."""
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * asin(sqrt(a))
+
+def geo_point(incident_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Build a Qdrant geo point ({"lat", "lon"}) from incident coordinates."""
+    lat = incident_data.get("lat")
+    if lat is None:
+        lat = incident_data.get("latitude")
+    lng = incident_data.get("lng")
+    if lng is None:
+        lng = incident_data.get("longitude")
+
+    if lat is None or lng is None:
+        return None
+    return {"lat": float(lat), "lon": float(lng)}
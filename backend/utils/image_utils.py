@@ -0,0 +1,49 @@
+from PIL import Image, ImageOps
+from utils.exif_utils import get_gps_coordinates
+from typing import Dict, Any
+import io
+
+def make_thumbnails(data: bytes, sizes: Dict[str, int], quality: int = 80) -> Dict[str, bytes]:
+    """
+    Encode WebP thumbnails of an image (runs in the process pool).
+
+    Args:
+        data: Original image bytes
+        sizes: Variant name -> longest side in pixels, e.g. {"small": 160, "medium": 640}
+        quality: WebP quality
+
+    Returns:
+        Dict[str, bytes]: Variant name -> WebP bytes (never upscaled)
+    """
+    image = Image.open(io.BytesIO(data))
+    # Decode at reduced size where the codec supports it (JPEG DCT scaling)
+    largest = max(sizes.values())
+    image.draft("RGB", (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    variants = {}
+    # Largest first, so each smaller variant is resized from the previous one
+    for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+        variants[name] = buffer.getvalue()
+    return variants
+
+def probe_image(data: bytes) -> Dict[str, Any]:
+    """
+    Decode an image's header and EXIF (runs in the process pool).
+
+    Returns:
+        Dict with "gps" ((lat, lng) or None), "width", "height" and "format";
+        the size fields are None when PIL cannot decode the image
+    """
+    info = {"gps": get_gps_coordinates(data), "width": None, "height": None, "format": None}
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            info.update(width=image.width, height=image.height, format=image.format)
+    except Exception as e:
+        print(f"Error decoding image: {e}")
+    return info
@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional, Any, Tuple
+import re
+
+def _case_insensitive(word: str) -> str:
+    """Regex for `word` in any case, without re.IGNORECASE (which disables the engine's prefix scan)."""
+    return "".join(
+        f"[{re.escape(ch.lower())}{re.escape(ch.upper())}]" if ch.lower() != ch.upper() else re.escape(ch)
+        for ch in word
+    )
+
+class KeywordMatcher:
+    """
+    Keyword tables compiled once for fast classification of short texts.
+
+    `tables` maps a table name to {value: [keywords]}, with values in
+    priority order, e.g. {"urgency": {"high": ["sos", "help"],
+    "medium": ["warning"]}}. Matching is case-insensitive and
+    substring-based, like `keyword in text.lower()`.
+
+    The text is lowercased once and each distinct keyword is searched once,
+    however many tables list it. A hit is mapped to its table values through
+    an index built up front. CPython's substring search runs in C and beats
+    a Python-level automaton (or one big regex alternation) for tables of a
+    few dozen keywords.
+
+    With `location_cues` (e.g. ["in", "at", "near"]), the first capitalized
+    phrase after a whole-word cue and any run of whitespace is captured
+    ("near Dubai Marina", "in\nSharjah"). The search starts at capital
+    letters that follow whitespace and then checks the words before them for
+    a cue, so it skips lowercase text without trying the cues at every position.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, List[str]]], location_cues: Optional[List[str]] = None):
+        self.tables = tables
+        entries: Dict[str, List[Tuple[str, str]]] = {}
+        for table, values in tables.items():
+            for value, keywords in values.items():
+                for keyword in keywords:
+                    if keyword:
+                        entries.setdefault(keyword.lower(), []).append((table, value))
+        self._keywords = list(entries.items())
+        self._empty = {table: [] for table in tables}
+
+        self._location = None
+        if location_cues:
+            # Candidate place: capitalized phrase after whitespace (the charset prefix keeps the scan fast)
+            self._location = re.compile(r"[A-Z](?<=\s[A-Z])[\w'-]*(?:\s+[A-Z][\w'-]*)*")
+            # Whole-word cue at the end of the text before the candidate (whitespace stripped)
+            cues = "|".join(_case_insensitive(cue) for cue in location_cues)
+            self._cue = re.compile(rf"(?<!\w)(?:{cues})\Z")
+            self._cue_width = max(len(cue) for cue in location_cues)
+
+    def _find_location(self, text: str) -> Optional[str]:
+        """First capitalized phrase preceded by a cue and one or more whitespace characters."""
+        match = self._location.search(text)
+        while match:
+            head = text[:match.start()].rstrip()
+            if self._cue.search(head, max(0, len(head) - self._cue_width)):
+                return match.group()
+            # Retry from the next capital, so "At The Mall" yields "The Mall"
+            match = self._location.search(text, match.start() + 1)
+        return None
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict with one list per table of the values found (in priority
+            order), "keywords" (the distinct keywords matched) and "location"
+            (first cued place name or None)
+        """
+        lowered = text.lower()
+        hits = [(keyword, entries) for keyword, entries in self._keywords if keyword in lowered]
+        location = self._find_location(text) if self._location is not None else None
+        if not hits:
+            return {**self._empty, "keywords": [], "location": location}
+
+        found = set()
+        for _, entries in hits:
+            found.update(entries)
+        result: Dict[str, Any] = {
+            table: [value for value in values if (table, value) in found]
+            for table, values in self.tables.items()
+        }
+        result["keywords"] = [keyword for keyword, _ in hits]
+        result["location"] = location
+        return result
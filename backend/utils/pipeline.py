@@ -0,0 +1,105 @@
+import asyncio
+from utils.timing_utils import StageTimer
+from typing import Dict, Any, Callable, Awaitable, Optional, Iterable
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+# Progress hook: awaited with the stage name each time a stage finishes
+ProgressFn = Callable[[str], Awaitable[None]]
+
+class PipelineAbort(Exception):
+    """Raised by a stage to stop the pipeline early with a final result (e.g. duplicate found)."""
+
+    def __init__(self, result: Any):
+        super().__init__("pipeline aborted")
+        self.result = result
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: StageFn,
+        deps: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.fallback = fallback
+
+class Pipeline:
+    """
+    A small async stage DAG: every stage starts as soon as the stages it
+    depends on have finished, so independent stages run concurrently.
+
+    Stages read inputs from and write their result to a shared context dict
+    (`ctx[stage.name]`). A stage that times out or fails uses its fallback
+    (a function of the context); without one the error propagates.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def stage(self, name: str, fn: StageFn, deps: Iterable[str] = (), timeout: Optional[float] = None,
+              fallback: Optional[Callable[[Dict[str, Any]], Any]] = None) -> "Pipeline":
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = Stage(name, fn, deps, timeout, fallback)
+        return self
+
+    async def _run_stage(self, stage: Stage, ctx: Dict[str, Any], tasks: Dict[str, asyncio.Task], timer: StageTimer,
+                         on_stage: Optional[ProgressFn] = None):
+        if stage.deps:
+            await asyncio.gather(*(tasks[dep] for dep in stage.deps))
+
+        async def call():
+            try:
+                return await asyncio.wait_for(stage.fn(ctx), timeout=stage.timeout)
+            except PipelineAbort:
+                raise
+            except asyncio.TimeoutError:
+                if stage.fallback is None:
+                    raise
+                print(f"⚠️  Stage '{stage.name}' timed out after {stage.timeout}s - using fallback")
+            except Exception as e:
+                if stage.fallback is None:
+                    raise
+                print(f"⚠️  Stage '{stage.name}' failed: {e} - using fallback")
+            return stage.fallback(ctx)
+
+        ctx[stage.name] = await timer.run(stage.name, call())
+        if on_stage is not None:
+            try:
+                await on_stage(stage.name)
+            except Exception as e:
+                print(f"⚠️  Progress callback failed: {e}")
+        return ctx[stage.name]
+
+    async def run(self, ctx: Dict[str, Any], timer: Optional[StageTimer] = None,
+                  on_stage: Optional[ProgressFn] = None) -> Dict[str, Any]:
+        """
+        Run all stages. Returns the context with every stage result; if a stage
+        raised PipelineAbort, `ctx["aborted"]` holds its result and unfinished
+        stages are cancelled.
+        """
+        timer = timer or StageTimer()
+        ctx.setdefault("timer", timer)
+        timer.deps.update({name: stage.deps for name, stage in self.stages.items()})
+        tasks: Dict[str, asyncio.Task] = {}
+        # Stages are registered in dependency order, so every dep task exists already
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.create_task(self._run_stage(stage, ctx, tasks, timer, on_stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except PipelineAbort as abort:
+            ctx["aborted"] = abort.result
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            # Collect cancellations so no "exception was never retrieved" warnings remain
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return ctx
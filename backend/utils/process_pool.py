@@ -0,0 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor
+from config import config
+from typing import Callable, Any, Optional
+import asyncio
+
+# One pool for CPU-bound work (image resizing, EXIF, PDF parsing) shared by all routes
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_pool() -> ProcessPoolExecutor:
+    """Create the shared process pool on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=config.PROCESS_POOL_WORKERS or None)
+    return _pool
+
+async def run_in_process(fn: Callable[..., Any], *args) -> Any:
+    """Run a picklable, module-level function in the shared process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), fn, *args)
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
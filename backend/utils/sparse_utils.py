@@ -0,0 +1,49 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+# BM25 term-frequency saturation parameters; IDF is applied by Qdrant (Modifier.IDF)
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_AVG_DOC_LEN = 40.0
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Fields of an incident that feed the sparse (exact term) vector
+SPARSE_TEXT_FIELDS = ("type", "description", "location_text", "location", "document_name", "source_user")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (street names, "sos", shelter names, ...)."""
+    return TOKEN_PATTERN.findall(text.lower().replace("_", " "))
+
+def token_index(token: str) -> int:
+    """Stable 31-bit index for a token (same across processes, unlike hash())."""
+    return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+def bm25_document_vector(text: str) -> Tuple[List[int], List[float]]:
+    """
+    Sparse BM25 document vector: saturated term frequencies keyed by token index.
+
+    Returns:
+        (indices, values) for a Qdrant SparseVector
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return [], []
+
+    counts = Counter(token_index(t) for t in tokens)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / BM25_AVG_DOC_LEN)
+    indices = list(counts)
+    values = [tf * (BM25_K1 + 1) / (tf + norm) for tf in counts.values()]
+    return indices, values
+
+def bm25_query_vector(text: str) -> Tuple[List[int], List[float]]:
+    """Sparse query vector: each distinct query token weighted 1 (IDF comes from Qdrant)."""
+    indices = sorted({token_index(t) for t in tokenize(text)})
+    return indices, [1.0] * len(indices)
+
+def incident_sparse_text(incident_data: Dict[str, Any]) -> str:
+    """Concatenate the text fields of an incident that operators search by exact term."""
+    parts = [str(incident_data[f]) for f in SPARSE_TEXT_FIELDS if incident_data.get(f)]
+    return " ".join(parts)
@@ -0,0 +1,29 @@
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterable, AsyncIterator, Tuple, Dict, Any, Optional
+import json
+
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+async def _encode(events: AsyncIterable[Tuple[str, Dict[str, Any]]], fmt: str) -> AsyncIterator[str]:
+    async for event, data in events:
+        if fmt == "sse":
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        else:
+            yield json.dumps({"event": event, **data}, default=str) + "\n"
+
+def stream_response(events: AsyncIterable[Tuple[str, Dict[str, Any]]], fmt: str,
+                    headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Stream (event, data) pairs as NDJSON lines ({"event": ..., **data}) or Server-Sent Events.
+
+    Args:
+        events: Async iterable of (event name, JSON-serializable dict)
+        fmt: "ndjson" or "sse"
+        headers: Extra response headers
+    """
+    return StreamingResponse(
+        _encode(events, fmt),
+        media_type=STREAM_FORMATS[fmt],
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})}
+    )
@@ -0,0 +1,62 @@
+import time
+from typing import Dict, Any, Awaitable, TypeVar, Tuple
+
+T = TypeVar("T")
+
+class StageTimer:
+    """
+    Records start/end offsets of pipeline stages (sequential or concurrent)
+    and derives the critical path: the chain of back-to-back stages that
+    determined the end-to-end latency.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        # Known stage dependencies (filled by utils.pipeline); used instead of guessing from times
+        self.deps: Dict[str, Tuple[str, ...]] = {}
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await a stage and record when it started and finished."""
+        start = self._now_ms()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = {"start": start, "end": self._now_ms()}
+
+    def critical_path(self) -> Dict[str, Any]:
+        """Walk back from the last stage to finish, always through the latest-ending predecessor."""
+        if not self.stages:
+            return {"stages": [], "ms": 0.0}
+
+        name, stage = max(self.stages.items(), key=lambda item: item[1]["end"])
+        path = [name]
+        while True:
+            if self.deps.get(name):
+                before = [(dep, self.stages[dep]) for dep in self.deps[name] if dep in self.stages]
+            else:
+                before = [
+                    (other, s) for other, s in self.stages.items()
+                    if other not in path and s["end"] <= stage["start"] + 0.5
+                ]
+            if not before:
+                break
+            name, stage = max(before, key=lambda item: item[1]["end"])
+            path.append(name)
+
+        path.reverse()
+        ms = sum(self.stages[n]["end"] - self.stages[n]["start"] for n in path)
+        return {"stages": path, "ms": round(ms, 1)}
+
+    def report(self) -> Dict[str, Any]:
+        """Per-stage durations, critical path and wall-clock total in milliseconds."""
+        return {
+            "stages_ms": {
+                name: round(s["end"] - s["start"], 1) for name, s in self.stages.items()
+            },
+            "critical_path": self.critical_path(),
+            "total_ms": round(self._now_ms(), 1)
+        }
@@ -0,0 +1,107 @@
+from fastapi import UploadFile, HTTPException, Request
+from config import config
+from typing import Optional, Tuple
+import hashlib
+import tempfile
+
+class UploadBuffer:
+    """An upload read once into memory: EXIF, Gemini and storage all share `data`."""
+
+    def __init__(self, data: bytes, sha256: str, filename: Optional[str], content_type: Optional[str]):
+        self.data = data
+        self.sha256 = sha256
+        self.filename = filename or "upload"
+        self.content_type = content_type or "application/octet-stream"
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: Optional[str], content_type: Optional[str]) -> "UploadBuffer":
+        """Wrap bytes that did not come from an UploadFile (e.g. an archive entry)."""
+        return cls(data, hashlib.sha256(data).hexdigest(), filename, content_type)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def image_mime_type(self) -> str:
+        """MIME type to hand to Gemini/storage; uploads without an image type are treated as JPEG."""
+        return self.content_type if self.content_type.startswith("image/") else "image/jpeg"
+
+async def read_upload(file: UploadFile, max_bytes: Optional[int] = None) -> UploadBuffer:
+    """
+    Read an upload in chunks, hashing it and enforcing a size limit as it streams.
+
+    Raises:
+        HTTPException 413 as soon as the upload exceeds max_bytes
+    """
+    max_bytes = max_bytes or config.MAX_UPLOAD_BYTES
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+
+    while True:
+        chunk = await file.read(config.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large: {file.filename} exceeds {max_bytes // (1024 * 1024)} MB"
+            )
+        digest.update(chunk)
+        chunks.append(chunk)
+
+    data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return UploadBuffer(data, digest.hexdigest(), file.filename, file.content_type)
+
+async def spool_request(request: Request, max_bytes: int) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """
+    Copy a raw request body into a temp file that spills to disk past ARCHIVE_SPOOL_BYTES.
+
+    Returns:
+        (spooled file positioned at 0, sha256 of the body)
+
+    Raises:
+        HTTPException 413 as soon as the body exceeds max_bytes
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=config.ARCHIVE_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Archive too large: exceeds {max_bytes // (1024 * 1024)} MB"
+                )
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+async def iter_request_lines(request: Request, max_bytes: int):
+    """
+    Yield the lines of a raw request body as they arrive (for JSONL/NDJSON uploads).
+
+    Raises:
+        HTTPException 413 as soon as the body exceeds max_bytes
+    """
+    size = 0
+    pending = b""
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request too large: exceeds {max_bytes // (1024 * 1024)} MB"
+            )
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
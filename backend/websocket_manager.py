@@ -71,6 +71,13 @@ async def broadcast_incident_deleted(incident_id: str):
     except Exception as e:
         logger.error(f"Error broadcasting deletion: {e}")
 
+async def emit_job_event(job_id: str, event: str, data: Dict):
+    """Push job progress to clients subscribed to the room `job:<job_id>`."""
+    try:
+        await sio.emit(event, data, room=f"job:{job_id}")
+    except Exception as e:
+        logger.error(f"Error emitting job event: {e}")
+
 def get_connected_clients_count() -> int:
     """Get number of connected clients."""
     return len(connected_clients)
@@ -0,0 +1,140 @@
+"""
+Qdrant client latency benchmark
+Compares the old synchronous REST client against AsyncQdrantClient over REST and gRPC
+
+Simulates what the API does per request: N concurrent handlers each issue a
+search (the /query path) or a single-point upsert (the ingestion path).
+With the synchronous client every call blocks the event loop, so concurrent
+requests queue behind each other.
+
+Usage:
+    python benchmarks/qdrant_latency.py --url http://localhost:6333 --concurrency 32 --requests 500
+    python benchmarks/qdrant_latency.py --api http://localhost:8000   # also time POST /query end to end
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+
+DIM = 768
+COLLECTION = "rescuelena_bench_latency"
+
+def random_vector():
+    return [random.uniform(-1, 1) for _ in range(DIM)]
+
+def summarize(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"   {name:<28} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms   {len(latencies) / elapsed:8.1f} req/s")
+
+async def run_concurrent(call, requests, concurrency):
+    """Run `requests` calls with at most `concurrency` in flight; return per-call latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, time.perf_counter() - start
+
+async def bench_sync(url, api_key, args, query):
+    client = QdrantClient(url=url, api_key=api_key)
+
+    async def search():
+        client.search(collection_name=COLLECTION, query_vector=query, limit=10)
+
+    async def upsert():
+        client.upsert(
+            collection_name=COLLECTION,
+            points=[PointStruct(id=str(uuid.uuid4()), vector=random_vector(), payload={"type": "fire"})]
+        )
+
+    summarize("sync REST  search", *await run_concurrent(search, args.requests, args.concurrency))
+    summarize("sync REST  upsert", *await run_concurrent(upsert, args.requests, args.concurrency))
+    client.close()
+
+async def bench_async(url, api_key, args, query, prefer_grpc):
+    client = AsyncQdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc)
+    label = "async gRPC" if prefer_grpc else "async REST"
+
+    async def search():
+        await client.search(collection_name=COLLECTION, query_vector=query, limit=10)
+
+    async def upsert():
+        await client.upsert(
+            collection_name=COLLECTION,
+            points=[PointStruct(id=str(uuid.uuid4()), vector=random_vector(), payload={"type": "fire"})]
+        )
+
+    # Warm up the connection pool / channel
+    await search()
+    summarize(f"{label} search", *await run_concurrent(search, args.requests, args.concurrency))
+    summarize(f"{label} upsert", *await run_concurrent(upsert, args.requests, args.concurrency))
+    await client.close()
+
+async def bench_api(api_url, args):
+    import httpx
+
+    queries = ["fire near the mall", "flooded street", "collapsed building with people trapped"]
+    async with httpx.AsyncClient(base_url=api_url, timeout=30.0) as client:
+        async def query():
+            await client.post("/query", json={"query": random.choice(queries), "limit": 10})
+
+        summarize("POST /query (end to end)", *await run_concurrent(query, args.requests, args.concurrency))
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--api-key", default=os.getenv("QDRANT_API_KEY"))
+    parser.add_argument("--points", type=int, default=5000, help="points to seed before searching")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--api", help="RescueLena API base URL to benchmark /query end to end")
+    args = parser.parse_args()
+
+    print(f"📊 Qdrant latency benchmark ({args.requests} requests, concurrency {args.concurrency})")
+    print("=" * 60)
+
+    seed = QdrantClient(url=args.url, api_key=args.api_key)
+    if seed.collection_exists(COLLECTION):
+        seed.delete_collection(COLLECTION)
+    seed.create_collection(COLLECTION, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+    for start in range(0, args.points, 500):
+        seed.upsert(
+            collection_name=COLLECTION,
+            points=[
+                PointStruct(id=str(uuid.uuid4()), vector=random_vector(), payload={"type": "fire"})
+                for _ in range(min(500, args.points - start))
+            ]
+        )
+    print(f"   Seeded {args.points} points\n")
+
+    query = random_vector()
+    await bench_sync(args.url, args.api_key, args, query)
+    await bench_async(args.url, args.api_key, args, query, prefer_grpc=False)
+    await bench_async(args.url, args.api_key, args, query, prefer_grpc=True)
+
+    if args.api:
+        await bench_api(args.api, args)
+
+    seed.delete_collection(COLLECTION)
+    seed.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
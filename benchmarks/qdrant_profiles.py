@@ -0,0 +1,153 @@
+"""
+Qdrant collection profile benchmark
+Measures recall@k and search latency (p50/p99) for each collection profile
+
+Builds one collection per profile from the same synthetic, clustered set of
+768-dim vectors (1,000,000 points by default), computes exact top-k with a
+NumPy brute-force scan as ground truth and compares every profile against it.
+Vectors are generated chunk by chunk from fixed seeds, so the full set never
+has to fit in memory.
+
+Usage:
+    python benchmarks/qdrant_profiles.py --url http://localhost:6333
+    python benchmarks/qdrant_profiles.py --points 100000 --profiles default balanced binary
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from services.qdrant_profiles import COLLECTION_PROFILES, collection_params, search_params
+
+DIM = 768
+CHUNK = 10000
+CENTERS = 256
+
+def make_chunk(index: int, size: int, centers: np.ndarray) -> np.ndarray:
+    """Deterministic chunk of unit vectors scattered around random centers (like topical embeddings)."""
+    rng = np.random.default_rng(1000 + index)
+    labels = rng.integers(0, len(centers), size)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((size, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def ground_truth(queries: np.ndarray, points: int, k: int, centers: np.ndarray) -> np.ndarray:
+    """Exact top-k ids per query by streaming brute force over all chunks."""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+
+    for index, start in enumerate(range(0, points, CHUNK)):
+        vectors = make_chunk(index, min(CHUNK, points - start), centers)
+        scores = queries @ vectors.T
+        ids = np.arange(start, start + len(vectors))
+
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_ids = np.concatenate([best_ids, np.broadcast_to(ids, scores.shape)], axis=1)
+        top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, top, axis=1)
+        best_ids = np.take_along_axis(merged_ids, top, axis=1)
+
+    return best_ids
+
+def wait_for_index(client: QdrantClient, name: str):
+    """Wait until Qdrant has finished optimizing (building HNSW / quantization)."""
+    while True:
+        info = client.get_collection(name)
+        if info.status.value == "green":
+            return
+        time.sleep(2)
+
+def load_profile(client: QdrantClient, name: str, collection: str, points: int, centers: np.ndarray):
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(collection_name=collection, **collection_params(name, DIM))
+
+    start_time = time.perf_counter()
+    for index, start in enumerate(range(0, points, CHUNK)):
+        vectors = make_chunk(index, min(CHUNK, points - start), centers)
+        client.upload_points(
+            collection_name=collection,
+            points=(
+                PointStruct(id=start + i, vector=vector.tolist())
+                for i, vector in enumerate(vectors)
+            ),
+            batch_size=512,
+            parallel=4,
+            wait=True
+        )
+    wait_for_index(client, collection)
+    return time.perf_counter() - start_time
+
+def bench_profile(client: QdrantClient, name: str, collection: str, queries: np.ndarray, truth: np.ndarray, k: int):
+    params = search_params(name)
+    latencies = []
+    hits = 0
+
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = client.search(
+            collection_name=collection,
+            query_vector=query.tolist(),
+            search_params=params,
+            limit=k
+        )
+        latencies.append(time.perf_counter() - start)
+        hits += len({r.id for r in results} & set(expected.tolist()))
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "recall": hits / (len(queries) * k),
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--api-key", default=os.getenv("QDRANT_API_KEY"))
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--profiles", nargs="+", default=list(COLLECTION_PROFILES))
+    parser.add_argument("--keep", action="store_true", help="keep benchmark collections afterwards")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((CENTERS, DIM)).astype(np.float32)
+
+    # Queries are perturbed copies of corpus-like vectors
+    queries = make_chunk(10_000_000, args.queries, centers)
+
+    print(f"📊 Qdrant profile benchmark: {args.points:,} points, {args.queries} queries, recall@{args.k}")
+    print("=" * 72)
+    print("🔢 Computing exact ground truth...")
+    truth = ground_truth(queries, args.points, args.k, centers)
+
+    rows = []
+    for name in args.profiles:
+        collection = f"rescuelena_bench_{name}"
+        print(f"\n📦 Loading profile '{name}'...")
+        load_seconds = load_profile(client, name, collection, args.points, centers)
+        result = bench_profile(client, name, collection, queries, truth, args.k)
+        result["load"] = load_seconds
+        rows.append((name, result))
+        print(f"   recall@{args.k} {result['recall']:.4f}   p50 {result['p50']:.2f} ms   p99 {result['p99']:.2f} ms")
+
+        if not args.keep:
+            client.delete_collection(collection)
+
+    print("\n" + "=" * 72)
+    print(f"{'profile':<12} {'recall@' + str(args.k):>10} {'p50 ms':>10} {'p99 ms':>10} {'load s':>10}")
+    for name, result in rows:
+        print(f"{name:<12} {result['recall']:>10.4f} {result['p50']:>10.2f} {result['p99']:>10.2f} {result['load']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
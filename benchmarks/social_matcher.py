@@ -0,0 +1,144 @@
+"""
+Social post triage benchmark
+Compares the old per-keyword scans against the compiled keyword matcher
+
+The old analyze_post lowercased each post and ran one substring scan per
+type keyword, one per urgency keyword and a separate location regex. The
+matcher lowercases once, searches each distinct keyword once for all tables
+and finds location cues with a capital-anchored regex. Posts are
+synthetic (keywords, emoji, place names and filler at realistic lengths).
+Location cue edge cases (several spaces, newlines, tabs) are checked before
+timing; the script exits with status 1 if one fails.
+
+Usage:
+    python benchmarks/social_matcher.py --posts 100000
+    python benchmarks/social_matcher.py --posts 100000 --relevant-ratio 0.05 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.social_media_service import social_media_service
+
+FILLER = (
+    "just saw this on my way home traffic is crazy today anyone know what is going on "
+    "the weather has been strange all week stay safe everyone thanks for sharing"
+).split()
+SIGNALS = [
+    "fire", "flood", "earthquake", "collapse", "trapped", "medical", "urgent", "emergency",
+    "help", "SOS", "🆘", "🔥", "🌊", "⚠️", "warning", "alert", "rescue", "evacuation"
+]
+PLACES = ["Dubai Marina", "Deira", "Jumeirah", "Al Barsha", "Business Bay", "Downtown Dubai"]
+# Location cue edge cases: (post, expected location_text)
+LOCATION_CASES = [
+    ("flood in Sharjah", "Sharjah"),
+    ("flood in  Sharjah", "Sharjah"),
+    ("flood in\nSharjah", "Sharjah"),
+    ("people trapped near \t Dubai Marina!", "Dubai Marina"),
+    ("Fire At The Mall", "The Mall"),
+    ("In Deira water rising", "Deira"),
+    ("main Street flooded", "Unknown location"),
+    ("smoke over Berlin Wall", "Unknown location"),
+]
+
+def legacy_analyze(post_text):
+    """The pre-matcher analyze_post logic."""
+    text_lower = post_text.lower()
+
+    detected_type = "other"
+    for keyword, incident_type in [
+        ('fire', 'fire'),
+        ('flood', 'flood'),
+        ('earthquake', 'earthquake'),
+        ('collapse', 'building_collapse'),
+        ('trapped', 'people_trapped'),
+        ('medical', 'medical')
+    ]:
+        if keyword in text_lower:
+            detected_type = incident_type
+            break
+
+    if any(word in text_lower for word in ['urgent', 'emergency', 'help', 'sos', '🆘']):
+        urgency = "high"
+    elif any(word in text_lower for word in ['warning', 'alert']):
+        urgency = "medium"
+    else:
+        urgency = "low"
+
+    location_match = re.search(r'(?:in|at|near)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', post_text)
+    location = location_match.group(1) if location_match else "Unknown location"
+    relevant = any(keyword.lower() in text_lower for keyword in social_media_service.keywords)
+
+    return {"type": detected_type, "urgency": urgency, "location_text": location, "relevant": relevant}
+
+def make_posts(count, relevant_ratio, seed=7):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(8, 40))
+        if rng.random() < relevant_ratio:
+            for _ in range(rng.randint(1, 3)):
+                words.insert(rng.randrange(len(words) + 1), rng.choice(SIGNALS))
+            if rng.random() < 0.6:
+                words.insert(rng.randrange(len(words) + 1), f"near {rng.choice(PLACES)}")
+        posts.append(" ".join(words))
+    return posts
+
+def timed(name, fn, posts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(posts)
+        best = min(best, time.perf_counter() - started)
+    print(f"   {name:<32} {len(posts) / best:12,.0f} posts/s   ({best * 1000:8.1f} ms)")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Social post triage benchmark")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--relevant-ratio", type=float, default=0.2, help="Share of posts containing disaster keywords")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts, args.relevant_ratio)
+    print(f"📊 {len(posts):,} posts, {args.relevant_ratio:.0%} with disaster keywords, "
+          f"avg {sum(map(len, posts)) / len(posts):.0f} chars")
+
+    # Same answers for type, urgency and relevance (location cues are stricter now: whole words only)
+    mismatches = sum(
+        1 for post in posts
+        if any(legacy_analyze(post)[key] != social_media_service.classify(post)[key]
+               for key in ("type", "urgency", "relevant"))
+    )
+    batch_mismatches = sum(
+        1 for post, analysis in zip(posts, social_media_service.classify_posts(posts))
+        if {**analysis, "index": None} != {**social_media_service.classify(post), "index": None}
+    )
+    print(f"   type/urgency/relevance mismatches: {mismatches}, classify_posts vs classify: {batch_mismatches}")
+
+    failed = [(post, expected, social_media_service.classify(post)["location_text"])
+              for post, expected in LOCATION_CASES
+              if social_media_service.classify(post)["location_text"] != expected]
+    for post, expected, found in failed:
+        print(f"   ❌ location for {post!r}: expected {expected!r}, got {found!r}")
+    if failed:
+        sys.exit(1)
+    print(f"   location cue cases: {len(LOCATION_CASES)} passed")
+
+    legacy = timed("legacy scans", lambda batch: [legacy_analyze(post) for post in batch], posts, args.repeat)
+    single = timed("matcher, classify()", lambda batch: [social_media_service.classify(post) for post in batch],
+                   posts, args.repeat)
+    batched = timed("matcher, classify_posts()", social_media_service.classify_posts, posts, args.repeat)
+    timed("matcher, relevant_only", lambda batch: social_media_service.classify_posts(batch, relevant_only=True),
+          posts, args.repeat)
+    print(f"   speedup: {legacy / single:.2f}x per post, {legacy / batched:.2f}x batched")
+
+if __name__ == "__main__":
+    main()
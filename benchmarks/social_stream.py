@@ -0,0 +1,112 @@
+"""
+Social stream ingestion benchmark
+Replays a synthetic JSONL firehose through the social stream engine
+
+Posts go through the real replay source, bounded queue, keyword triage and
+the real store_posts (clustering, incident building, the embedding backfill
+queue and the websocket broadcast). Only the network services are stubbed:
+Firestore's batch write waits --persist-ms (about one commit), and Gemini
+and Qdrant are never called because the backfill worker is not started, so
+the backfill queue fills up to SOCIAL_BACKFILL_MAX_PENDING. Prints live
+stats every second and a final throughput, drop and lag report.
+
+Usage:
+    python benchmarks/social_stream.py --posts 200000
+    python benchmarks/social_stream.py --posts 200000 --rate 5000 --overflow drop --persist-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import types
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import config
+from social_matcher import make_posts
+
+class StubFirestore:
+    """Batch write that only waits, like one Firestore commit."""
+
+    def __init__(self):
+        self.delay = 0.05
+        self.stored = 0
+
+    async def store_incidents(self, incidents):
+        await asyncio.sleep(self.delay)
+        self.stored += len(incidents)
+        return [f"bench-{self.stored - len(incidents) + index}" for index in range(len(incidents))]
+
+def stub_services():
+    """Replace the network-backed services before the stream service imports them."""
+    firestore = StubFirestore()
+    for name, attr, service in [
+        ("services.firestore_service", "firestore_service", firestore),
+        ("services.gemini_service", "gemini_service", None),
+        ("services.qdrant_service", "qdrant_service", None),
+    ]:
+        module = types.ModuleType(name)
+        setattr(module, attr, service)
+        sys.modules[name] = module
+    return firestore
+
+def write_posts(path, count, relevant_ratio):
+    with open(path, "w", encoding="utf-8") as f:
+        for index, text in enumerate(make_posts(count, relevant_ratio)):
+            f.write(json.dumps({"id": str(index), "text": text, "user": f"user{index % 997}"}) + "\n")
+
+def print_stats(stats, prefix="   "):
+    queue_lag, persist_lag = stats["queue_lag_ms"], stats["persist_lag_ms"]
+    print(f"{prefix}{stats['triaged']:>9,} triaged  {stats['dropped']:>8,} dropped  "
+          f"{stats['persisted']:>7,} stored  queue {stats['queue_depth']:>6,}/{stats['queue_capacity']:,}  "
+          f"{stats['posts_per_second'] or 0:>10,.0f} posts/s  "
+          f"lag p50/p99 {queue_lag['p50']}/{queue_lag['p99']} ms (stored {persist_lag['p50']}/{persist_lag['p99']} ms)")
+
+async def run(args, path):
+    from services.social_stream_service import SocialStreamService, JsonlReplaySource
+
+    engine = SocialStreamService()
+    engine.start([JsonlReplaySource(path, rate=args.rate)])
+    while engine.running:
+        await asyncio.sleep(1)
+        print_stats(engine.stats())
+    await engine.wait()
+    return engine.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Social stream ingestion benchmark")
+    parser.add_argument("--posts", type=int, default=200000)
+    parser.add_argument("--relevant-ratio", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=0, help="Replay rate in posts/s (0 = as fast as accepted)")
+    parser.add_argument("--overflow", choices=["block", "drop"], default="block")
+    parser.add_argument("--queue", type=int, default=config.SOCIAL_QUEUE_SIZE)
+    parser.add_argument("--persist-ms", type=float, default=50, help="Simulated latency of one persistence batch")
+    args = parser.parse_args()
+
+    config.SOCIAL_OVERFLOW = args.overflow
+    config.SOCIAL_QUEUE_SIZE = args.queue
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.EMBEDDING_BACKFILL_PATH = os.path.join(tmp, "embedding_backfill.jsonl")
+        firestore = stub_services()
+        firestore.delay = args.persist_ms / 1000
+        path = os.path.join(tmp, "posts.jsonl")
+        write_posts(path, args.posts, args.relevant_ratio)
+        print(f"📡 {args.posts:,} posts ({args.relevant_ratio:.0%} relevant), "
+              f"rate {args.rate or 'unlimited'}, overflow {args.overflow}, queue {args.queue:,}, "
+              f"persist {args.persist_ms} ms/batch")
+        stats = asyncio.run(run(args, path))
+
+    print("\n📊 Final")
+    print_stats(stats)
+    print(f"   relevant {stats['relevant']:,} in {stats['persist_batches']} batches, "
+          f"max queue depth {stats['queue_max_depth']:,}, elapsed {stats['elapsed_s']} s")
+    print(f"   {firestore.stored:,} incidents written, {stats['backfill_pending']:,} embeddings queued "
+          f"(cap {config.SOCIAL_BACKFILL_MAX_PENDING:,})")
+
+if __name__ == "__main__":
+    main()
@@ -76,7 +76,7 @@ export function IncidentCard({ incident, onClick, selected, onUpdate }: Incident
         {incident.image_url && !incident.image_url.startsWith('local://') && (
           <div className="mb-3 -mx-4 -mt-4">
             <img 
-              src={incident.image_url} 
+              src={incident.thumbnails?.medium || incident.image_url} 
               alt={incident.type}
               className="w-full h-48 object-cover"
               loading="lazy"
@@ -25,10 +25,15 @@ export interface Incident {
   location: string;
   people_affected?: number;
   image_url?: string;
+  thumbnails?: {
+    small?: string;
+    medium?: string;
+  };
   verified?: boolean;
   verified_by?: string;
   status?: IncidentStatus;
   archived?: boolean;
+  event_id?: string;
 }
 
 export interface DashboardStats {
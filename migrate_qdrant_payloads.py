@@ -0,0 +1,94 @@
+"""
+Rewrite existing Qdrant points to the slim payload schema
+Keeps only the filterable fields (type, urgency, status, verified, timestamp,
+source, event_id, geo); full incident data is hydrated from Firestore
+
+Usage:
+    python migrate_qdrant_payloads.py            # rewrite all points
+    python migrate_qdrant_payloads.py --dry-run  # only report what would change
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from qdrant_client.models import OverwritePayloadOperation, SetPayload
+from services.qdrant_service import qdrant_service, slim_payload
+
+PAGE_SIZE = 256
+
+async def migrate_payloads(dry_run: bool = False) -> bool:
+    """Scroll through the collection and overwrite each payload with its slim version."""
+    if qdrant_service.client is None:
+        print("❌ QDRANT_URL is not set (local-only mode): there is no Qdrant collection to migrate")
+        return False
+
+    print("🔄 Migrating Qdrant payloads to the slim schema...")
+    print("=" * 60)
+
+    if not await qdrant_service.initialize():
+        print("❌ Could not connect to Qdrant")
+        await qdrant_service.close()
+        return False
+    client = qdrant_service.client
+    collection = qdrant_service.collection_name
+
+    offset = None
+    scanned = 0
+    rewritten = 0
+    bytes_before = 0
+    bytes_after = 0
+
+    while True:
+        points, offset = await client.scroll(
+            collection_name=collection,
+            limit=PAGE_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        if not points:
+            break
+
+        operations = []
+        for point in points:
+            payload = point.payload or {}
+            slim = slim_payload(payload)
+            scanned += 1
+            bytes_before += len(json.dumps(payload, default=str))
+            bytes_after += len(json.dumps(slim, default=str))
+
+            if slim != payload:
+                operations.append(
+                    OverwritePayloadOperation(
+                        overwrite_payload=SetPayload(payload=slim, points=[point.id])
+                    )
+                )
+
+        if operations and not dry_run:
+            await client.batch_update_points(collection_name=collection, update_operations=operations)
+        rewritten += len(operations)
+        print(f"   Scanned {scanned} points, {rewritten} to rewrite")
+
+        if offset is None:
+            break
+
+    print("\n" + "=" * 60)
+    action = "Would rewrite" if dry_run else "Rewrote"
+    print(f"✅ {action} {rewritten} of {scanned} points")
+    if scanned:
+        print(f"   Average payload: {bytes_before / scanned:.0f} B -> {bytes_after / scanned:.0f} B")
+
+    await qdrant_service.close()
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite Qdrant payloads to the slim schema")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(migrate_payloads(dry_run=args.dry_run)) else 1)